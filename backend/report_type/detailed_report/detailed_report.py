@@ -9,6 +9,7 @@ from gpt_researcher.orchestrator.actions import (
     table_of_contents,
 )
 from gpt_researcher.orchestrator.agent import GPTResearcher
+from gpt_researcher.llm_provider.scheduler import llm_lane
 from gpt_researcher.utils.enum import Tone
 from gpt_researcher.utils.validators import Subtopics
 from gpt_researcher.orchestrator.actions.markdown_processing import extract_headers
@@ -54,12 +55,14 @@ class DetailedReport:
             self.source_urls) if self.source_urls else set()
 
     async def run(self) -> str:
-        await self._initial_research()
-        subtopics = await self._get_all_subtopics()
-        report_introduction = await self.main_task_assistant.write_introduction()
-        _, report_body = await self._generate_subtopic_reports(subtopics)
-        self.main_task_assistant.visited_urls.update(self.global_urls)
-        report = await self._construct_detailed_report(report_introduction, report_body)
+        # The main task assistant is a research_report, but runs in the lane of the detailed report
+        with llm_lane(self.report_type):
+            await self._initial_research()
+            subtopics = await self._get_all_subtopics()
+            report_introduction = await self.main_task_assistant.write_introduction()
+            _, report_body = await self._generate_subtopic_reports(subtopics)
+            self.main_task_assistant.visited_urls.update(self.global_urls)
+            report = await self._construct_detailed_report(report_introduction, report_body)
         return report
 
     async def _initial_research(self) -> None:
@@ -16,6 +16,10 @@ from backend.server.websocket_manager import WebSocketManager
 from multi_agents.main import run_research_task
 from gpt_researcher.document.document import DocumentLoader
 from gpt_researcher.orchestrator.actions import stream_output
+from gpt_researcher.scraper.pool import get_host_stats
+from gpt_researcher.retrievers.tavily.tavily_search import get_tavily_key_stats
+from gpt_researcher.llm_provider.scheduler import get_llm_scheduler_stats
+from gpt_researcher.utils.http import close_http_clients
 from backend.server.server_utils import (
     sanitize_filename, create_filename, handle_start_command, handle_human_feedback,
     generate_report_files, send_file_paths, get_config_dict,
@@ -81,6 +85,11 @@ def startup_event():
     app.mount("/outputs", StaticFiles(directory="outputs"), name="outputs")
     os.makedirs(DOC_PATH, exist_ok=True)
 
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await close_http_clients()
+
 # Routes
 
 
@@ -109,6 +118,24 @@ async def get_config(
     )
 
 
+@app.get("/scraper/hosts")
+async def scraper_hosts():
+    """Hosts whose scraper circuit breaker has recorded failures, for monitoring"""
+    return get_host_stats()
+
+
+@app.get("/retrievers/tavily/keys")
+async def tavily_keys():
+    """Usage and health of each pooled Tavily API key, for monitoring"""
+    return get_tavily_key_stats()
+
+
+@app.get("/llm/scheduler")
+async def llm_scheduler():
+    """Rate budgets, queue depth per lane and waiting times of each LLM model, for monitoring"""
+    return get_llm_scheduler_stats()
+
+
 @app.get("/files/")
 async def list_files():
     files = os.listdir(DOC_PATH)
@@ -6,7 +6,8 @@ import time
 import shutil
 from typing import Dict, List
 from fastapi.responses import JSONResponse
-from gpt_researcher.document.document import DocumentLoader
+from gpt_researcher.config import Config
+from gpt_researcher.document import DocumentLoader
 from multi_agents.main import run_research_task
 
 # Add this import
@@ -101,8 +102,11 @@ async def handle_file_upload(file, DOC_PATH: str) -> Dict[str, str]:
         shutil.copyfileobj(file.file, buffer)
     print(f"File uploaded to {file_path}")
 
-    document_loader = DocumentLoader(DOC_PATH)
-    await document_loader.load()
+    # Parses only the new file into the document index; the rest of the folder is untouched
+    document_loader = DocumentLoader.from_config(Config(), DOC_PATH)
+    if document_loader.index is not None:
+        async for _ in document_loader.load_stream([file_path]):
+            pass
 
     return {"filename": file.filename, "path": file_path}
 
@@ -133,5 +133,21 @@ class Config:
             return env_value
         elif origin is list or origin is List:
             return json.loads(env_value)
+        elif origin is dict or origin is Dict:
+            return json.loads(env_value)
         else:
             raise ValueError(f"Unsupported type {type_hint} for key {key}")
+
+    @classmethod
+    def get_default(cls) -> "Config":
+        """
+        The default config, loaded once per process. Used by the process-wide resources that
+        are reached without a config, e.g. the HTTP client shared by the retrievers.
+        """
+        global _default_config
+        if _default_config is None:
+            _default_config = cls()
+        return _default_config
+
+
+_default_config = None
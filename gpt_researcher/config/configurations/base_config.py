@@ -1,4 +1,4 @@
-from typing import Union
+from typing import Dict, Union
 from typing_extensions import TypedDict
 
 
@@ -19,12 +19,69 @@ class BaseConfig(TypedDict):
     LLM_TEMPERATURE: float
     USER_AGENT: str
     MAX_SEARCH_RESULTS_PER_QUERY: int
+    RETRIEVER_TIMEOUT: float
     MEMORY_BACKEND: str
     TOTAL_WORDS: int
     REPORT_FORMAT: str
     MAX_ITERATIONS: int
     AGENT_ROLE: Union[str, None]
+    MAX_SCRAPED_URLS_PER_QUERY: Union[int, None]
+    HTTP_MAX_CONNECTIONS: int
+    HTTP_MAX_CONNECTIONS_PER_HOST: int
+    HTTP_KEEPALIVE_EXPIRY: float
+    HTTP2: bool
     SCRAPER: str
+    SCRAPER_PARSER: str
+    SCRAPER_MAIN_CONTENT: bool
+    SCRAPER_MAX_CONCURRENCY: int
+    SCRAPER_MAX_PER_HOST: int
+    SCRAPER_DEADLINE: Union[float, None]
+    SCRAPER_HOST_RATE: float
+    SCRAPER_BREAKER_THRESHOLD: int
+    SCRAPER_BREAKER_COOLDOWN: float
+    SCRAPER_MAX_RETRY_AFTER: float
+    SCRAPER_MAX_SIZE_MB: float
+    SCRAPER_PDF_MAX_SIZE_MB: float
+    SCRAPER_PDF_MAX_PAGES: int
+    SCRAPER_PDF_MAX_CHARS: int
+    BROWSER_POOL_SIZE: int
+    BROWSER_PAGE_TIMEOUT: float
+    SCRAPER_CACHE: bool
+    SCRAPER_CACHE_TTL: int
+    SCRAPER_CACHE_DOMAIN_TTL: Dict[str, int]
+    SCRAPER_CACHE_MAX_SIZE_MB: int
+    SEARCH_CACHE: bool
+    SEARCH_CACHE_BACKEND: str
+    SEARCH_CACHE_TTL: int
+    SEARCH_CACHE_MAX_ENTRIES: int
+    EMBEDDING_CACHE: bool
+    EMBEDDING_CACHE_BACKEND: str
+    EMBEDDING_CACHE_MAX_ENTRIES: int
+    LLM_REGISTRY_MAX_ENTRIES: int
+    LLM_CACHE: bool
+    LLM_CACHE_BACKEND: str
+    LLM_CACHE_TTL: int
+    LLM_CACHE_MAX_ENTRIES: int
+    LLM_CACHE_MAX_TEMPERATURE: float
+    LLM_CACHE_SEMANTIC: bool
+    LLM_CACHE_SEMANTIC_TTL: int
+    LLM_CACHE_SIMILARITY_THRESHOLD: float
+    LLM_MAX_RETRIES: int
+    LLM_RETRY_BASE_DELAY: float
+    LLM_RETRY_MAX_DELAY: float
+    LLM_MAX_RETRY_AFTER: float
+    LLM_MAX_CONCURRENCY: int
+    LLM_HEDGE: bool
+    LLM_HEDGE_QUANTILE: float
+    LLM_FALLBACK_PROVIDER: Union[str, None]
+    LLM_FALLBACK_MODEL: Union[str, None]
+    LLM_REQUESTS_PER_MINUTE: Union[int, None]
+    LLM_TOKENS_PER_MINUTE: Union[int, None]
+    LLM_RATE_LIMITS: Dict[str, Dict[str, int]]
     MAX_SUBTOPICS: int
     REPORT_SOURCE: Union[str, None]
     DOC_PATH: str
+    DOC_INDEX: bool
+    DOC_PARSE_WORKERS: Union[int, None]
+    DOC_PARSE_TIMEOUT: Union[float, None]
+    CACHE_DIR: str
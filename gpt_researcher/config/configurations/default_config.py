@@ -23,14 +23,71 @@ DEFAULT_CONFIG: DefaultConfig = {
     "LLM_TEMPERATURE": 0.55,
     "USER_AGENT": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36 Edg/119.0.0.0",
     "MAX_SEARCH_RESULTS_PER_QUERY": 5,
+    "RETRIEVER_TIMEOUT": 15,
     "MEMORY_BACKEND": "local",
     "TOTAL_WORDS": 900,
     "REPORT_FORMAT": "APA",
     "MAX_ITERATIONS": 3,
     "AGENT_ROLE": None,
+    "MAX_SCRAPED_URLS_PER_QUERY": 10,
+    "HTTP_MAX_CONNECTIONS": 100,
+    "HTTP_MAX_CONNECTIONS_PER_HOST": 10,
+    "HTTP_KEEPALIVE_EXPIRY": 30,
+    "HTTP2": True,
     "SCRAPER": "bs",
+    "SCRAPER_PARSER": "lxml",
+    "SCRAPER_MAIN_CONTENT": True,
+    "SCRAPER_MAX_CONCURRENCY": 20,
+    "SCRAPER_MAX_PER_HOST": 4,
+    "SCRAPER_DEADLINE": None,
+    "SCRAPER_HOST_RATE": 2.0,
+    "SCRAPER_BREAKER_THRESHOLD": 3,
+    "SCRAPER_BREAKER_COOLDOWN": 300,
+    "SCRAPER_MAX_RETRY_AFTER": 5,
+    "SCRAPER_MAX_SIZE_MB": 10,
+    "SCRAPER_PDF_MAX_SIZE_MB": 50,
+    "SCRAPER_PDF_MAX_PAGES": 100,
+    "SCRAPER_PDF_MAX_CHARS": 100000,
+    "BROWSER_POOL_SIZE": 2,
+    "BROWSER_PAGE_TIMEOUT": 20,
+    "SCRAPER_CACHE": True,
+    "SCRAPER_CACHE_TTL": 21600,
+    "SCRAPER_CACHE_DOMAIN_TTL": {},
+    "SCRAPER_CACHE_MAX_SIZE_MB": 512,
+    "SEARCH_CACHE": True,
+    "SEARCH_CACHE_BACKEND": "memory",
+    "SEARCH_CACHE_TTL": 900,
+    "SEARCH_CACHE_MAX_ENTRIES": 1024,
+    "EMBEDDING_CACHE": True,
+    "EMBEDDING_CACHE_BACKEND": "memory",
+    "EMBEDDING_CACHE_MAX_ENTRIES": 5000,
+    "LLM_REGISTRY_MAX_ENTRIES": 64,
+    "LLM_CACHE": True,
+    "LLM_CACHE_BACKEND": "memory",
+    "LLM_CACHE_TTL": 3600,
+    "LLM_CACHE_MAX_ENTRIES": 1024,
+    "LLM_CACHE_MAX_TEMPERATURE": 0.2,
+    "LLM_CACHE_SEMANTIC": False,
+    "LLM_CACHE_SEMANTIC_TTL": 900,
+    "LLM_CACHE_SIMILARITY_THRESHOLD": 0.97,
+    "LLM_MAX_RETRIES": 3,
+    "LLM_RETRY_BASE_DELAY": 1.0,
+    "LLM_RETRY_MAX_DELAY": 30,
+    "LLM_MAX_RETRY_AFTER": 60,
+    "LLM_MAX_CONCURRENCY": 16,
+    "LLM_HEDGE": False,
+    "LLM_HEDGE_QUANTILE": 0.95,
+    "LLM_FALLBACK_PROVIDER": None,
+    "LLM_FALLBACK_MODEL": None,
+    "LLM_REQUESTS_PER_MINUTE": None,
+    "LLM_TOKENS_PER_MINUTE": None,
+    "LLM_RATE_LIMITS": {},
     "MAX_SUBTOPICS": 3,
     "REPORT_SOURCE": None,
     "DOC_PATH": "./my-docs",
+    "DOC_INDEX": True,
+    "DOC_PARSE_WORKERS": None,
+    "DOC_PARSE_TIMEOUT": 120,
+    "CACHE_DIR": "./.cache",
     "VALID_RETRIEVERS": VALID_RETRIEVERS
 }
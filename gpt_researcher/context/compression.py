@@ -1,6 +1,9 @@
 import os
 import asyncio
-from typing import Optional
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+import numpy as np
+from langchain.schema import Document
 from .retriever import SearchAPIRetriever, SectionRetriever
 from langchain.retrievers import (
     ContextualCompressionRetriever,
@@ -12,8 +15,117 @@ from langchain.retrievers.document_compressors import (
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from gpt_researcher.vector_store import VectorStoreWrapper
 from gpt_researcher.utils.costs import estimate_embedding_cost
+from gpt_researcher.memory.cache import CachedEmbeddings, get_model_name
 from gpt_researcher.memory.embeddings import OPENAI_EMBEDDING_MODEL
 
+# Embedding calls in flight at once while pages are streamed into compression
+EMBEDDING_CONCURRENCY = 4
+
+
+async def embed_documents(embeddings, texts: List[str]) -> Tuple[List[List[float]], List[str]]:
+    """
+    Embeds the texts, returning their vectors and the texts that were sent to the embedding
+    API, i.e. without those served by the embedding cache; only the latter are charged.
+    """
+    if isinstance(embeddings, CachedEmbeddings):
+        return await embeddings.aembed_documents_with_misses(texts)
+    return await embeddings.aembed_documents(texts), texts
+
+
+class ChunkIndex:
+    """
+    Chunks of a set of pages together with their embeddings, held as one contiguous float32
+    matrix of unit rows. Building the index embeds every chunk once; each query is then
+    scored with a single matrix-vector product, so a corpus shared by several sub-queries
+    is split and embedded only once per research run. With a DocumentIndex, the chunks of
+    local documents are stored with their embeddings and reused across runs.
+    """
+
+    def __init__(self, chunks: List[Document], embeddings):
+        self.chunks = chunks
+        matrix = np.zeros((0, 0), dtype=np.float32)
+        if chunks:
+            matrix = np.ascontiguousarray(np.asarray(embeddings, dtype=np.float32).reshape(len(chunks), -1))
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        self.matrix = matrix / np.where(norms == 0, 1, norms)
+
+    def __len__(self):
+        return len(self.chunks)
+
+    @staticmethod
+    def split_pages(pages: List[Dict]) -> List[Document]:
+        splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=100)
+        return splitter.split_documents([
+            Document(
+                page_content=page.get("raw_content", ""),
+                metadata={"title": page.get("title", ""), "source": page.get("url", "")},
+            )
+            for page in pages
+        ])
+
+    @classmethod
+    async def from_pages(cls, pages: List[Dict], embeddings, document_index=None,
+                         cost_callback=None) -> "ChunkIndex":
+        """
+        Splits the pages the same way ContextCompressor does and embeds all chunks in one call.
+        Pages of local documents carry the (path, mtime, size) of their file as `file`; with a
+        `document_index`, the chunks and embeddings of unchanged files are read from it, and
+        those of the other files are stored in it once embedded.
+        """
+        model = getattr(embeddings, "namespace", None) or get_model_name(embeddings)
+        files: Dict[tuple, List[Dict]] = {}
+        other_pages = []
+        for page in pages:
+            if document_index is not None and page.get("file"):
+                files.setdefault(tuple(page["file"]), []).append(page)
+            else:
+                other_pages.append(page)
+
+        chunks, matrices = [], []
+        new_groups = [(None, await asyncio.to_thread(cls.split_pages, other_pages))]
+        for file, file_pages in files.items():
+            stored = await asyncio.to_thread(document_index.get_chunks, *file, model)
+            if stored is None:
+                new_groups.append((file, await asyncio.to_thread(cls.split_pages, file_pages)))
+                continue
+            stored_chunks, vectors = stored
+            chunks.extend(Document(**chunk) for chunk in stored_chunks)
+            matrices.append(vectors)
+
+        new_chunks = [chunk for _, group in new_groups for chunk in group]
+        if new_chunks:
+            vectors, embedded = await embed_documents(embeddings, [chunk.page_content for chunk in new_chunks])
+            if cost_callback and embedded:
+                cost_callback(estimate_embedding_cost(model=OPENAI_EMBEDDING_MODEL, docs=embedded))
+            vectors = np.asarray(vectors, dtype=np.float32).reshape(len(new_chunks), -1)
+            start = 0
+            for file, group in new_groups:
+                group_vectors = vectors[start:start + len(group)]
+                start += len(group)
+                if file is not None:
+                    await asyncio.to_thread(
+                        document_index.set_chunks, *file, model,
+                        [{"page_content": chunk.page_content, "metadata": chunk.metadata} for chunk in group],
+                        group_vectors,
+                    )
+            chunks.extend(new_chunks)
+            matrices.append(vectors)
+
+        return cls(chunks, np.concatenate(matrices) if chunks else [])
+
+    def search(self, query_embedding, similarity_threshold, k=20) -> List[Document]:
+        """
+        Returns the `k` chunks most similar to the query whose cosine similarity exceeds the
+        threshold, most similar first. Mirrors the selection of langchain's EmbeddingsFilter.
+        """
+        if not self.chunks:
+            return []
+        query_vector = np.asarray(query_embedding, dtype=np.float32)
+        norm = np.linalg.norm(query_vector)
+        similarity = self.matrix @ (query_vector / (norm or 1))
+        top = np.argsort(similarity)[::-1][:k]
+        return [self.chunks[i] for i in top if similarity[i] > similarity_threshold]
+
 
 class VectorstoreCompressor:
     def __init__(self, vector_store: VectorStoreWrapper, max_results:int = 7, filter: Optional[dict] = None, **kwargs):
@@ -71,6 +183,59 @@ class ContextCompressor:
         relevant_docs = await asyncio.to_thread(compressed_docs.invoke, query)
         return self.__pretty_print_docs(relevant_docs, max_results)
 
+    async def async_get_context_from_index(self, query, index: ChunkIndex, max_results=5):
+        """
+        Like `async_get_context`, but scores the query against a prebuilt ChunkIndex of the
+        documents instead of splitting and embedding them again.
+        """
+        query_embedding = await self.embeddings.aembed_query(query)
+        relevant_docs = index.search(query_embedding, float(self.similarity_threshold))
+        return self.__pretty_print_docs(relevant_docs, max_results)
+
+    async def async_get_context_from_stream(self, query, pages: AsyncIterator[Dict], max_results=5,
+                                            cost_callback=None):
+        """
+        Streaming variant of `async_get_context`. Each page is split and sent for embedding as
+        soon as it arrives from `pages`, overlapping with the scrapes that are still running,
+        with at most EMBEDDING_CONCURRENCY embedding calls in flight; only the final similarity
+        filter waits for the stream to end. Only chunks missing from the embedding cache are charged.
+        The received pages are appended to `self.documents`.
+        """
+        query_embedding = asyncio.create_task(self.embeddings.aembed_query(query))
+        chunks: List[Document] = []
+        embedding_tasks = []
+        embedded: List[str] = []
+        slots = asyncio.Semaphore(EMBEDDING_CONCURRENCY)
+
+        async def embed(texts):
+            async with slots:
+                vectors, sent = await embed_documents(self.embeddings, texts)
+            embedded.extend(sent)
+            return vectors
+
+        try:
+            async for page in pages:
+                self.documents.append(page)
+                page_chunks = await asyncio.to_thread(ChunkIndex.split_pages, [page])
+                if page_chunks:
+                    chunks.extend(page_chunks)
+                    embedding_tasks.append(asyncio.create_task(
+                        embed([chunk.page_content for chunk in page_chunks])
+                    ))
+
+            chunk_embeddings = [vector for vectors in await asyncio.gather(*embedding_tasks) for vector in vectors]
+            relevant_docs = ChunkIndex(chunks, chunk_embeddings).search(
+                await query_embedding, float(self.similarity_threshold)
+            )
+        except BaseException:
+            for task in [query_embedding, *embedding_tasks]:
+                task.cancel()
+            raise
+
+        if cost_callback and embedded:
+            cost_callback(estimate_embedding_cost(model=OPENAI_EMBEDDING_MODEL, docs=embedded))
+        return self.__pretty_print_docs(relevant_docs, max_results)
+
 
 class WrittenContentCompressor:
     def __init__(self, documents, embeddings, similarity_threshold, **kwargs):
@@ -1,4 +1,5 @@
 from .document import DocumentLoader
+from .index import DocumentIndex, get_document_index
 from .langchain_document import LangChainDocumentLoader
 
-__all__ = ['DocumentLoader', 'LangChainDocumentLoader']
+__all__ = ['DocumentLoader', 'DocumentIndex', 'LangChainDocumentLoader', 'get_document_index']
@@ -1,66 +1,237 @@
 import asyncio
+import logging
 import os
+import signal
+import threading
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import AsyncIterator, Dict, List, Optional
 
 from langchain_community.document_loaders import (
-    PyMuPDFLoader, 
-    TextLoader, 
-    UnstructuredCSVLoader, 
+    PyMuPDFLoader,
+    TextLoader,
+    UnstructuredCSVLoader,
     UnstructuredExcelLoader,
-    UnstructuredMarkdownLoader, 
+    UnstructuredMarkdownLoader,
     UnstructuredPowerPointLoader,
     UnstructuredWordDocumentLoader
 )
 
+from .index import DocumentIndex, get_document_index
+
+logger = logging.getLogger(__name__)
+
+# Seconds a worker may overrun its own parse timeout before the parent gives up on it
+PARSE_TIMEOUT_GRACE = 5
+
+LOADERS = {
+    "pdf": lambda file_path: PyMuPDFLoader(file_path),
+    "txt": lambda file_path: TextLoader(file_path),
+    "doc": lambda file_path: UnstructuredWordDocumentLoader(file_path),
+    "docx": lambda file_path: UnstructuredWordDocumentLoader(file_path),
+    "pptx": lambda file_path: UnstructuredPowerPointLoader(file_path),
+    "csv": lambda file_path: UnstructuredCSVLoader(file_path, mode="elements"),
+    "xls": lambda file_path: UnstructuredExcelLoader(file_path, mode="elements"),
+    "xlsx": lambda file_path: UnstructuredExcelLoader(file_path, mode="elements"),
+    "md": lambda file_path: UnstructuredMarkdownLoader(file_path),
+}
+
+
+class ParseTimeout(Exception):
+    """Raised in a parse worker when a document takes longer than its timeout"""
+
+
+def _raise_parse_timeout(signum, frame):
+    raise ParseTimeout()
+
+
+def parse_document(file_path: str, file_extension: str, timeout: Optional[float] = None) -> List[Dict[str, str]]:
+    """
+    Parses a file into its non-empty pages. Runs in a worker process of the parse pool,
+    so it only takes and returns picklable values. The worker interrupts the parse itself
+    with ParseTimeout after `timeout` seconds (where SIGALRM is available), so a slow
+    document does not take the pool and the other documents down with it.
+    """
+    if not timeout or not hasattr(signal, "setitimer") or threading.current_thread() is not threading.main_thread():
+        return _parse_document(file_path, file_extension)
+    previous = signal.signal(signal.SIGALRM, _raise_parse_timeout)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return _parse_document(file_path, file_extension)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def _parse_document(file_path: str, file_extension: str) -> List[Dict[str, str]]:
+    loader = LOADERS.get(file_extension)
+    if loader is None:
+        return []
+    return [
+        {
+            "raw_content": page.page_content,
+            "url": os.path.basename(page.metadata['source'])
+        }
+        for page in loader(file_path).load()
+        if page.page_content
+    ]
+
+
+_executors: Dict[Optional[int], ProcessPoolExecutor] = {}
+_executors_lock = threading.Lock()
+
+
+def get_parse_executor(max_workers: Optional[int] = None,
+                       broken: Optional[ProcessPoolExecutor] = None) -> ProcessPoolExecutor:
+    """
+    Returns the process pool shared by every DocumentLoader with this number of workers
+    (all cores when None). If `broken` is still the current pool, it is replaced by a fresh
+    one and its workers are terminated, since a worker stuck on a document cannot be
+    interrupted otherwise.
+    """
+    with _executors_lock:
+        executor = _executors.get(max_workers)
+        if executor is None or executor is broken:
+            if executor is not None:
+                processes = list((executor._processes or {}).values())
+                executor.shutdown(wait=False, cancel_futures=True)
+                for process in processes:
+                    process.terminate()
+            executor = _executors[max_workers] = ProcessPoolExecutor(max_workers=max_workers)
+        return executor
+
+
+# Slots of the parse pools; asyncio primitives belong to one event loop
+_slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Optional[int], asyncio.Semaphore]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_parse_slots(max_workers: Optional[int] = None) -> asyncio.Semaphore:
+    """
+    Returns the semaphore that keeps at most one document per worker submitted to the
+    parse pool, so a document's timeout runs from when a worker picks it up rather than
+    from when it was queued.
+    """
+    loop = asyncio.get_running_loop()
+    with _executors_lock:
+        slots = _slots.setdefault(loop, {})
+        if max_workers not in slots:
+            slots[max_workers] = asyncio.Semaphore(max_workers or os.cpu_count() or 1)
+        return slots[max_workers]
+
 
 class DocumentLoader:
 
-    def __init__(self, path):
+    def __init__(self, path, index: Optional[DocumentIndex] = None, max_workers: Optional[int] = None,
+                 timeout: Optional[float] = None):
         self.path = path
+        self.index = index
+        self.max_workers = max_workers
+        self.timeout = timeout
+
+    @classmethod
+    def from_config(cls, cfg, path: Optional[str] = None) -> "DocumentLoader":
+        """Returns the loader of `path` (DOC_PATH by default) with the document index and parse settings of cfg"""
+        return cls(
+            path or cfg.doc_path,
+            get_document_index(cfg),
+            max_workers=cfg.doc_parse_workers,
+            timeout=cfg.doc_parse_timeout,
+        )
+
+    async def load(self, file_paths: Optional[List[str]] = None) -> list:
+        docs = [page async for pages in self.load_stream(file_paths) for page in pages]
 
-    async def load(self) -> list:
-        tasks = []
-        for root, dirs, files in os.walk(self.path):
-            for file in files:
-                file_path = os.path.join(root, file)
-                file_name, file_extension_with_dot = os.path.splitext(file_path)
-                file_extension = file_extension_with_dot.strip(".")
-                tasks.append(self._load_document(file_path, file_extension))
-
-        docs = []
-        for pages in await asyncio.gather(*tasks):
-            for page in pages:
-                if page.page_content:
-                    docs.append({
-                        "raw_content": page.page_content,
-                        "url": os.path.basename(page.metadata['source'])
-                    })
-                    
         if not docs:
             raise ValueError("🤷 Failed to load any documents!")
 
         return docs
 
-    async def _load_document(self, file_path: str, file_extension: str) -> list:
-        ret_data = []
+    async def load_stream(self, file_paths: Optional[List[str]] = None) -> AsyncIterator[List[Dict[str, str]]]:
+        """
+        Yields the pages of each file as soon as it is parsed. Files are parsed in parallel
+        in a process pool, so large folders use all cores and do not block the event loop.
+        Args:
+            file_paths: Files to load, e.g. a newly uploaded one; every file under `path` when None
+        """
+        walk = file_paths is None
+        if walk:
+            file_paths = [
+                os.path.abspath(os.path.join(root, file)) for root, dirs, files in os.walk(self.path) for file in files
+            ]
+        else:
+            file_paths = [os.path.abspath(file_path) for file_path in file_paths]
+
+        tasks = []
+        for file_path in file_paths:
+            file_name, file_extension_with_dot = os.path.splitext(file_path)
+            file_extension = file_extension_with_dot.strip(".")
+            tasks.append(asyncio.create_task(self._load_pages(file_path, file_extension)))
+
         try:
-            loader_dict = {
-                "pdf": PyMuPDFLoader(file_path),
-                "txt": TextLoader(file_path),
-                "doc": UnstructuredWordDocumentLoader(file_path),
-                "docx": UnstructuredWordDocumentLoader(file_path),
-                "pptx": UnstructuredPowerPointLoader(file_path),
-                "csv": UnstructuredCSVLoader(file_path, mode="elements"),
-                "xls": UnstructuredExcelLoader(file_path, mode="elements"),
-                "xlsx": UnstructuredExcelLoader(file_path, mode="elements"),
-                "md": UnstructuredMarkdownLoader(file_path)
-            }
-
-            loader = loader_dict.get(file_extension, None)
-            if loader:
-                ret_data = loader.load()
-
-        except Exception as e:
-            print(f"Failed to load document : {file_path}")
-            print(e)
-
-        return ret_data
+            for task in asyncio.as_completed(tasks):
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        if self.index and walk:
+            # Forget files that were deleted since the last run
+            await asyncio.to_thread(self.index.prune, os.path.abspath(self.path), file_paths)
+
+    async def _load_pages(self, file_path: str, file_extension: str) -> list:
+        """
+        Returns the non-empty pages of the file. With an index, files whose mtime and size
+        have not changed since they were last parsed are served from it instead. Each page
+        carries the (path, mtime, size) of its file as `file`, under which its chunks and
+        embeddings are stored in the index.
+        """
+        if file_extension not in LOADERS:
+            return []
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return []
+
+        file = [file_path, stat.st_mtime, stat.st_size]
+        if self.index:
+            pages = await asyncio.to_thread(self.index.get, *file)
+            if pages is not None:
+                return [{**page, "file": file} for page in pages]
+
+        pages = await self._load_document(file_path, file_extension)
+
+        if self.index and pages:
+            await asyncio.to_thread(self.index.set, *file, pages)
+        return [{**page, "file": file} for page in pages]
+
+    async def _load_document(self, file_path: str, file_extension: str) -> list:
+        loop = asyncio.get_running_loop()
+        deadline = self.timeout + PARSE_TIMEOUT_GRACE if self.timeout else None
+        async with get_parse_slots(self.max_workers):
+            for attempt in range(2):
+                executor = get_parse_executor(self.max_workers)
+                try:
+                    future = loop.run_in_executor(executor, parse_document, file_path, file_extension, self.timeout)
+                    return await asyncio.wait_for(future, deadline)
+
+                except ParseTimeout:
+                    logger.warning(f"Skipped {file_path}: parsing took longer than {self.timeout} seconds")
+                except asyncio.TimeoutError:
+                    # The worker is stuck where its own timeout cannot interrupt it, e.g. in native
+                    # code; recycle the pool to stop it. Documents parsed by the other workers are retried.
+                    get_parse_executor(self.max_workers, broken=executor)
+                    logger.warning(f"Skipped {file_path}: parsing took longer than {self.timeout} seconds")
+                except BrokenProcessPool as e:
+                    # A worker died, e.g. on a malformed file, or the pool was recycled after another
+                    # document got stuck; start a fresh pool and parse the file once more
+                    get_parse_executor(self.max_workers, broken=executor)
+                    if attempt == 0:
+                        continue
+                    logger.warning(f"Failed to load document {file_path}: {e}")
+                except Exception as e:
+                    logger.warning(f"Failed to load document {file_path}: {e}")
+                return []
+        return []
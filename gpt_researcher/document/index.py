@@ -0,0 +1,108 @@
+import json
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+
+class DocumentIndex:
+    """
+    Persistent index of the documents parsed from DOC_PATH, keyed by file path.
+
+    Each entry stores the parsed pages of a file together with the file's mtime and size
+    when it was parsed, so a file only needs to be parsed again when it changes. The chunks
+    of a file and their embeddings are stored alongside, per embedding model, so unchanged
+    files are neither split nor embedded again after a restart. Entries of files that no
+    longer exist are evicted with `prune`.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, mtime REAL NOT NULL, size INTEGER NOT NULL, pages TEXT NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS chunks (path TEXT NOT NULL, model TEXT NOT NULL, mtime REAL NOT NULL, "
+            "size INTEGER NOT NULL, chunks TEXT NOT NULL, vectors BLOB NOT NULL, PRIMARY KEY (path, model))"
+        )
+        self._conn.commit()
+
+    def get(self, file_path: str, mtime: float, size: int) -> Optional[List[Dict[str, str]]]:
+        """Returns the pages parsed from the file, or None if it is unknown or has changed since"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT pages FROM files WHERE path = ? AND mtime = ? AND size = ?", (file_path, mtime, size)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, file_path: str, mtime: float, size: int, pages: List[Dict[str, str]]) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)", (file_path, mtime, size, json.dumps(pages))
+            )
+            # Chunks of an earlier version of the file are outdated
+            self._conn.execute(
+                "DELETE FROM chunks WHERE path = ? AND (mtime != ? OR size != ?)", (file_path, mtime, size)
+            )
+            self._conn.commit()
+
+    def get_chunks(self, file_path: str, mtime: float, size: int,
+                   model: str) -> Optional[Tuple[List[Dict], np.ndarray]]:
+        """
+        Returns the chunks of the file, as {"page_content", "metadata"} dicts, and the matrix of
+        their embeddings by `model`, or None if they are not stored for this version of the file
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT chunks, vectors FROM chunks WHERE path = ? AND model = ? AND mtime = ? AND size = ?",
+                (file_path, model, mtime, size),
+            ).fetchone()
+        if row is None:
+            return None
+        chunks = json.loads(row[0])
+        return chunks, np.frombuffer(row[1], dtype=np.float32).reshape(len(chunks), -1)
+
+    def set_chunks(self, file_path: str, mtime: float, size: int, model: str,
+                   chunks: List[Dict], vectors) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO chunks VALUES (?, ?, ?, ?, ?, ?)",
+                (file_path, model, mtime, size, json.dumps(chunks), np.asarray(vectors, dtype=np.float32).tobytes()),
+            )
+            self._conn.commit()
+
+    def prune(self, directory: str, existing: Iterable[str]) -> None:
+        """Evicts the entries under `directory` whose file is not in `existing`"""
+        prefix = os.path.join(directory, "")
+        existing = set(existing)
+        with self._lock:
+            stale = [
+                (path,) for (path,) in self._conn.execute("SELECT path FROM files").fetchall()
+                if path.startswith(prefix) and path not in existing
+            ]
+            if stale:
+                self._conn.executemany("DELETE FROM files WHERE path = ?", stale)
+                self._conn.executemany("DELETE FROM chunks WHERE path = ?", stale)
+                self._conn.commit()
+
+
+_indexes: Dict[str, DocumentIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_document_index(cfg) -> Optional[DocumentIndex]:
+    """Returns the process-wide document index configured by cfg, or None if it is disabled"""
+    if not cfg or not cfg.doc_index:
+        return None
+    path = os.path.abspath(os.path.join(cfg.cache_dir, "document_index.sqlite3"))
+    with _indexes_lock:
+        if path not in _indexes:
+            _indexes[path] = DocumentIndex(path)
+        return _indexes[path]
@@ -1,5 +1,7 @@
 from .generic import GenericLLMProvider
+from .registry import get_llm_provider
 
 __all__ = [
     "GenericLLMProvider",
+    "get_llm_provider",
 ]
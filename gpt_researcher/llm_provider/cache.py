@@ -0,0 +1,213 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+def serialize_messages(messages: list) -> List[Tuple[str, str]]:
+    """Turns OpenAI style message dicts and langchain messages into (role, content) pairs"""
+    serialized = []
+    for message in messages:
+        if isinstance(message, dict):
+            serialized.append((str(message.get("role")), str(message.get("content"))))
+        else:
+            serialized.append((str(getattr(message, "type", type(message).__name__)),
+                               str(getattr(message, "content", message))))
+    return serialized
+
+
+class LLMCache:
+    """
+    Cache of chat completions, in two tiers.
+
+    The exact tier is keyed by the hash of (provider, model, messages, params) and serves
+    repeats of the very same prompt; its entries are kept in an in-memory LRU and, when
+    `path` is given, in a SQLite file so they survive restarts. The optional semantic tier
+    keeps the embedding of each prompt and serves prompts whose embedding is at least
+    `similarity_threshold` cosine-similar to a cached one with the same provider, model and
+    params; it lives in memory only. Each tier expires its entries after its own TTL.
+
+    Every entry remembers the estimated cost of the completion, so hits can report the cost
+    they saved. The cache is thread-safe.
+    """
+
+    def __init__(self, ttl: int = 3600, max_entries: int = 1024, path: Optional[str] = None,
+                 semantic_ttl: Optional[int] = None, similarity_threshold: float = 0.97):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.path = path
+        self.semantic_ttl = semantic_ttl
+        self.similarity_threshold = similarity_threshold
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.saved_cost = 0.0
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        # namespace -> key -> (normalized embedding, response, cost, expires_at)
+        self._semantic: Dict[str, "OrderedDict[str, tuple]"] = {}
+        self._lock = threading.Lock()
+        self._conn = None
+
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS completions "
+                "(key TEXT PRIMARY KEY, response TEXT NOT NULL, cost REAL NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._conn.execute("DELETE FROM completions WHERE expires_at <= ?", (time.time(),))
+            self._conn.commit()
+
+    @property
+    def semantic(self) -> bool:
+        return bool(self.semantic_ttl)
+
+    @staticmethod
+    def get_namespace(provider: Optional[str], model: str, params: Dict[str, Any]) -> str:
+        """Identifies everything but the messages; only prompts of the same namespace are similar"""
+        payload = json.dumps([provider, model, params], sort_keys=True, default=repr)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def get_key(namespace: str, messages: list) -> str:
+        payload = json.dumps([namespace, serialize_messages(messages)], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Tuple[str, float]]:
+        """Returns the cached (response, cost) of the key, or None on a miss"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and entry[2] <= now:
+                del self._memory[key]
+                entry = None
+
+            if entry is None and self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT response, cost, expires_at FROM completions WHERE key = ? AND expires_at > ?", (key, now)
+                ).fetchone()
+                if row is not None:
+                    entry = row
+                    self._remember(key, entry)
+
+            if entry is None:
+                return None
+
+            self._memory.move_to_end(key)
+            self.hits += 1
+            self.saved_cost += entry[1]
+        return entry[0], entry[1]
+
+    def set(self, key: str, response: str, cost: float) -> None:
+        entry = (response, cost, time.time() + self.ttl)
+        with self._lock:
+            self._remember(key, entry)
+            if self._conn is not None:
+                self._conn.execute("INSERT OR REPLACE INTO completions VALUES (?, ?, ?, ?)", (key, *entry))
+                self._conn.commit()
+
+    def get_similar(self, namespace: str, embedding: List[float]) -> Optional[Tuple[str, float]]:
+        """Returns the (response, cost) of the most similar cached prompt above the threshold, if any"""
+        vector = self._normalize(embedding)
+        now = time.time()
+        with self._lock:
+            entries = self._semantic.get(namespace)
+            if not entries:
+                return None
+            for key in [key for key, entry in entries.items() if entry[3] <= now]:
+                del entries[key]
+            if not entries:
+                return None
+
+            keys = list(entries)
+            similarities = np.stack([entries[key][0] for key in keys]) @ vector
+            best = int(np.argmax(similarities))
+            if similarities[best] < self.similarity_threshold:
+                return None
+
+            entries.move_to_end(keys[best])
+            _, response, cost, _ = entries[keys[best]]
+            self.semantic_hits += 1
+            self.saved_cost += cost
+        return response, cost
+
+    def set_similar(self, namespace: str, key: str, embedding: List[float], response: str, cost: float) -> None:
+        entry = (self._normalize(embedding), response, cost, time.time() + self.semantic_ttl)
+        with self._lock:
+            entries = self._semantic.setdefault(namespace, OrderedDict())
+            entries[key] = entry
+            entries.move_to_end(key)
+            while len(entries) > self.max_entries:
+                entries.popitem(last=False)
+
+    def record_miss(self) -> None:
+        with self._lock:
+            self.misses += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "semantic_hits": self.semantic_hits,
+                "misses": self.misses,
+                "saved_cost": self.saved_cost,
+                "entries": len(self._memory),
+                "semantic_entries": sum(len(entries) for entries in self._semantic.values()),
+            }
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _remember(self, key: str, entry: tuple) -> None:
+        """Adds the entry to the in-memory LRU. Caller holds the lock."""
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+
+_caches: Dict[tuple, LLMCache] = {}
+_embeddings: Dict[Optional[str], Any] = {}
+_caches_lock = threading.Lock()
+
+
+def get_llm_cache(cfg) -> Optional[LLMCache]:
+    """Returns the process-wide LLM response cache configured by cfg, or None if caching is disabled"""
+    if not cfg or not getattr(cfg, "llm_cache", False):
+        return None
+    path = None
+    if cfg.llm_cache_backend == "sqlite":
+        path = os.path.abspath(os.path.join(cfg.cache_dir, "llm_cache.sqlite3"))
+    semantic_ttl = cfg.llm_cache_semantic_ttl if cfg.llm_cache_semantic else None
+    key = (path, cfg.llm_cache_ttl, cfg.llm_cache_max_entries, semantic_ttl, cfg.llm_cache_similarity_threshold)
+    with _caches_lock:
+        if key not in _caches:
+            _caches[key] = LLMCache(
+                ttl=cfg.llm_cache_ttl,
+                max_entries=cfg.llm_cache_max_entries,
+                path=path,
+                semantic_ttl=semantic_ttl,
+                similarity_threshold=cfg.llm_cache_similarity_threshold,
+            )
+        return _caches[key]
+
+
+def get_prompt_embeddings(cfg):
+    """Returns the embeddings model of the semantic tier, shared by every call with the same provider"""
+    from gpt_researcher.memory import Memory
+
+    provider = getattr(cfg, "embedding_provider", None)
+    with _caches_lock:
+        if provider not in _embeddings:
+            _embeddings[provider] = Memory(provider, cfg=cfg).get_embeddings()
+        return _embeddings[provider]
@@ -3,6 +3,8 @@ from typing import Any
 from colorama import Fore, Style, init
 import os
 
+from gpt_researcher.utils.tokens import get_token_usage
+
 class GenericLLMProvider:
 
     def __init__(self, llm):
@@ -90,22 +92,34 @@ class GenericLLMProvider:
         return cls(llm)
 
 
-    async def get_chat_response(self, messages, stream, websocket=None):
+    async def get_chat_response(self, messages, stream, websocket=None, usage=None):
+        """
+        Returns the response to the messages. If `usage` is a dict, it receives the token usage
+        reported by the provider, if any, as "input_tokens" and "output_tokens".
+        """
         if not stream:
             # Getting output from the model chain using ainvoke for asynchronous invoking
             output = await self.llm.ainvoke(messages)
+            if usage is not None:
+                usage.update(get_token_usage(output) or {})
 
             return output.content
 
         else:
-            return await self.stream_response(messages, websocket)
+            return await self.stream_response(messages, websocket, usage=usage)
 
-    async def stream_response(self, messages, websocket=None):
+    async def stream_response(self, messages, websocket=None, chunks=None, usage=None):
+        """Streams the response to the websocket; `chunks` is an already opened stream, if any"""
         paragraph = ""
         response = ""
 
         # Streaming the response using the chain astream method from langchain
-        async for chunk in self.llm.astream(messages):
+        async for chunk in (chunks if chunks is not None else self.llm.astream(messages)):
+            chunk_usage = getattr(chunk, "usage_metadata", None)
+            if usage is not None and chunk_usage:
+                # Providers report usage on the first and/or last chunk
+                for key in ("input_tokens", "output_tokens"):
+                    usage[key] = usage.get(key, 0) + (chunk_usage.get(key) or 0)
             content = chunk.content
             if content is not None:
                 response += content
@@ -0,0 +1,87 @@
+"""
+Process-wide registry of LLM providers.
+
+Building a provider creates a new chat model object and, with it, a new HTTP client, so every
+call would pay the TLS handshake to the LLM endpoint again. Providers are instead built once
+per (provider, model, temperature, max_tokens, kwargs) and reused by every later call.
+Chat models read their API keys and endpoints from the environment, which the server
+updates at runtime, so those environment variables are part of the key as well.
+
+The async HTTP clients inside the chat models are bound to the event loop that first used
+them, so there is one registry per event loop, as for the shared HTTP clients in
+`gpt_researcher.utils.http`. The number of providers kept per loop is capped by the
+LLM_REGISTRY_MAX_ENTRIES config key; the least recently used one is dropped beyond it.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import re
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from .generic import GenericLLMProvider
+
+# Environment variables holding credentials or endpoints of the providers
+CREDENTIAL_ENV_PATTERN = re.compile(r"KEY|TOKEN|SECRET|BASE|ENDPOINT|URL|VERSION|REGION|PROJECT|LOCATION")
+
+_registries: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, OrderedDict]" = weakref.WeakKeyDictionary()
+# Providers used outside of an event loop, e.g. by synchronous chains
+_sync_registry: "OrderedDict[str, GenericLLMProvider]" = OrderedDict()
+_registry_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0}
+
+
+def get_registry_key(provider: str, **kwargs: Any) -> str:
+    credentials = hashlib.sha256(json.dumps(
+        sorted((name, value) for name, value in os.environ.items() if CREDENTIAL_ENV_PATTERN.search(name))
+    ).encode("utf-8")).hexdigest()
+    return json.dumps([provider, kwargs, credentials], sort_keys=True, default=repr)
+
+
+def get_llm_provider(provider: str, cfg=None, **kwargs: Any) -> GenericLLMProvider:
+    """
+    Returns the provider for these settings, building it on first use.
+    Construction never awaits, so concurrent coroutines of one loop cannot build the same
+    provider twice; the lock only guards against other threads.
+    Args:
+        cfg: Config capping the registry size, the default config when None
+    """
+    if cfg is None:
+        from gpt_researcher.config import Config
+        cfg = Config.get_default()
+    key = get_registry_key(provider, **kwargs)
+    try:
+        loop: Optional[asyncio.AbstractEventLoop] = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+
+    with _registry_lock:
+        registry = _sync_registry if loop is None else _registries.setdefault(loop, OrderedDict())
+        llm_provider = registry.get(key)
+        if llm_provider is not None:
+            registry.move_to_end(key)
+            _stats["hits"] += 1
+            return llm_provider
+
+        _stats["misses"] += 1
+        llm_provider = GenericLLMProvider.from_provider(provider, **kwargs)
+        registry[key] = llm_provider
+        while len(registry) > cfg.llm_registry_max_entries:
+            registry.popitem(last=False)
+        return llm_provider
+
+
+def get_llm_registry_stats() -> Dict[str, int]:
+    with _registry_lock:
+        entries = len(_sync_registry) + sum(len(registry) for registry in _registries.values())
+        return {**_stats, "entries": entries}
+
+
+def clear_llm_registry() -> None:
+    """Drops every cached provider, e.g. after API keys were changed"""
+    with _registry_lock:
+        _registries.clear()
+        _sync_registry.clear()
@@ -0,0 +1,290 @@
+"""
+Retries, concurrency caps and hedged requests for LLM calls.
+
+Transient failures (429, 5xx, timeouts and dropped connections) are retried with exponential
+backoff and full jitter, waiting out the Retry-After the API asks for. Concurrent calls are
+capped per provider, so a burst of report sections queues locally instead of running into
+rate limits.
+
+Hedging cuts the latency tail: once enough calls to a model were timed, a call that is still
+pending after the LLM_HEDGE_QUANTILE latency (p95 by default) gets a second, identical call,
+and whichever answers first wins while the other is cancelled. Streamed calls are timed and
+hedged up to their first chunk, since that is when the output starts reaching the user. A
+stream that already sent output is never retried, as the output would be sent twice.
+"""
+import asyncio
+import logging
+import random
+import threading
+import time
+import weakref
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+from gpt_researcher.scraper.pool import parse_retry_after
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS_CODES = frozenset({408, 409, 425, 429, 500, 502, 503, 504, 529})
+# Exceptions without a status code that are worth retrying, matched by class name
+RETRYABLE_ERROR_NAMES = ("Timeout", "Connection", "RateLimit", "Overloaded", "ServiceUnavailable", "InternalServer")
+
+# Number of timed calls per model kept to estimate the hedging threshold, and needed before hedging
+LATENCY_WINDOW = 200
+HEDGE_MIN_SAMPLES = 20
+
+
+@dataclass
+class RetryPolicy:
+    max_retries: int = 3
+    base_delay: float = 1.0
+    max_delay: float = 30.0
+    max_retry_after: float = 60.0
+    max_concurrency: int = 16
+    hedge: bool = False
+    hedge_quantile: float = 0.95
+    fallback_provider: Optional[str] = None
+    fallback_model: Optional[str] = None
+
+    @classmethod
+    def from_config(cls, cfg) -> "RetryPolicy":
+        if cfg is None:
+            return cls()
+        return cls(
+            max_retries=cfg.llm_max_retries,
+            base_delay=cfg.llm_retry_base_delay,
+            max_delay=cfg.llm_retry_max_delay,
+            max_retry_after=cfg.llm_max_retry_after,
+            max_concurrency=cfg.llm_max_concurrency,
+            hedge=cfg.llm_hedge,
+            hedge_quantile=cfg.llm_hedge_quantile,
+            fallback_provider=cfg.llm_fallback_provider,
+            fallback_model=cfg.llm_fallback_model,
+        )
+
+
+class PartialResponseError(Exception):
+    """Raised when a streamed response fails after part of it was sent"""
+
+
+def get_status_code(error: BaseException) -> Optional[int]:
+    status_code = getattr(error, "status_code", None)
+    if status_code is None:
+        status_code = getattr(getattr(error, "response", None), "status_code", None)
+    return status_code if isinstance(status_code, int) else None
+
+
+def get_retry_after(error: BaseException) -> Optional[float]:
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return max(float(retry_after_ms) / 1000, 0)
+        except ValueError:
+            pass
+    return parse_retry_after(headers.get("retry-after"))
+
+
+def is_retryable(error: BaseException) -> bool:
+    if isinstance(error, PartialResponseError):
+        return False
+    status_code = get_status_code(error)
+    if status_code is not None:
+        return status_code in RETRYABLE_STATUS_CODES
+    if isinstance(error, (asyncio.TimeoutError, ConnectionError)):
+        return True
+    return any(name in type(error).__name__ for name in RETRYABLE_ERROR_NAMES)
+
+
+def backoff_delay(attempt: int, policy: RetryPolicy, retry_after: Optional[float] = None) -> float:
+    """Exponential backoff with full jitter, or the Retry-After asked for by the API"""
+    if retry_after is not None:
+        return retry_after
+    return random.uniform(0, min(policy.max_delay, policy.base_delay * 2 ** attempt))
+
+
+class LatencyTracker:
+    """Keeps the latest latencies of each model to estimate its latency quantiles"""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self.window = window
+        self._samples: Dict[tuple, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, key: tuple, seconds: float) -> None:
+        with self._lock:
+            self._samples.setdefault(key, deque(maxlen=self.window)).append(seconds)
+
+    def quantile(self, key: tuple, q: float, min_samples: int = HEDGE_MIN_SAMPLES) -> Optional[float]:
+        """Returns the q-quantile of the latencies of the key, or None with too few samples"""
+        with self._lock:
+            samples = sorted(self._samples.get(key, ()))
+        if len(samples) < min_samples:
+            return None
+        return samples[min(int(q * len(samples)), len(samples) - 1)]
+
+
+latency_tracker = LatencyTracker()
+
+# Semaphores capping concurrent calls per provider; asyncio primitives belong to one event loop
+_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[tuple, asyncio.Semaphore]]" = (
+    weakref.WeakKeyDictionary()
+)
+_semaphores_lock = threading.Lock()
+
+
+def get_provider_semaphore(provider: str, limit: int) -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    with _semaphores_lock:
+        semaphores = _semaphores.setdefault(loop, {})
+        key = (provider, limit)
+        if key not in semaphores:
+            semaphores[key] = asyncio.Semaphore(limit)
+        return semaphores[key]
+
+
+async def hedge(call: Callable[[], Awaitable[Any]], delay: Optional[float],
+                discard: Optional[Callable[[Any], Awaitable[None]]] = None,
+                backup: Optional[Callable[[], Awaitable[Any]]] = None) -> Any:
+    """
+    Awaits `call()`, starting a second call (`backup()`, by default `call()`) if the first is
+    still pending after `delay` seconds, and returns the first successful result. A failure
+    is only raised once both calls failed. The slower call is cancelled, or, if it succeeded
+    as well, passed to `discard`.
+    """
+    first = asyncio.ensure_future(call())
+    if delay is None:
+        return await first
+    done, _ = await asyncio.wait({first}, timeout=delay)
+    if done:
+        return first.result()
+
+    tasks = [first, asyncio.ensure_future((backup or call)())]
+    winner = None
+    try:
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            winner = next((task for task in tasks if task in done and task.exception() is None), None)
+            if winner is not None:
+                return winner.result()
+        raise first.exception()
+    finally:
+        for task in tasks:
+            if task is winner:
+                continue
+            task.cancel()
+            try:
+                result = await task
+            except BaseException:
+                continue
+            if discard is not None:
+                await discard(result)
+
+
+async def open_stream(llm, messages) -> Tuple[Any, AsyncIterator]:
+    """Starts streaming a response and waits for its first chunk"""
+    chunks = llm.astream(messages).__aiter__()
+    try:
+        first = await chunks.__anext__()
+    except StopAsyncIteration:
+        first = None
+    except BaseException:
+        await close_stream((None, chunks))
+        raise
+    return first, chunks
+
+
+async def close_stream(stream: Tuple[Any, AsyncIterator]) -> None:
+    aclose = getattr(stream[1], "aclose", None)
+    if aclose is not None:
+        try:
+            await aclose()
+        except Exception:
+            pass
+
+
+async def chain_chunks(first, chunks: AsyncIterator) -> AsyncIterator:
+    """Yields the first chunk and the rest of the stream, marking failures after the first chunk"""
+    if first is None:
+        return
+    yield first
+    try:
+        async for chunk in chunks:
+            yield chunk
+    except Exception as e:
+        raise PartialResponseError(f"Stream failed after sending output: {e}") from e
+
+
+async def get_chat_response(provider, provider_name: str, model: str, messages, stream: bool,
+                            websocket, policy: RetryPolicy, queue=None, tokens: int = 0,
+                            usage: Optional[dict] = None) -> str:
+    """
+    Gets the response of `provider` (a `GenericLLMProvider`) like its `get_chat_response`,
+    retrying transient failures, capping concurrent calls to the provider and hedging slow
+    calls as configured by `policy`. With the `queue` of the model (see `scheduler`), every
+    call, retry and hedge first waits for `tokens` of its budget. `usage` receives the token
+    usage of the successful call, as in `GenericLLMProvider.get_chat_response`.
+    """
+    semaphore = get_provider_semaphore(provider_name, policy.max_concurrency)
+    latency_key = (provider_name, model, "stream" if stream else "invoke")
+
+    async def timed(call):
+        async with semaphore:
+            start = time.monotonic()
+            result = await call()
+            latency_tracker.record(latency_key, time.monotonic() - start)
+            return result
+
+    async def invoke():
+        # Each call of a hedge has its own usage, only the winner's is kept
+        call_usage = {}
+        content = await timed(lambda: provider.get_chat_response(messages, False, usage=call_usage))
+        return content, call_usage
+
+    async def scheduled(call):
+        if queue is not None:
+            await queue.acquire(tokens)
+        return await call()
+
+    for attempt in range(policy.max_retries + 1):
+        delay = latency_tracker.quantile(latency_key, policy.hedge_quantile) if policy.hedge else None
+        try:
+            # Waiting for the budget is not part of the latency that triggers a hedge
+            if queue is not None:
+                await queue.acquire(tokens)
+            if not stream:
+                content, call_usage = await hedge(invoke, delay, backup=lambda: scheduled(invoke))
+                if usage is not None:
+                    usage.update(call_usage)
+                return content
+
+            # The stream keeps its slot until it is fully sent
+            await semaphore.acquire()
+            try:
+                start = time.monotonic()
+                stream_call = lambda: open_stream(provider.llm, messages)
+                first, chunks = await hedge(
+                    stream_call, delay, discard=close_stream, backup=lambda: scheduled(stream_call)
+                )
+                latency_tracker.record(latency_key, time.monotonic() - start)
+                return await provider.stream_response(
+                    messages, websocket, chunks=chain_chunks(first, chunks), usage=usage
+                )
+            finally:
+                semaphore.release()
+        except Exception as e:
+            if not is_retryable(e) or attempt == policy.max_retries:
+                raise
+            retry_after = get_retry_after(e)
+            if retry_after is not None and retry_after > policy.max_retry_after:
+                raise
+            wait = backoff_delay(attempt, policy, retry_after)
+            logger.warning(
+                f"{provider_name} call failed ({type(e).__name__}: {e}), retrying in {wait:.1f}s "
+                f"({attempt + 1}/{policy.max_retries})"
+            )
+            await asyncio.sleep(wait)
@@ -0,0 +1,223 @@
+"""
+Scheduler of LLM calls with per-model request and token budgets.
+
+Every call to a model waits for its share of the model's requests-per-minute and
+tokens-per-minute budgets, configured by LLM_REQUESTS_PER_MINUTE, LLM_TOKENS_PER_MINUTE and
+per provider or model by LLM_RATE_LIMITS. The budgets refill continuously and allow bursts
+of BURST_SECONDS worth of calls, so calls are spread evenly over the minute instead of
+being sent at once and answered with 429s.
+
+Calls waiting for a budget are served by lane. Interactive reports (research_report and the
+other single-agent report types) are ahead of background work (detailed reports, their
+subtopics and multi_agents runs): a background call is queued as if it had arrived
+LANE_HEADSTART seconds later, so interactive calls overtake it without starving it.
+The lane of a call is taken from the `llm_lane` context it runs in.
+
+Budgets and queues are kept per event loop, i.e. for the whole server process.
+"""
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+LANES = (INTERACTIVE, BACKGROUND)
+
+BACKGROUND_REPORT_TYPES = frozenset({"detailed_report", "subtopic_report", "multi_agents"})
+
+# Seconds of queueing after which a background call is served before newer interactive calls
+LANE_HEADSTART = {INTERACTIVE: 0.0, BACKGROUND: 30.0}
+
+# Seconds of budget that may be spent at once
+BURST_SECONDS = 10
+
+# Rough size of a token, to estimate prompt sizes without a tokenizer
+CHARS_PER_TOKEN = 4
+
+_lane: ContextVar[Optional[str]] = ContextVar("llm_lane", default=None)
+
+
+def get_lane(report_type: Optional[str]) -> str:
+    return BACKGROUND if report_type in BACKGROUND_REPORT_TYPES else INTERACTIVE
+
+
+@contextmanager
+def llm_lane(report_type: Optional[str]) -> Iterator[str]:
+    """
+    Runs the LLM calls of the block in the lane of the report type. An enclosing lane takes
+    precedence, e.g. the researchers of a detailed report stay in the background lane.
+    """
+    if _lane.get() is not None:
+        yield _lane.get()
+        return
+    token = _lane.set(get_lane(report_type))
+    try:
+        yield _lane.get()
+    finally:
+        _lane.reset(token)
+
+
+def estimate_request_tokens(messages: list, max_tokens: Optional[int] = None) -> int:
+    """
+    Tokens a call counts against the budget: its prompt plus `max_tokens`, which providers
+    reserve for the completion when rate limiting.
+    """
+    characters = sum(len(str(getattr(message, "content", None) or message)) for message in messages)
+    return characters // CHARS_PER_TOKEN + (max_tokens or 0)
+
+
+class Budget:
+    """Token bucket refilled continuously at `per_minute` units a minute"""
+
+    def __init__(self, per_minute: float):
+        self.per_minute = per_minute
+        self.capacity = max(per_minute * BURST_SECONDS / 60, 1)
+        self.available = self.capacity
+        self.updated_at = time.monotonic()
+
+    def configure(self, per_minute: float) -> None:
+        self._refill()
+        self.per_minute = per_minute
+        self.capacity = max(per_minute * BURST_SECONDS / 60, 1)
+        self.available = min(self.available, self.capacity)
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` is available; amounts above the capacity need a full bucket"""
+        self._refill()
+        missing = min(amount, self.capacity) - self.available
+        return max(missing, 0) * 60 / self.per_minute
+
+    def take(self, amount: float) -> None:
+        self.available -= min(amount, self.capacity)
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.available = min(self.capacity, self.available + (now - self.updated_at) * self.per_minute / 60)
+        self.updated_at = now
+
+
+class ModelQueue:
+    """Queue of the calls to one model, granting them as its budgets allow"""
+
+    def __init__(self, requests_per_minute: Optional[float], tokens_per_minute: Optional[float]):
+        self.requests: Optional[Budget] = None
+        self.tokens: Optional[Budget] = None
+        self.configure(requests_per_minute, tokens_per_minute)
+        self.granted = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self._waiters: list = []
+        self._counter = itertools.count()
+        self._dispatcher: Optional[asyncio.Task] = None
+
+    def configure(self, requests_per_minute: Optional[float], tokens_per_minute: Optional[float]) -> None:
+        for name, per_minute in (("requests", requests_per_minute), ("tokens", tokens_per_minute)):
+            budget = getattr(self, name)
+            if not per_minute:
+                setattr(self, name, None)
+            elif budget is None:
+                setattr(self, name, Budget(per_minute))
+            elif budget.per_minute != per_minute:
+                budget.configure(per_minute)
+
+    async def acquire(self, tokens: int) -> None:
+        """Waits until the call may be sent, in the lane of the current context"""
+        if not self._waiters and self._wait_time(tokens) <= 0:
+            self._grant(tokens, 0.0)
+            return
+
+        lane = _lane.get() or INTERACTIVE
+        enqueued_at = time.monotonic()
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(
+            self._waiters, (enqueued_at + LANE_HEADSTART[lane], next(self._counter), lane, tokens, enqueued_at, future)
+        )
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.ensure_future(self._dispatch())
+        await future
+
+    def stats(self) -> Dict[str, Any]:
+        queued = {lane: 0 for lane in LANES}
+        for waiter in self._waiters:
+            if not waiter[-1].done():
+                queued[waiter[2]] += 1
+        return {
+            "requests_per_minute": self.requests.per_minute if self.requests else None,
+            "tokens_per_minute": self.tokens.per_minute if self.tokens else None,
+            "queued": queued,
+            "granted": self.granted,
+            "average_wait": self.total_wait / self.granted if self.granted else 0.0,
+            "max_wait": self.max_wait,
+        }
+
+    async def _dispatch(self) -> None:
+        while self._waiters:
+            _, _, _, tokens, enqueued_at, future = self._waiters[0]
+            if future.done():
+                # Cancelled while waiting
+                heapq.heappop(self._waiters)
+                continue
+            wait = self._wait_time(tokens)
+            if wait > 0:
+                await asyncio.sleep(wait)
+                continue
+            heapq.heappop(self._waiters)
+            self._grant(tokens, time.monotonic() - enqueued_at)
+            future.set_result(None)
+
+    def _wait_time(self, tokens: int) -> float:
+        return max(
+            self.requests.wait_time(1) if self.requests else 0.0,
+            self.tokens.wait_time(tokens) if self.tokens else 0.0,
+        )
+
+    def _grant(self, tokens: int, waited: float) -> None:
+        if self.requests:
+            self.requests.take(1)
+        if self.tokens:
+            self.tokens.take(tokens)
+        self.granted += 1
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+
+
+_queues: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, ModelQueue]]" = weakref.WeakKeyDictionary()
+_queues_lock = threading.Lock()
+
+
+def get_rate_limits(cfg, provider: str, model: str) -> tuple:
+    """Returns the (requests, tokens) per minute of the model; the most specific LLM_RATE_LIMITS entry wins"""
+    limits = {"rpm": cfg.llm_requests_per_minute, "tpm": cfg.llm_tokens_per_minute}
+    for key in (provider, f"{provider}:{model}"):
+        limits.update((cfg.llm_rate_limits or {}).get(key, {}))
+    return limits.get("rpm"), limits.get("tpm")
+
+
+def get_model_queue(cfg, provider: str, model: str) -> Optional[ModelQueue]:
+    """Returns the queue of the model in the running event loop, or None if it has no budget"""
+    if cfg is None:
+        return None
+    requests_per_minute, tokens_per_minute = get_rate_limits(cfg, provider, model)
+    if not requests_per_minute and not tokens_per_minute:
+        return None
+    loop = asyncio.get_running_loop()
+    key = f"{provider}:{model}"
+    with _queues_lock:
+        queues = _queues.setdefault(loop, {})
+        if key not in queues:
+            queues[key] = ModelQueue(requests_per_minute, tokens_per_minute)
+        else:
+            queues[key].configure(requests_per_minute, tokens_per_minute)
+        return queues[key]
+
+
+def get_llm_scheduler_stats() -> Dict[str, Dict[str, Any]]:
+    """Budgets, queue depth per lane and waiting times of every scheduled model"""
+    with _queues_lock:
+        return {key: queue.stats() for queues in _queues.values() for key, queue in queues.items()}
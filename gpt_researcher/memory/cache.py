@@ -0,0 +1,179 @@
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+
+class EmbeddingCache:
+    """
+    Cache of embedding vectors keyed by the hash of the embedding model and the text.
+
+    Vectors are kept as float32 in an in-memory LRU and, when `path` is given, in a
+    SQLite file so they survive restarts. Embeddings of a text never change for a given
+    model, so entries do not expire. The cache is thread-safe since the langchain
+    compressors embed in worker threads.
+    """
+
+    def __init__(self, max_entries: int = 5000, path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS vectors (key TEXT PRIMARY KEY, vector BLOB NOT NULL)")
+            self._conn.commit()
+
+    @staticmethod
+    def get_key(namespace: str, text: str) -> str:
+        return hashlib.sha256(f"{namespace}\0{text}".encode("utf-8")).hexdigest()
+
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        """Returns the cached vectors of the given keys; missing keys are left out"""
+        found = {}
+        with self._lock:
+            missing = []
+            for key in keys:
+                vector = self._memory.get(key)
+                if vector is None:
+                    missing.append(key)
+                else:
+                    self._memory.move_to_end(key)
+                    found[key] = vector
+
+            if missing and self._conn is not None:
+                for start in range(0, len(missing), 500):
+                    batch = missing[start:start + 500]
+                    rows = self._conn.execute(
+                        f"SELECT key, vector FROM vectors WHERE key IN ({','.join('?' * len(batch))})", batch
+                    ).fetchall()
+                    for key, blob in rows:
+                        vector = np.frombuffer(blob, dtype=np.float32)
+                        self._remember(key, vector)
+                        found[key] = vector
+
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def set_many(self, vectors: Dict[str, np.ndarray]) -> None:
+        with self._lock:
+            for key, vector in vectors.items():
+                self._remember(key, vector)
+            if self._conn is not None:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO vectors VALUES (?, ?)",
+                    [(key, vector.tobytes()) for key, vector in vectors.items()],
+                )
+                self._conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._memory)}
+
+    def _remember(self, key: str, vector: np.ndarray) -> None:
+        """Adds the vector to the in-memory LRU. Caller holds the lock."""
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Wraps an embeddings model so that each distinct text is sent to the embedding API once.
+    Texts already in the cache, and duplicates within a batch, are served locally; only the
+    remaining texts are embedded, in a single call. Query embeddings are cached separately
+    from document embeddings since some models embed them differently.
+    """
+
+    def __init__(self, embeddings: Embeddings, cache: EmbeddingCache, namespace: str):
+        self.embeddings = embeddings
+        self.cache = cache
+        self.namespace = namespace
+
+    def __getattr__(self, name):
+        # Expose the attributes of the wrapped model, e.g. `model`
+        if "embeddings" not in self.__dict__:
+            raise AttributeError(name)
+        return getattr(self.__dict__["embeddings"], name)
+
+    def _split(self, kind: str, texts: List[str]):
+        keys = [self.cache.get_key(f"{self.namespace}:{kind}", text) for text in texts]
+        found = self.cache.get_many(keys)
+        pending: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in found and key not in pending:
+                pending[key] = text
+        return keys, found, pending
+
+    def _merge(self, keys, found, pending, vectors) -> List[List[float]]:
+        computed = {key: np.asarray(vector, dtype=np.float32) for key, vector in zip(pending, vectors)}
+        if computed:
+            self.cache.set_many(computed)
+        found.update(computed)
+        return [found[key].tolist() for key in keys]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys, found, pending = self._split("document", texts)
+        vectors = self.embeddings.embed_documents(list(pending.values())) if pending else []
+        return self._merge(keys, found, pending, vectors)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return (await self.aembed_documents_with_misses(texts))[0]
+
+    async def aembed_documents_with_misses(self, texts: List[str]) -> Tuple[List[List[float]], List[str]]:
+        """`aembed_documents`, also returning the texts that were sent to the embedding API"""
+        keys, found, pending = await asyncio.to_thread(self._split, "document", texts)
+        vectors = await self.embeddings.aembed_documents(list(pending.values())) if pending else []
+        return await asyncio.to_thread(self._merge, keys, found, pending, vectors), list(pending.values())
+
+    def embed_query(self, text: str) -> List[float]:
+        keys, found, pending = self._split("query", [text])
+        vectors = [self.embeddings.embed_query(text)] if pending else []
+        return self._merge(keys, found, pending, vectors)[0]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        keys, found, pending = await asyncio.to_thread(self._split, "query", [text])
+        vectors = [await self.embeddings.aembed_query(text)] if pending else []
+        return (await asyncio.to_thread(self._merge, keys, found, pending, vectors))[0]
+
+
+_caches: Dict[tuple, EmbeddingCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_embedding_cache(cfg) -> Optional[EmbeddingCache]:
+    """Returns the process-wide embedding cache configured by cfg, or None if caching is disabled"""
+    if not cfg or not cfg.embedding_cache:
+        return None
+    path = None
+    if cfg.embedding_cache_backend == "sqlite":
+        path = os.path.abspath(os.path.join(cfg.cache_dir, "embedding_cache.sqlite3"))
+    key = (path, cfg.embedding_cache_max_entries)
+    with _caches_lock:
+        if key not in _caches:
+            _caches[key] = EmbeddingCache(max_entries=cfg.embedding_cache_max_entries, path=path)
+        return _caches[key]
+
+
+def get_model_name(embeddings: Embeddings) -> str:
+    """Identifies the embedding model, so vectors of different models never mix in the cache"""
+    for attribute in ("model", "model_name", "deployment"):
+        name = getattr(embeddings, attribute, None)
+        if name:
+            return f"{type(embeddings).__name__}:{name}"
+    return type(embeddings).__name__
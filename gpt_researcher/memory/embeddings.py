@@ -1,11 +1,13 @@
 from langchain_community.vectorstores import FAISS
 import os
 
+from .cache import CachedEmbeddings, get_embedding_cache, get_model_name
+
 OPENAI_EMBEDDING_MODEL = os.environ.get("OPENAI_EMBEDDING_MODEL","text-embedding-3-small")
 
 
 class Memory:
-    def __init__(self, embedding_provider, headers=None, **kwargs):
+    def __init__(self, embedding_provider, headers=None, cfg=None, **kwargs):
         _embeddings = None
         headers = headers or {}
         match embedding_provider:
@@ -54,6 +56,11 @@ class Memory:
             case _:
                 raise Exception("Embedding provider not found.")
 
+        cache = get_embedding_cache(cfg)
+        if cache is not None:
+            # Shared by every compressor, so identical chunks are embedded only once
+            _embeddings = CachedEmbeddings(_embeddings, cache, namespace=get_model_name(_embeddings))
+
         self._embeddings = _embeddings
 
     def get_embeddings(self):
@@ -1,6 +1,6 @@
-from .retriever import get_retriever, get_retrievers
+from .retriever import get_retriever, get_retrievers, search_with_retrievers, stream_search_with_retrievers, stream_fused_search_with_retrievers, search_batch_with_retrievers, fuse_search_results
 from .query_processing import get_sub_queries, extract_json_with_regex, choose_agent
-from .web_scraping import scrape_urls
+from .web_scraping import scrape_urls, scrape_urls_stream
 from .report_generation import write_conclusion, summarize_url, generate_draft_section_titles, generate_report, get_report_introduction
 from .markdown_processing import extract_headers, extract_sections, table_of_contents, add_references
 from .utils import stream_output
@@ -8,9 +8,15 @@ from .utils import stream_output
 __all__ = [
     "get_retriever",
     "get_retrievers",
+    "search_with_retrievers",
+    "stream_search_with_retrievers",
+    "stream_fused_search_with_retrievers",
+    "search_batch_with_retrievers",
+    "fuse_search_results",
     "get_sub_queries",
     "extract_json_with_regex",
     "scrape_urls",
+    "scrape_urls_stream",
     "write_conclusion",
     "summarize_url",
     "generate_draft_section_titles",
@@ -37,6 +37,7 @@ async def choose_agent(
             llm_provider=cfg.llm_provider,
             llm_kwargs=cfg.llm_kwargs,
             cost_callback=cost_callback,
+            cfg=cfg,
         )
 
         agent_dict = json.loads(response)
@@ -118,6 +119,7 @@ async def get_sub_queries(
         llm_provider=cfg.llm_provider,
         llm_kwargs=cfg.llm_kwargs,
         cost_callback=cost_callback,
+        cfg=cfg,
     )
 
     sub_queries = json_repair.loads(response)
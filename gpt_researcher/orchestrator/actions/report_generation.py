@@ -51,6 +51,7 @@ async def get_report_introduction(
             max_tokens=config.smart_token_limit,
             llm_kwargs=config.llm_kwargs,
             cost_callback=cost_callback,
+            cfg=config,
         )
         return introduction
     except Exception as e:
@@ -95,6 +96,7 @@ async def write_conclusion(
             max_tokens=config.smart_token_limit,
             llm_kwargs=config.llm_kwargs,
             cost_callback=cost_callback,
+            cfg=config,
         )
         return conclusion
     except Exception as e:
@@ -138,6 +140,7 @@ async def summarize_url(
             max_tokens=config.smart_token_limit,
             llm_kwargs=config.llm_kwargs,
             cost_callback=cost_callback,
+            cfg=config,
         )
         return summary
     except Exception as e:
@@ -183,6 +186,7 @@ async def generate_draft_section_titles(
             max_tokens=config.smart_token_limit,
             llm_kwargs=config.llm_kwargs,
             cost_callback=cost_callback,
+            cfg=config,
         )
         return section_titles.split("\n")
     except Exception as e:
@@ -245,6 +249,7 @@ async def generate_report(
             max_tokens=cfg.smart_token_limit,
             llm_kwargs=cfg.llm_kwargs,
             cost_callback=cost_callback,
+            cfg=cfg,
         )
     except Exception as e:
         print(f"{Fore.RED}Error in generate_report: {e}{Style.RESET_ALL}")
@@ -1,5 +1,15 @@
+import asyncio
+from contextlib import aclosing
 from typing import List, Type
 from gpt_researcher.config.config import Config
+from gpt_researcher.utils.logger import get_formatted_logger
+from gpt_researcher.utils.url import canonicalize_url
+
+logger = get_formatted_logger()
+
+# Rank offset of reciprocal-rank fusion; 60 is the usual choice and damps the weight of the top ranks
+RRF_K = 60
+
 
 def get_retriever(retriever):
     """
@@ -80,8 +90,11 @@ def get_retrievers(headers, cfg):
         cfg (Config): The configuration object
 
     Returns:
-        list: A list of retriever classes to be used for searching.
+        list: A list of retriever classes to be used for searching. When the search cache is
+        enabled in the config, each class is wrapped so repeated searches are served from it.
     """
+    from gpt_researcher.retrievers.cache import get_cached_retriever
+
     # Check headers first for multiple retrievers
     if headers.get("retrievers"):
         retrievers = headers.get("retrievers").split(",")
@@ -100,10 +113,159 @@ def get_retrievers(headers, cfg):
 
     # Convert retriever names to actual retriever classes
     # Use get_default_retriever() as a fallback for any invalid retriever names
-    return [get_retriever(r) or get_default_retriever() for r in retrievers]
+    return [get_cached_retriever(get_retriever(r) or get_default_retriever(), cfg) for r in retrievers]
 
 
 def get_default_retriever(retriever):
     from gpt_researcher.retrievers import google
 
     return google
+
+
+async def stream_search_with_retrievers(retrievers, query, max_results, timeout=None):
+    """
+    Runs the query against all retrievers concurrently and yields the results of each one as
+    soon as it answers, so work on the first results does not wait for the slowest retriever.
+    Args:
+        retrievers (list): Retriever classes to search with
+        query (str): The search query
+        max_results (int): Maximum number of results requested from each retriever
+        timeout (float, optional): Seconds to wait for each retriever before skipping it
+
+    Yields:
+        list: The ranked results of one retriever, in the order the retrievers answer. A retriever
+        that fails or times out yields nothing. Searches still running when the caller stops
+        iterating are cancelled; blocking clients keep their thread until they return, since
+        threads cannot be cancelled (see `run_blocking_search`).
+    """
+    async def search_with_timeout(retriever_class):
+        try:
+            return await asyncio.wait_for(asearch(retriever_class(query), max_results), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"{retriever_class.__name__} timed out after {timeout}s for query '{query}'")
+        except Exception as e:
+            logger.error(f"{retriever_class.__name__} failed for query '{query}': {e}")
+        return []
+
+    tasks = [asyncio.create_task(search_with_timeout(r)) for r in retrievers]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            results = await next_done
+            if results:
+                yield results
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def search_with_retrievers(retrievers, query, max_results, timeout=None):
+    """
+    Runs the query against all retrievers concurrently and fuses their rankings.
+    Args:
+        retrievers (list): Retriever classes to search with
+        query (str): The search query
+        max_results (int): Maximum number of results requested from each retriever
+        timeout (float, optional): Seconds to wait for each retriever before skipping it
+
+    Returns:
+        list: The search results of every retriever that answered in time, de-duplicated and
+        ranked by `fuse_search_results`. A retriever that fails or times out contributes nothing,
+        so one slow search engine cannot stall the whole sub-query.
+    """
+    return fuse_search_results(
+        [results async for results in stream_search_with_retrievers(retrievers, query, max_results, timeout)]
+    )
+
+
+async def stream_fused_search_with_retrievers(retrievers, query, max_results, timeout=None):
+    """
+    Runs the query against all retrievers concurrently and, each time one answers, yields the
+    fusion of all results received so far with the share of the retrievers they cover.
+    Callers acting on the first answers can size their work by the share, so the first
+    retriever to answer does not decide alone which pages are used.
+    Args:
+        retrievers (list): Retriever classes to search with
+        query (str): The search query
+        max_results (int): Maximum number of results requested from each retriever
+        timeout (float, optional): Seconds to wait for each retriever before skipping it
+
+    Yields:
+        tuple: The results ranked by `fuse_search_results`, and the share of the retrievers
+        that answered. The last share is 1, also when retrievers failed or timed out.
+    """
+    result_lists = []
+    async with aclosing(stream_search_with_retrievers(retrievers, query, max_results, timeout)) as stream:
+        async for results in stream:
+            result_lists.append(results)
+            yield fuse_search_results(result_lists), len(result_lists) / len(retrievers)
+    if len(result_lists) < len(retrievers):
+        yield fuse_search_results(result_lists), 1.0
+
+
+async def search_batch_with_retrievers(retrievers, queries, max_results, timeout=None):
+    """
+    Runs all queries against all retrievers as one batch: every retriever receives the whole
+    list of queries through `asearch_batch`, and the retrievers run concurrently.
+    Args:
+        retrievers (list): Retriever classes to search with
+        queries (list): The search queries
+        max_results (int): Maximum number of results requested from each retriever per query
+        timeout (float, optional): Seconds to wait for each retriever's batch before skipping it
+
+    Returns:
+        list: For each query, in the order of `queries`, the results of every retriever that
+        answered in time, de-duplicated and ranked by `fuse_search_results`.
+    """
+    async def search_batch_with_timeout(retriever_class):
+        try:
+            if hasattr(retriever_class, "asearch_batch"):
+                batch = retriever_class.asearch_batch(queries, max_results=max_results)
+            else:
+                batch = asyncio.gather(*[asearch(retriever_class(query), max_results) for query in queries])
+            return await asyncio.wait_for(batch, timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"{retriever_class.__name__} timed out after {timeout}s for queries {queries}")
+        except Exception as e:
+            logger.error(f"{retriever_class.__name__} failed for queries {queries}: {e}")
+        return [[] for _ in queries]
+
+    batches = await asyncio.gather(*[search_batch_with_timeout(r) for r in retrievers])
+    return [fuse_search_results([batch[i] for batch in batches]) for i in range(len(queries))]
+
+
+def fuse_search_results(result_lists, k: int = RRF_K) -> list:
+    """
+    Merges the ranked result lists of several retrievers with reciprocal-rank fusion.
+    Results are identified by the canonical form of their url, so the same page found through
+    different links is kept once, as the spelling of its best-ranked occurrence. Each page
+    scores the sum of 1 / (k + rank) over the lists it appears in: pages found by several
+    retrievers, or ranked high by one of them, come first.
+    Args:
+        result_lists (list): One ranked list of search results per retriever
+        k (int): Rank offset of the fusion
+
+    Returns:
+        list: The de-duplicated search results, best first
+    """
+    scores = {}
+    best = {}
+    for results in result_lists:
+        ranks = {}
+        for rank, result in enumerate(results or [], start=1):
+            url = result.get("href") or result.get("url")
+            if url:
+                ranks.setdefault(canonicalize_url(url), (rank, result))
+        for key, (rank, result) in ranks.items():
+            scores[key] = scores.get(key, 0) + 1 / (k + rank)
+            if key not in best or rank < best[key][0]:
+                best[key] = (rank, result)
+    return [best[key][1] for key in sorted(scores, key=scores.get, reverse=True)]
+
+
+async def asearch(retriever, max_results):
+    """Searches with the retriever, on the retriever threads for retrievers that only implement a blocking `search`"""
+    from gpt_researcher.retrievers.base import run_blocking_search
+
+    if hasattr(retriever, "asearch"):
+        return await retriever.asearch(max_results=max_results)
+    return await run_blocking_search(retriever.search, max_results=max_results)
@@ -1,14 +1,43 @@
 import asyncio
-from typing import List, Dict, Any
+from typing import List
+from colorama import Fore, Style
 from gpt_researcher.scraper.scraper import Scraper
+from gpt_researcher.scraper.cache import get_scrape_cache
+from gpt_researcher.scraper.parser import get_parser
+from gpt_researcher.scraper.pool import get_host_guard
 from gpt_researcher.config.config import Config
+from gpt_researcher.scraper.settings import ScraperSettings
 from gpt_researcher.utils.logger import get_formatted_logger
 
 logger = get_formatted_logger()
 
-def scrape_urls(urls, cfg=None):
+
+def build_scraper(urls, cfg=None) -> Scraper:
+    """
+    Builds the Scraper for the urls from the config
+    Args:
+        urls: List of urls
+        cfg: Config (optional)
+
+    Returns:
+        Scraper
+    """
+    return Scraper(
+        urls,
+        ScraperSettings.from_config(cfg),
+        cache=get_scrape_cache(cfg),
+        guard=get_host_guard(
+            rate=cfg.scraper_host_rate,
+            burst=cfg.scraper_max_per_host,
+            threshold=cfg.scraper_breaker_threshold,
+            cooldown=cfg.scraper_breaker_cooldown,
+        ) if cfg else get_host_guard(),
+    )
+
+
+async def scrape_urls(urls, cfg=None):
     """
-    Scrapes the urls
+    Scrapes the urls concurrently
     Args:
         urls: List of urls
         cfg: Config (optional)
@@ -18,16 +47,32 @@ def scrape_urls(urls, cfg=None):
 
     """
     content = []
-    user_agent = (
-        cfg.user_agent
-        if cfg
-        else "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/128.0.0.0 Safari/537.36"
-    )
     try:
-        content = Scraper(urls, user_agent, cfg.scraper).run()
+        content = await build_scraper(urls, cfg).run()
     except Exception as e:
         print(f"{Fore.RED}Error in scrape_urls: {e}{Style.RESET_ALL}")
     return content
+
+
+async def scrape_urls_stream(urls, cfg=None):
+    """
+    Scrapes the urls concurrently and yields each page as soon as it is scraped.
+    Pages still loading after the configured SCRAPER_DEADLINE are dropped.
+    Args:
+        urls: List of urls
+        cfg: Config (optional)
+
+    Yields:
+        dict: Scraped page with "url" and "raw_content"
+    """
+    deadline = cfg.scraper_deadline if cfg else None
+    try:
+        async for page in build_scraper(urls, cfg).stream(deadline=deadline):
+            yield page
+    except Exception as e:
+        print(f"{Fore.RED}Error in scrape_urls_stream: {e}{Style.RESET_ALL}")
+
+
 async def filter_urls(urls: List[str], config: Config) -> List[str]:
     """
     Filter URLs based on configuration settings.
@@ -47,41 +92,16 @@ async def filter_urls(urls: List[str], config: Config) -> List[str]:
             filtered_urls.append(url)
     return filtered_urls
 
-async def extract_main_content(html_content: str) -> str:
+async def extract_main_content(html_content: str, parser: str = None) -> str:
     """
-    Extract the main content from HTML.
+    Extract the main content from HTML, dropping navigation, cookie banners, link lists
+    and other boilerplate. Scrapers run the same extraction while parsing fetched pages.
 
     Args:
         html_content (str): Raw HTML content.
+        parser (str): Parser backend key (e.g. "lxml"), default when None.
 
     Returns:
         str: Extracted main content.
     """
-    # Implement content extraction logic here
-    # This could involve using libraries like BeautifulSoup or custom parsing logic
-    # For now, we'll just return the raw HTML as a placeholder
-    return html_content
-
-async def process_scraped_data(scraped_data: List[Dict[str, Any]], config: Config) -> List[Dict[str, Any]]:
-    """
-    Process the scraped data to extract and clean the main content.
-
-    Args:
-        scraped_data (List[Dict[str, Any]]): List of dictionaries containing scraped data.
-        config (Config): Configuration object.
-
-    Returns:
-        List[Dict[str, Any]]: Processed scraped data.
-    """
-    processed_data = []
-    for item in scraped_data:
-        if item['status'] == 'success':
-            main_content = await extract_main_content(item['content'])
-            processed_data.append({
-                'url': item['url'],
-                'content': main_content,
-                'status': 'success'
-            })
-        else:
-            processed_data.append(item)
-    return processed_data
\ No newline at end of file
+    return await asyncio.to_thread(get_parser(parser).extract_text, html_content, None, True)
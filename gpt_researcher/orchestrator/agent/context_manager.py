@@ -1,9 +1,10 @@
 import asyncio
 from typing import List, Dict, Optional, Set
 
-from gpt_researcher.context.compression import ContextCompressor, WrittenContentCompressor, VectorstoreCompressor
-from gpt_researcher.document import DocumentLoader, LangChainDocumentLoader
+from gpt_researcher.context.compression import ChunkIndex, ContextCompressor, WrittenContentCompressor, VectorstoreCompressor
+from gpt_researcher.document import DocumentLoader, LangChainDocumentLoader, get_document_index
 from gpt_researcher.utils.enum import ReportSource
+from gpt_researcher.utils.url import filter_new_urls
 from gpt_researcher.orchestrator.actions.utils import stream_output
 
 
@@ -47,14 +48,14 @@ class ContextManager:
         return await self.get_similar_content_by_query(self.researcher.query, scraped_sites)
 
     async def __get_context_from_local_documents(self):
-        document_data = await DocumentLoader(self.researcher.cfg.doc_path).load()
+        document_data = await DocumentLoader.from_config(self.researcher.cfg).load()
         if self.researcher.vector_store:
             self.researcher.vector_store.load(document_data)
 
         return await self.__get_context_by_search(self.researcher.query, document_data)
 
     async def __get_hybrid_context(self):
-        document_data = await DocumentLoader(self.researcher.cfg.doc_path).load()
+        document_data = await DocumentLoader.from_config(self.researcher.cfg).load()
         if self.researcher.vector_store:
             self.researcher.vector_store.load(document_data)
 
@@ -106,8 +107,10 @@ class ContextManager:
                 sub_queries,
             )
 
+        # The same documents serve every sub-query, so they are embedded once up front
+        chunk_index = await self.build_chunk_index(scraped_data) if scraped_data else None
         context = await asyncio.gather(
-            *[self.__process_sub_query(sub_query, scraped_data) for sub_query in sub_queries]
+            *[self.__process_sub_query(sub_query, scraped_data, chunk_index) for sub_query in sub_queries]
         )
         return context
 
@@ -135,7 +138,7 @@ class ContextManager:
             )
         return content
 
-    async def __process_sub_query(self, sub_query: str, scraped_data: list = []):
+    async def __process_sub_query(self, sub_query: str, scraped_data: list = [], chunk_index: Optional[ChunkIndex] = None):
         if self.researcher.verbose:
             await stream_output(
                 "logs",
@@ -144,14 +147,22 @@ class ContextManager:
                 self.researcher.websocket,
             )
 
-        if not scraped_data:
-            scraped_data = await self.researcher.scraper.scrape_data_by_query(sub_query)
-
-        if self.researcher.vector_store:
-            self.researcher.vector_store.load(scraped_data)
+        if scraped_data:
+            if self.researcher.vector_store:
+                self.researcher.vector_store.load(scraped_data)
+            content = await self.get_similar_content_by_query(sub_query, scraped_data, chunk_index)
+        else:
+            # Pages flow into compression as soon as each one is scraped
+            scraped_pages = []
 
+            async def pages():
+                async for page in self.researcher.scraper.scrape_data_by_query_stream(sub_query):
+                    scraped_pages.append(page)
+                    yield page
 
-        content = await self.get_similar_content_by_query(sub_query, scraped_data)
+            content = await self.get_similar_content_by_query_stream(sub_query, pages())
+            if self.researcher.vector_store:
+                self.researcher.vector_store.load(scraped_pages)
 
         if content and self.researcher.verbose:
             await stream_output(
@@ -167,20 +178,20 @@ class ContextManager:
         return content
 
     async def __get_new_urls(self, url_set_input):
-        new_urls = []
-        for url in url_set_input:
-            if url not in self.researcher.visited_urls:
-                self.researcher.visited_urls.add(url)
-                new_urls.append(url)
-                if self.researcher.verbose:
-                    await stream_output(
-                        "logs",
-                        "added_source_url",
-                        f"✅ Added source url to research: {url}\n",
-                        self.researcher.websocket,
-                        True,
-                        url,
-                    )
+        # Only the best MAX_SCRAPED_URLS_PER_QUERY new urls are kept, as in ReportScraper
+        new_urls = filter_new_urls(
+            url_set_input, self.researcher.visited_urls, self.researcher.cfg.max_scraped_urls_per_query
+        )
+        for url in new_urls:
+            if self.researcher.verbose:
+                await stream_output(
+                    "logs",
+                    "added_source_url",
+                    f"✅ Added source url to research: {url}\n",
+                    self.researcher.websocket,
+                    True,
+                    url,
+                )
         return new_urls
 
     async def __get_similar_content_by_query_with_vectorstore(self, query, filter):
@@ -198,7 +209,7 @@ class ContextManager:
             query=query, max_results=8
         )
 
-    async def get_similar_content_by_query(self, query, pages):
+    async def get_similar_content_by_query(self, query, pages, chunk_index: Optional[ChunkIndex] = None):
         if self.researcher.verbose:
             await stream_output(
                 "logs",
@@ -210,10 +221,48 @@ class ContextManager:
         context_compressor = ContextCompressor(
             documents=pages, embeddings=self.researcher.memory.get_embeddings()
         )
+        if chunk_index is not None:
+            return await context_compressor.async_get_context_from_index(
+                query=query, index=chunk_index, max_results=10
+            )
         return await context_compressor.async_get_context(
             query=query, max_results=10, cost_callback=self.researcher.add_costs
         )
 
+    async def build_chunk_index(self, pages) -> ChunkIndex:
+        """
+        Splits and embeds the pages once, so that every sub-query researched over the same
+        documents is scored against the index instead of re-embedding the whole corpus.
+        Local documents unchanged since an earlier run reuse the chunks and embeddings stored
+        in the document index.
+        """
+        return await ChunkIndex.from_pages(
+            pages,
+            self.researcher.memory.get_embeddings(),
+            get_document_index(self.researcher.cfg),
+            cost_callback=self.researcher.add_costs,
+        )
+
+    async def get_similar_content_by_query_stream(self, query, pages):
+        """
+        Like `get_similar_content_by_query`, but consumes `pages` as an async iterator so that
+        compression starts while the remaining pages are still being scraped.
+        """
+        if self.researcher.verbose:
+            await stream_output(
+                "logs",
+                "fetching_query_content",
+                f"📚 Getting relevant content based on query: {query}...",
+                self.researcher.websocket,
+            )
+
+        context_compressor = ContextCompressor(
+            documents=[], embeddings=self.researcher.memory.get_embeddings()
+        )
+        return await context_compressor.async_get_context_from_stream(
+            query=query, pages=pages, max_results=10, cost_callback=self.researcher.add_costs
+        )
+
     async def __get_sub_queries(self, query):
         from gpt_researcher.orchestrator.actions import get_sub_queries
         return await get_sub_queries(
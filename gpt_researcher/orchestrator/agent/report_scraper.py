@@ -1,6 +1,7 @@
-import asyncio
-from typing import List, Dict
-from gpt_researcher.orchestrator.actions import scrape_urls
+from typing import AsyncIterator, List, Dict
+from gpt_researcher.orchestrator.actions import scrape_urls, scrape_urls_stream, search_with_retrievers
+from gpt_researcher.orchestrator.actions.utils import stream_output
+from gpt_researcher.utils.url import filter_new_urls
 
 
 class ReportScraper:
@@ -18,17 +19,17 @@ class ReportScraper:
             List[Dict]: List of scraped content results.
         """
         if self.researcher.verbose:
-            await self.researcher.stream_output(
+            await stream_output(
                 "logs",
                 "scraping_urls",
                 f"🌐 Scraping content from {len(urls)} URLs...",
                 self.researcher.websocket,
             )
 
-        scraped_content = await asyncio.to_thread(scrape_urls, urls, self.researcher.cfg)
+        scraped_content = await scrape_urls(urls, self.researcher.cfg)
 
         if self.researcher.verbose:
-            await self.researcher.stream_output(
+            await stream_output(
                 "logs",
                 "scraping_complete",
                 f"✅ Scraping complete. Retrieved content from {len(scraped_content)} sources.",
@@ -48,7 +49,7 @@ class ReportScraper:
             List[Dict]: List of scraped content results.
         """
         if self.researcher.verbose:
-            await self.researcher.stream_output(
+            await stream_output(
                 "logs",
                 "searching_query",
                 f"🔍 Searching for relevant URLs for query: '{query}'...",
@@ -59,7 +60,7 @@ class ReportScraper:
         new_search_urls = await self._get_new_urls(search_urls)
 
         if self.researcher.verbose:
-            await self.researcher.stream_output(
+            await stream_output(
                 "logs",
                 "scraping_query_urls",
                 f"🌐 Scraping content from {len(new_search_urls)} URLs found for query: '{query}'...",
@@ -70,9 +71,41 @@ class ReportScraper:
 
         return scraped_content
 
+    async def scrape_data_by_query_stream(self, query: str) -> AsyncIterator[Dict]:
+        """
+        Like `scrape_data_by_query`, but yields each page as soon as it is scraped.
+
+        Args:
+            query (str): The query to search for.
+
+        Yields:
+            Dict: Each scraped content result.
+        """
+        if self.researcher.verbose:
+            await stream_output(
+                "logs",
+                "searching_query",
+                f"🔍 Searching for relevant URLs for query: '{query}'...",
+                self.researcher.websocket,
+            )
+
+        search_urls = await self._search_urls(query)
+        new_search_urls = await self._get_new_urls(search_urls)
+
+        if self.researcher.verbose:
+            await stream_output(
+                "logs",
+                "scraping_query_urls",
+                f"🌐 Scraping content from {len(new_search_urls)} URLs found for query: '{query}'...",
+                self.researcher.websocket,
+            )
+
+        async for scraped_content in scrape_urls_stream(new_search_urls, self.researcher.cfg):
+            yield scraped_content
+
     async def _search_urls(self, query: str) -> List[str]:
         """
-        Search for URLs based on a query using configured retrievers.
+        Search for URLs based on a query using all configured retrievers concurrently.
 
         Args:
             query (str): The query to search for.
@@ -80,37 +113,36 @@ class ReportScraper:
         Returns:
             List[str]: List of URLs found.
         """
-        search_urls = []
-        for retriever_class in self.researcher.retrievers:
-            retriever = retriever_class(query)
-            search_results = await asyncio.to_thread(
-                retriever.search, max_results=self.researcher.cfg.max_search_results_per_query
-            )
-            search_urls.extend([url.get("href") for url in search_results])
-        return search_urls
+        search_results = await search_with_retrievers(
+            self.researcher.retrievers,
+            query,
+            max_results=self.researcher.cfg.max_search_results_per_query,
+            timeout=self.researcher.cfg.retriever_timeout,
+        )
+        return [url.get("href") or url.get("url") for url in search_results]
 
     async def _get_new_urls(self, urls: List[str]) -> List[str]:
         """
-        Filter out already visited URLs and add new ones to the visited set.
+        Filter out already visited URLs, compared by their canonical form, and add the best
+        MAX_SCRAPED_URLS_PER_QUERY new ones to the visited set.
 
         Args:
-            urls (List[str]): List of URLs to filter.
+            urls (List[str]): List of URLs to filter, best first.
 
         Returns:
             List[str]: List of new, unvisited URLs.
         """
-        new_urls = []
-        for url in urls:
-            if url not in self.researcher.visited_urls:
-                self.researcher.visited_urls.add(url)
-                new_urls.append(url)
-                if self.researcher.verbose:
-                    await self.researcher.stream_output(
-                        "logs",
-                        "added_source_url",
-                        f"✅ Added source URL to research: {url}\n",
-                        self.researcher.websocket,
-                        True,
-                        url,
-                    )
+        new_urls = filter_new_urls(
+            urls, self.researcher.visited_urls, self.researcher.cfg.max_scraped_urls_per_query
+        )
+        for url in new_urls:
+            if self.researcher.verbose:
+                await stream_output(
+                    "logs",
+                    "added_source_url",
+                    f"✅ Added source URL to research: {url}\n",
+                    self.researcher.websocket,
+                    True,
+                    url,
+                )
         return new_urls
@@ -4,6 +4,7 @@ from gpt_researcher.config import Config
 from gpt_researcher.memory import Memory
 from gpt_researcher.utils.enum import ReportSource, ReportType, Tone
 from gpt_researcher.llm_provider import GenericLLMProvider
+from gpt_researcher.llm_provider.scheduler import llm_lane
 from gpt_researcher.orchestrator.agent.research_conductor import ResearchConductor
 from gpt_researcher.orchestrator.agent.report_scraper import ReportScraper
 from gpt_researcher.orchestrator.agent.report_generator import ReportGenerator
@@ -59,9 +60,11 @@ class GPTResearcher:
         self.context = context
         self.headers = headers or {}
         self.research_costs = 0.0
+        self.llm_cache_hits = 0
+        self.llm_cache_savings = 0.0
         self.retrievers = get_retrievers(self.headers, self.cfg)
         self.memory = Memory(
-            getattr(self.cfg, 'embedding_provider', None), self.headers)
+            getattr(self.cfg, 'embedding_provider', None), self.headers, cfg=self.cfg)
 
         # Initialize components
         self.research_conductor = ResearchConductor(self)
@@ -70,36 +73,42 @@ class GPTResearcher:
         self.context_manager = ContextManager(self)
 
     async def conduct_research(self):
-        if not (self.agent and self.role):
-            self.agent, self.role = await choose_agent(
-                query=self.query,
-                cfg=self.cfg,
-                parent_query=self.parent_query,
-                cost_callback=self.add_costs,
-                headers=self.headers,
-            )
-
-        self.context = await self.research_conductor.conduct_research()
+        with llm_lane(self.report_type):
+            if not (self.agent and self.role):
+                self.agent, self.role = await choose_agent(
+                    query=self.query,
+                    cfg=self.cfg,
+                    parent_query=self.parent_query,
+                    cost_callback=self.add_costs,
+                    headers=self.headers,
+                )
+
+            self.context = await self.research_conductor.conduct_research()
         return self.context
 
     async def write_report(self, existing_headers: list = [], relevant_written_contents: list = [], ext_context=None) -> str:
-        return await self.report_generator.write_report(
-            existing_headers,
-            relevant_written_contents,
-            ext_context or self.context
-        )
+        with llm_lane(self.report_type):
+            return await self.report_generator.write_report(
+                existing_headers,
+                relevant_written_contents,
+                ext_context or self.context
+            )
 
     async def write_report_conclusion(self, report_body: str) -> str:
-        return await self.report_generator.write_report_conclusion(report_body)
+        with llm_lane(self.report_type):
+            return await self.report_generator.write_report_conclusion(report_body)
 
     async def write_introduction(self):
-        return await self.report_generator.write_introduction()
+        with llm_lane(self.report_type):
+            return await self.report_generator.write_introduction()
 
     async def get_subtopics(self):
-        return await self.report_generator.get_subtopics()
+        with llm_lane(self.report_type):
+            return await self.report_generator.get_subtopics()
 
     async def get_draft_section_titles(self, current_subtopic: str):
-        return await self.report_generator.get_draft_section_titles(current_subtopic)
+        with llm_lane(self.report_type):
+            return await self.report_generator.get_draft_section_titles(current_subtopic)
 
     async def get_similar_written_contents_by_draft_section_titles(
         self,
@@ -128,7 +137,14 @@ class GPTResearcher:
     def set_verbose(self, verbose: bool):
         self.verbose = verbose
 
-    def add_costs(self, cost: float) -> None:
+    def get_llm_cache_savings(self) -> float:
+        return self.llm_cache_savings
+
+    def add_costs(self, cost: float, saved: Optional[float] = None) -> None:
+        """Adds the cost of a call; `saved` is the cost a cache hit avoided"""
         if not isinstance(cost, (float, int)):
             raise ValueError("Cost must be an integer or float")
         self.research_costs += cost
+        if saved is not None:
+            self.llm_cache_hits += 1
+            self.llm_cache_savings += saved
@@ -1,11 +1,15 @@
 import asyncio
-import random
+import math
+from contextlib import aclosing
 from typing import Dict, Optional
 
 from gpt_researcher.orchestrator.actions.utils import stream_output
-from gpt_researcher.orchestrator.actions import get_sub_queries, scrape_urls
+from gpt_researcher.orchestrator.actions import (
+    get_sub_queries, scrape_urls, scrape_urls_stream, stream_fused_search_with_retrievers
+)
 from gpt_researcher.document import DocumentLoader, LangChainDocumentLoader
 from gpt_researcher.utils.enum import ReportSource, ReportType, Tone
+from gpt_researcher.utils.url import filter_new_urls
 
 
 class ResearchConductor:
@@ -41,7 +45,7 @@ class ResearchConductor:
             self.researcher.context = await self.__get_context_by_urls(self.researcher.source_urls)
 
         elif self.researcher.report_source == ReportSource.Local.value:
-            document_data = await DocumentLoader(self.researcher.cfg.doc_path).load()
+            document_data = await DocumentLoader.from_config(self.researcher.cfg).load()
             if self.researcher.vector_store:
                 self.researcher.vector_store.load(document_data)
 
@@ -49,7 +53,7 @@ class ResearchConductor:
 
         # Hybrid search including both local documents and web sources
         elif self.researcher.report_source == ReportSource.Hybrid.value:
-            document_data = await DocumentLoader(self.researcher.cfg.doc_path).load()
+            document_data = await DocumentLoader.from_config(self.researcher.cfg).load()
             if self.researcher.vector_store:
                 self.researcher.vector_store.load(document_data)
             docs_context = await self.__get_context_by_search(self.researcher.query, document_data)
@@ -95,7 +99,7 @@ class ResearchConductor:
                 self.researcher.websocket,
             )
 
-        scraped_sites = scrape_urls(new_search_urls, self.researcher.cfg)
+        scraped_sites = await scrape_urls(new_search_urls, self.researcher.cfg)
 
         if self.researcher.vector_store:
             self.researcher.vector_store.load(scraped_sites)
@@ -157,10 +161,16 @@ class ResearchConductor:
                 sub_queries,
             )
 
-        # Using asyncio.gather to process the sub_queries asynchronously
+        # The same documents serve every sub-query, so they are embedded once up front
+        chunk_index = None
+        if scraped_data:
+            chunk_index = await self.researcher.context_manager.build_chunk_index(scraped_data)
+
+        # Using asyncio.gather to process the sub_queries asynchronously; each one searches
+        # on its own, so its scraping starts as soon as its first retriever answers
         context = await asyncio.gather(
             *[
-                self.__process_sub_query(sub_query, scraped_data)
+                self.__process_sub_query(sub_query, scraped_data, chunk_index)
                 for sub_query in sub_queries
             ]
         )
@@ -198,12 +208,13 @@ class ResearchConductor:
             )
         return content
 
-    async def __process_sub_query(self, sub_query: str, scraped_data: list = []):
+    async def __process_sub_query(self, sub_query: str, scraped_data: list = [], chunk_index=None):
         """Takes in a sub query and scrapes urls based on it and gathers context.
 
         Args:
             sub_query (str): The sub-query generated from the original query
             scraped_data (list): Scraped data passed in
+            chunk_index (ChunkIndex): Prebuilt index of scraped_data, if any
 
         Returns:
             str: The context gathered from search
@@ -216,10 +227,15 @@ class ResearchConductor:
                 self.researcher.websocket,
             )
 
-        if not scraped_data:
-            scraped_data = await self.__scrape_data_by_query(sub_query)
-
-        content = await self.researcher.context_manager.get_similar_content_by_query(sub_query, scraped_data)
+        if scraped_data:
+            content = await self.researcher.context_manager.get_similar_content_by_query(
+                sub_query, scraped_data, chunk_index
+            )
+        else:
+            # Pages flow into compression as soon as each one is scraped
+            content = await self.researcher.context_manager.get_similar_content_by_query_stream(
+                sub_query, self.__scrape_data_by_query(sub_query)
+            )
 
         if content and self.researcher.verbose:
             await stream_output(
@@ -234,58 +250,45 @@ class ResearchConductor:
             )
         return content
 
-    async def __get_new_urls(self, url_set_input):
+    async def __get_new_urls(self, url_set_input, limit: Optional[int] = None):
         """Gets the new urls from the given url set.
-        Args: url_set_input (set[str]): The url set to get the new urls from
+        Urls are compared by their canonical form, so tracking parameters, www./AMP variants
+        and trailing slashes do not make an already visited page look new.
+        Args:
+            url_set_input (list[str]): The urls to get the new urls from, best first
+            limit (int): Maximum number of new urls to return
         Returns: list[str]: The new urls from the given url set
         """
 
-        new_urls = []
-        for url in url_set_input:
-            if url not in self.researcher.visited_urls:
-                self.researcher.visited_urls.add(url)
-                new_urls.append(url)
-                if self.researcher.verbose:
-                    await stream_output(
-                        "logs",
-                        "added_source_url",
-                        f"✅ Added source url to research: {url}\n",
-                        self.researcher.websocket,
-                        True,
-                        url,
-                    )
+        new_urls = filter_new_urls(url_set_input, self.researcher.visited_urls, limit)
+        for url in new_urls:
+            if self.researcher.verbose:
+                await stream_output(
+                    "logs",
+                    "added_source_url",
+                    f"✅ Added source url to research: {url}\n",
+                    self.researcher.websocket,
+                    True,
+                    url,
+                )
 
         return new_urls
 
     async def __scrape_data_by_query(self, sub_query):
         """
         Runs a sub-query across multiple retrievers and scrapes the resulting URLs.
+        Scraping starts as soon as the first retriever answers rather than the slowest. Each
+        answer releases its share of MAX_SCRAPED_URLS_PER_QUERY, filled with the best new URLs
+        of the fused ranking of every answer so far, so the first responder cannot use up the
+        whole budget with its own ranking.
 
         Args:
             sub_query (str): The sub-query to search for.
 
-        Returns:
-            list: A list of scraped content results.
+        Yields:
+            dict: Each scraped content result, as soon as its page has been scraped.
         """
-        new_search_urls = []
-
-        # Iterate through all retrievers
-        for retriever_class in self.researcher.retrievers:
-            # Instantiate the retriever with the sub-query
-            retriever = retriever_class(sub_query)
-
-            # Perform the search using the current retriever
-            search_results = await asyncio.to_thread(
-                retriever.search, max_results=self.researcher.cfg.max_search_results_per_query
-            )
-
-            # Collect new URLs from search results
-            search_urls = [url.get("href") for url in search_results]
-            new_search_urls.extend(search_urls)
-
-        # Get unique URLs
-        new_search_urls = await self.__get_new_urls(new_search_urls)
-        random.shuffle(new_search_urls)
+        cfg = self.researcher.cfg
 
         # Log the research process if verbose mode is on
         if self.researcher.verbose:
@@ -296,16 +299,60 @@ class ResearchConductor:
                 self.researcher.websocket,
             )
 
-        # Scrape the new URLs
-        scraped_content_results = await asyncio.to_thread(
-            scrape_urls, new_search_urls, self.researcher.cfg
-        )
+        pages = asyncio.Queue()
+        scrapes = []
+
+        async def scrape(urls):
+            async for scraped_content in scrape_urls_stream(urls, cfg):
+                await pages.put(scraped_content)
+
+        async def search_and_scrape():
+            budget = cfg.max_scraped_urls_per_query
+            scheduled = 0
+            try:
+                # Slow or failing retrievers are skipped after the timeout
+                async with aclosing(stream_fused_search_with_retrievers(
+                    self.researcher.retrievers,
+                    sub_query,
+                    max_results=cfg.max_search_results_per_query,
+                    timeout=cfg.retriever_timeout,
+                )) as searches:
+                    async for results, share in searches:
+                        limit = None if budget is None else math.ceil(budget * share) - scheduled
+                        if limit is not None and limit <= 0:
+                            continue
+                        # Keep the ranking of the results and scrape only the best new URLs
+                        new_search_urls = await self.__get_new_urls(
+                            [url.get("href") or url.get("url") for url in results], limit
+                        )
+                        if new_search_urls:
+                            scrapes.append(asyncio.create_task(scrape(new_search_urls)))
+                        scheduled += len(new_search_urls)
+                        if budget is not None and scheduled >= budget:
+                            break
+                await asyncio.gather(*scrapes)
+            finally:
+                await pages.put(None)
+
+        # Hand each page on as soon as it is scraped, whichever retriever found it
+        producer = asyncio.create_task(search_and_scrape())
+        scraped_content_results = []
+        try:
+            while True:
+                scraped_content = await pages.get()
+                if scraped_content is None:
+                    break
+                scraped_content_results.append(scraped_content)
+                yield scraped_content
+            await producer
+        finally:
+            producer.cancel()
+            for task in scrapes:
+                task.cancel()
 
         if self.researcher.vector_store:
             self.researcher.vector_store.load(scraped_content_results)
 
-        return scraped_content_results
-
     async def __get_sub_queries(self, query):
         # Generate Sub-Queries including original query
         return await get_sub_queries(
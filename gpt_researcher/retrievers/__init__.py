@@ -1,3 +1,4 @@
+from .base import BaseRetriever
 from .arxiv.arxiv import ArxivSearch
 from .bing.bing import BingSearch
 from .custom.custom import CustomRetriever
@@ -13,6 +14,7 @@ from .tavily.tavily_search import TavilySearch
 from .exa.exa import ExaSearch
 
 __all__ = [
+    "BaseRetriever",
     "TavilySearch",
     "CustomRetriever",
     "Duckduckgo",
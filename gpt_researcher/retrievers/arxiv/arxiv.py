@@ -1,7 +1,9 @@
 import arxiv
 
+from ..base import BaseRetriever, run_blocking_search
 
-class ArxivSearch:
+
+class ArxivSearch(BaseRetriever):
     """
     Arxiv API Retriever
     """
@@ -37,4 +39,8 @@ class ArxivSearch:
                 "body": result.summary,
             })
         
-        return search_result
\ No newline at end of file
+        return search_result
+
+    async def asearch(self, max_results=5):
+        """Runs `search` on the retriever threads, since the arxiv client only offers a blocking API"""
+        return await run_blocking_search(self.search, max_results)
@@ -0,0 +1,72 @@
+import asyncio
+import functools
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from gpt_researcher.utils.http import close_async_clients
+
+# Threads running the blocking search clients (duckduckgo_search, arxiv, Exa)
+BLOCKING_SEARCH_THREADS = 8
+
+# A thread cannot be cancelled, so a search that outlives its timeout keeps running until the
+# client gives up. Running them on their own executor keeps such searches from filling the
+# default executor of the event loop, which the caches rely on.
+_blocking_search_executor = ThreadPoolExecutor(max_workers=BLOCKING_SEARCH_THREADS, thread_name_prefix="retriever")
+
+
+async def run_blocking_search(func: Callable, *args, **kwargs):
+    """Runs a blocking search call on the retriever threads"""
+    return await asyncio.get_running_loop().run_in_executor(
+        _blocking_search_executor, functools.partial(func, *args, **kwargs)
+    )
+
+
+class BaseRetriever(ABC):
+    """
+    Base class of the retrievers.
+
+    A retriever is constructed with a query and searches it with `asearch`, which runs on the
+    event loop. `asearch_batch` searches several queries at once; by default it runs `asearch`
+    concurrently for each of them, and retrievers whose API accepts several queries in one
+    request override it. The blocking `search` is kept for callers outside an event loop.
+    """
+
+    query: str
+
+    @abstractmethod
+    async def asearch(self, max_results: int = 7) -> Optional[List[Dict[str, Any]]]:
+        """Searches the query and returns its results, or None if the search failed"""
+
+    def search(self, *args, **kwargs) -> Optional[List[Dict[str, Any]]]:
+        """
+        Blocking counterpart of `asearch` for callers outside an event loop. The search runs
+        on a loop of its own, whose HTTP clients are closed before the loop ends. Within a
+        running loop, await `asearch` instead: blocking the loop would stall every other task.
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self._search_and_close(*args, **kwargs))
+        raise RuntimeError(f"{type(self).__name__}.search() cannot block a running event loop; await asearch() instead")
+
+    async def _search_and_close(self, *args, **kwargs) -> Optional[List[Dict[str, Any]]]:
+        try:
+            return await self.asearch(*args, **kwargs)
+        finally:
+            await close_async_clients()
+
+    @classmethod
+    async def asearch_batch(cls, queries: List[str], max_results: int = 7) -> List[List[Dict[str, Any]]]:
+        """
+        Searches every query and returns their results in the order of `queries`.
+        A query whose search fails gets an empty list, so one failure does not lose the batch.
+        """
+        async def search(query: str) -> List[Dict[str, Any]]:
+            try:
+                return await cls(query).asearch(max_results=max_results) or []
+            except Exception as e:
+                print(f"Error: {e}. {cls.__name__} failed for query '{query}'.")
+                return []
+
+        return list(await asyncio.gather(*[search(query) for query in queries]))
@@ -2,11 +2,14 @@
 
 # libraries
 import os
-import requests
 import json
 
+from gpt_researcher.utils.http import get_async_client
 
-class BingSearch():
+from ..base import BaseRetriever
+
+
+class BingSearch(BaseRetriever):
     """
     Bing Search Retriever
     """
@@ -31,7 +34,7 @@ class BingSearch():
             raise Exception("Bing API key not found. Please set the BING_API_KEY environment variable.")
         return api_key
 
-    def search(self, max_results=7):
+    async def asearch(self, max_results=7):
         """
         Searches the query
         Returns:
@@ -58,7 +61,7 @@ class BingSearch():
             "safeSearch": "Strict"
         }
         
-        resp = requests.get(url, headers=headers, params=params)
+        resp = await get_async_client().get(url, headers=headers, params=params)
 
         # Preprocess the results
         if resp is None:
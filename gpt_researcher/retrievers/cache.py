@@ -0,0 +1,176 @@
+import hashlib
+import inspect
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from .base import BaseRetriever
+
+
+class SearchCache:
+    """
+    Cache of retriever search results, keyed by (retriever, query, search arguments).
+
+    Results are kept in an in-memory LRU and, when `path` is given, in a SQLite file
+    so they survive restarts. Every entry expires after `ttl` seconds. The cache is
+    thread-safe, since blocking retrievers still run in worker threads.
+    """
+
+    def __init__(self, ttl: int = 900, max_entries: int = 1024, path: Optional[str] = None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, results TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._conn.execute("DELETE FROM results WHERE expires_at <= ?", (time.time(),))
+            self._conn.commit()
+
+    @staticmethod
+    def get_key(retriever_name: str, query: str, arguments: Dict[str, Any]) -> str:
+        payload = json.dumps([retriever_name, query, arguments], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        """Returns a copy of the cached results for the key, or None on a miss"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and entry[1] <= now:
+                del self._memory[key]
+                entry = None
+
+            if entry is None and self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT results, expires_at FROM results WHERE key = ? AND expires_at > ?", (key, now)
+                ).fetchone()
+                if row is not None:
+                    entry = (json.loads(row[0]), row[1])
+                    self._remember(key, entry)
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._memory.move_to_end(key)
+            self.hits += 1
+        return [dict(result) for result in entry[0]]
+
+    def set(self, key: str, results: List[Dict[str, Any]]) -> None:
+        entry = ([dict(result) for result in results], time.time() + self.ttl)
+        with self._lock:
+            self._remember(key, entry)
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO results VALUES (?, ?, ?)",
+                    (key, json.dumps(entry[0], default=str), entry[1]),
+                )
+                self._conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._memory)}
+
+    def _remember(self, key: str, entry: tuple) -> None:
+        """Adds the entry to the in-memory LRU. Caller holds the lock."""
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+
+def with_search_cache(retriever_class, cache: SearchCache):
+    """
+    Wraps a retriever class so that `asearch` is served from the cache when possible.
+    Retrievers with a native `asearch_batch` only send the queries missing from the cache.
+    The returned class is a subclass of `retriever_class` and is constructed the same way.
+    Empty results are never cached, so failed searches are retried on the next call.
+    """
+    search_signature = inspect.signature(retriever_class.asearch)
+
+    def get_key(query: str, *args, **kwargs) -> str:
+        bound = search_signature.bind(None, *args, **kwargs)
+        bound.apply_defaults()
+        arguments = {name: value for name, value in bound.arguments.items() if name != "self"}
+        return cache.get_key(retriever_class.__name__, query, arguments)
+
+    class CachedRetriever(retriever_class):
+        async def asearch(self, *args, **kwargs):
+            key = get_key(getattr(self, "query", ""), *args, **kwargs)
+
+            results = cache.get(key)
+            if results is not None:
+                return results
+
+            results = await super().asearch(*args, **kwargs)
+            if results:
+                cache.set(key, results)
+            return results
+
+    if retriever_class.asearch_batch.__func__ is not BaseRetriever.asearch_batch.__func__:
+        async def asearch_batch(cls, queries, max_results=7):
+            keys = [get_key(query, max_results=max_results) for query in queries]
+            results = [cache.get(key) for key in keys]
+            missing = [i for i, result in enumerate(results) if result is None]
+            if missing:
+                found = await retriever_class.asearch_batch.__func__(
+                    cls, [queries[i] for i in missing], max_results=max_results
+                )
+                for i, result in zip(missing, found):
+                    results[i] = result
+                    if result:
+                        cache.set(keys[i], result)
+            return results
+
+        CachedRetriever.asearch_batch = classmethod(asearch_batch)
+
+    CachedRetriever.__name__ = retriever_class.__name__
+    CachedRetriever.__qualname__ = retriever_class.__qualname__
+    return CachedRetriever
+
+
+_caches: Dict[tuple, SearchCache] = {}
+_cached_classes: Dict[tuple, type] = {}
+_caches_lock = threading.Lock()
+
+
+def get_search_cache(cfg) -> Optional[SearchCache]:
+    """Returns the process-wide search cache configured by cfg, or None if caching is disabled"""
+    if not cfg or not cfg.search_cache:
+        return None
+    path = None
+    if cfg.search_cache_backend == "sqlite":
+        path = os.path.abspath(os.path.join(cfg.cache_dir, "search_cache.sqlite3"))
+    key = (path, cfg.search_cache_ttl, cfg.search_cache_max_entries)
+    with _caches_lock:
+        if key not in _caches:
+            _caches[key] = SearchCache(
+                ttl=cfg.search_cache_ttl, max_entries=cfg.search_cache_max_entries, path=path
+            )
+        return _caches[key]
+
+
+def get_cached_retriever(retriever_class, cfg):
+    """Returns retriever_class wrapped with the search cache configured by cfg, if enabled"""
+    cache = get_search_cache(cfg)
+    if cache is None or retriever_class is None:
+        return retriever_class
+    key = (retriever_class, id(cache))
+    with _caches_lock:
+        if key not in _cached_classes:
+            _cached_classes[key] = with_search_cache(retriever_class, cache)
+        return _cached_classes[key]
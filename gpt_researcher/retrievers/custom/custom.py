@@ -1,9 +1,13 @@
 from typing import Any, Dict, List, Optional
-import requests
+import httpx
 import os
 
+from gpt_researcher.utils.http import get_async_client
 
-class CustomRetriever:
+from ..base import BaseRetriever
+
+
+class CustomRetriever(BaseRetriever):
     """
     Custom API Retriever
     """
@@ -26,7 +30,7 @@ class CustomRetriever:
             if key.startswith('RETRIEVER_ARG_')
         }
 
-    def search(self, max_results: int = 5) -> Optional[List[Dict[str, Any]]]:
+    async def asearch(self, max_results: int = 5) -> Optional[List[Dict[str, Any]]]:
         """
         Performs the search using the custom retriever endpoint.
 
@@ -44,9 +48,9 @@ class CustomRetriever:
             ]
         """
         try:
-            response = requests.get(self.endpoint, params={**self.params, 'query': self.query})
+            response = await get_async_client().get(self.endpoint, params={**self.params, 'query': self.query})
             response.raise_for_status()
             return response.json()
-        except requests.RequestException as e:
+        except httpx.HTTPError as e:
             print(f"Failed to retrieve search results: {e}")
             return None
\ No newline at end of file
@@ -1,8 +1,10 @@
 from itertools import islice
+
+from ..base import BaseRetriever, run_blocking_search
 from ..utils import check_pkg
 
 
-class Duckduckgo:
+class Duckduckgo(BaseRetriever):
     """
     Duckduckgo API Retriever
     """
@@ -24,4 +26,8 @@ class Duckduckgo:
         except Exception as e:
             print(f"Error: {e}. Failed fetching sources. Resulting in empty response.")
             search_response = []
-        return search_response
\ No newline at end of file
+        return search_response
+
+    async def asearch(self, max_results=5):
+        """Runs `search` on the retriever threads, since duckduckgo_search only offers a blocking API"""
+        return await run_blocking_search(self.search, max_results)
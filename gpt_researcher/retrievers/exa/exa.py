@@ -1,8 +1,10 @@
 import os
+
+from ..base import BaseRetriever, run_blocking_search
 from ..utils import check_pkg
 
 
-class ExaSearch:
+class ExaSearch(BaseRetriever):
     """
     Exa API Retriever
     """
@@ -63,6 +65,14 @@ class ExaSearch:
         ]
         return search_response
 
+    async def asearch(
+        self, max_results=10, use_autoprompt=False, search_type="neural", **filters
+    ):
+        """Runs `search` on the retriever threads, since the Exa client only offers a blocking API"""
+        return await run_blocking_search(
+            self.search, max_results, use_autoprompt=use_autoprompt, search_type=search_type, **filters
+        )
+
     def find_similar(self, url, exclude_source_domain=False, **filters):
         """
         Finds similar documents to the provided URL using the Exa API.
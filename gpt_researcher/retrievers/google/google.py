@@ -2,11 +2,14 @@
 
 # libraries
 import os
-import requests
 import json
 
+from gpt_researcher.utils.http import get_async_client
 
-class GoogleSearch:
+from ..base import BaseRetriever
+
+
+class GoogleSearch(BaseRetriever):
     """
     Tavily API Retriever
     """
@@ -49,7 +52,7 @@ class GoogleSearch:
                             "You can get a key at https://developers.google.com/custom-search/v1/overview")
         return api_key
 
-    def search(self, max_results=7):
+    async def asearch(self, max_results=7):
         """
         Searches the query
         Returns:
@@ -58,7 +61,7 @@ class GoogleSearch:
         """Useful for general internet search queries using the Google API."""
         print("Searching with query {0}...".format(self.query))
         url = f"https://www.googleapis.com/customsearch/v1?key={self.api_key}&cx={self.cx_key}&q={self.query}&start=1"
-        resp = requests.get(url)
+        resp = await get_async_client().get(url)
 
         if resp is None:
             return
@@ -1,10 +1,12 @@
 import os
 import xml.etree.ElementTree as ET
 
-import requests
+from gpt_researcher.utils.http import get_async_client
 
+from ..base import BaseRetriever
 
-class PubMedCentralSearch:
+
+class PubMedCentralSearch(BaseRetriever):
     """
     PubMed Central API Retriever
     """
@@ -35,7 +37,7 @@ class PubMedCentralSearch:
             )
         return api_key
 
-    def search(self, max_results=10):
+    async def asearch(self, max_results=10):
         """
         Searches the query using the PubMed Central API.
         Args:
@@ -52,7 +54,7 @@ class PubMedCentralSearch:
             "api_key": self.api_key,
             "retmode": "json",
         }
-        response = requests.get(base_url, params=params)
+        response = await get_async_client().get(base_url, params=params)
 
         if response.status_code != 200:
             raise Exception(
@@ -64,7 +66,7 @@ class PubMedCentralSearch:
 
         search_response = []
         for article_id in ids:
-            xml_content = self.fetch([article_id])
+            xml_content = await self.fetch([article_id])
             if self.has_body_content(xml_content):
                 article_data = self.parse_xml(xml_content)
                 if article_data:
@@ -80,7 +82,7 @@ class PubMedCentralSearch:
 
         return search_response
 
-    def fetch(self, ids):
+    async def fetch(self, ids):
         """
         Fetches the full text content for given article IDs.
         Args:
@@ -95,7 +97,7 @@ class PubMedCentralSearch:
             "retmode": "xml",
             "api_key": self.api_key,
         }
-        response = requests.get(base_url, params=params)
+        response = await get_async_client().get(base_url, params=params)
 
         if response.status_code != 200:
             raise Exception(
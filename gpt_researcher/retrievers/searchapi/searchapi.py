@@ -2,11 +2,14 @@
 
 # libraries
 import os
-import requests
 import urllib.parse
 
+from gpt_researcher.utils.http import get_async_client
 
-class SearchApiSearch():
+from ..base import BaseRetriever
+
+
+class SearchApiSearch(BaseRetriever):
     """
     SearchApi Retriever
     """
@@ -32,7 +35,7 @@ class SearchApiSearch():
                             "You can get a key at https://www.searchapi.io/")
         return api_key
 
-    def search(self, max_results=7):
+    async def asearch(self, max_results=7):
         """
         Searches the query
         Returns:
@@ -58,7 +61,7 @@ class SearchApiSearch():
         search_response = []
 
         try:
-            response = requests.get(encoded_url, headers=headers, timeout=20)
+            response = await get_async_client().get(encoded_url, headers=headers, timeout=20)
             if response.status_code == 200:
                 search_results = response.json()
                 if search_results:
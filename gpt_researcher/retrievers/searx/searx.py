@@ -4,8 +4,10 @@
 import os
 from langchain_community.utilities import SearxSearchWrapper
 
+from ..base import BaseRetriever
 
-class SearxSearch():
+
+class SearxSearch(BaseRetriever):
     """
     Tavily API Retriever
     """
@@ -32,14 +34,14 @@ class SearxSearch():
                             "You can get your key from https://searx.space/")
         return api_key
 
-    def search(self, max_results=7):
+    async def asearch(self, max_results=7):
         """
         Searches the query
         Returns:
 
         """
         searx = SearxSearchWrapper(searx_host=os.environ["SEARX_URL"])
-        results = searx.results(self.query, max_results)
+        results = await searx.aresults(self.query, max_results)
         # Normalizing results to match the format of the other search APIs
         search_response = [{"href": obj["link"], "body": obj["snippet"]} for obj in results]
         return search_response
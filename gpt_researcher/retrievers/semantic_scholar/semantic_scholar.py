@@ -1,9 +1,13 @@
 from typing import Dict, List
 
-import requests
+import httpx
 
+from gpt_researcher.utils.http import get_async_client
 
-class SemanticScholarSearch:
+from ..base import BaseRetriever
+
+
+class SemanticScholarSearch(BaseRetriever):
     """
     Semantic Scholar API Retriever
     """
@@ -22,7 +26,7 @@ class SemanticScholarSearch:
         assert sort in self.VALID_SORT_CRITERIA, "Invalid sort criterion"
         self.sort = sort.lower()
 
-    def search(self, max_results: int = 20) -> List[Dict[str, str]]:
+    async def asearch(self, max_results: int = 20) -> List[Dict[str, str]]:
         """
         Perform the search on Semantic Scholar and return results.
 
@@ -37,9 +41,9 @@ class SemanticScholarSearch:
         }
 
         try:
-            response = requests.get(self.BASE_URL, params=params)
+            response = await get_async_client().get(self.BASE_URL, params=params)
             response.raise_for_status()
-        except requests.RequestException as e:
+        except httpx.HTTPError as e:
             print(f"An error occurred while accessing Semantic Scholar API: {e}")
             return []
 
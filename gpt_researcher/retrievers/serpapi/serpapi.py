@@ -2,11 +2,14 @@
 
 # libraries
 import os
-import requests
 import urllib.parse
 
+from gpt_researcher.utils.http import get_async_client
 
-class SerpApiSearch():
+from ..base import BaseRetriever
+
+
+class SerpApiSearch(BaseRetriever):
     """
     SerpApi Retriever
     """
@@ -32,7 +35,7 @@ class SerpApiSearch():
                             "You can get a key at https://serpapi.com/")
         return api_key
 
-    def search(self, max_results=7):
+    async def asearch(self, max_results=7):
         """
         Searches the query
         Returns:
@@ -50,7 +53,7 @@ class SerpApiSearch():
         encoded_url = url + "?" + urllib.parse.urlencode(params)
         search_response = []
         try:
-            response = requests.get(encoded_url, timeout=10)
+            response = await get_async_client().get(encoded_url, timeout=10)
             if response.status_code == 200:
                 search_results = response.json()
                 if search_results:
@@ -1,15 +1,25 @@
 # Google Serper Retriever
 
 # libraries
+import asyncio
 import os
-import requests
 import json
 
+from gpt_researcher.utils.http import get_async_client
 
-class SerperSearch():
+from ..base import BaseRetriever
+
+
+class SerperSearch(BaseRetriever):
     """
     Google Serper Retriever
     """
+
+    URL = "https://google.serper.dev/search"
+
+    # Serper answers at most this many queries in one batch request
+    MAX_BATCH_SIZE = 100
+
     def __init__(self, query):
         """
         Initializes the SerperSearch object
@@ -32,7 +42,7 @@ class SerperSearch():
                             "You can get a key at https://serper.dev/")
         return api_key
 
-    def search(self, max_results=7):
+    async def asearch(self, max_results=7):
         """
         Searches the query
         Returns:
@@ -41,17 +51,9 @@ class SerperSearch():
         print("Searching with query {0}...".format(self.query))
         """Useful for general internet search queries using the Serp API."""
 
-
         # Search the query (see https://serper.dev/playground for the format)
-        url = "https://google.serper.dev/search"
-
-        headers = {
-        'X-API-KEY': self.api_key,
-        'Content-Type': 'application/json'
-        }
         data = json.dumps({"q": self.query, "num": max_results})
-
-        resp = requests.request("POST", url, timeout=10, headers=headers, data=data)
+        resp = await get_async_client().post(self.URL, timeout=10, headers=self.get_headers(), content=data)
 
         # Preprocess the results
         if resp is None:
@@ -63,19 +65,53 @@ class SerperSearch():
         if search_results is None:
             return
 
-        results = search_results["organic"]
+        return self.normalize_results(search_results)
+
+    @classmethod
+    async def asearch_batch(cls, queries, max_results=7):
+        """
+        Searches all queries with one request per MAX_BATCH_SIZE queries, using Serper's
+        batch endpoint, and returns their results in the order of `queries`.
+        """
+        if not queries:
+            return []
+        print("Searching with queries {0}...".format(queries))
+        headers = cls(queries[0]).get_headers()
+
+        async def search_batch(batch):
+            data = json.dumps([{"q": query, "num": max_results} for query in batch])
+            resp = await get_async_client().post(cls.URL, timeout=10, headers=headers, content=data)
+            return json.loads(resp.text)
+
+        batches = [queries[start:start + cls.MAX_BATCH_SIZE] for start in range(0, len(queries), cls.MAX_BATCH_SIZE)]
+        answers = await asyncio.gather(*[search_batch(batch) for batch in batches], return_exceptions=True)
+
         search_results = []
+        for batch, batch_answers in zip(batches, answers):
+            if not isinstance(batch_answers, list) or len(batch_answers) != len(batch):
+                print(f"Error: {batch_answers}. Serper batch search failed. Resulting in empty response.")
+                batch_answers = [{}] * len(batch)
+            search_results.extend(cls.normalize_results(answer) for answer in batch_answers)
+        return search_results
+
+    def get_headers(self):
+        return {
+            'X-API-KEY': self.api_key,
+            'Content-Type': 'application/json'
+        }
 
-        # Normalize the results to match the format of the other search APIs
+    @staticmethod
+    def normalize_results(search_results):
+        """Normalize the results to match the format of the other search APIs"""
+        results = search_results.get("organic", [])
+        normalized = []
         for result in results:
             # skip youtube results
             if "youtube.com" in result["link"]:
                 continue
-            search_result = {
+            normalized.append({
                 "title": result["title"],
                 "href": result["link"],
                 "body": result["snippet"],
-            }
-            search_results.append(search_result)
-
-        return search_results
+            })
+        return normalized
@@ -1,103 +1,262 @@
 # Tavily API Retriever
 
 # libraries
-import os
-from typing import Literal, Sequence, Optional
-import requests
+import asyncio
+import atexit
+import hashlib
 import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Literal, Optional, Sequence
 
-
-from dataclasses import dataclass, field
 from dotenv import load_dotenv
-from typing import Dict, Any, List, Optional, Deque
-from datetime import datetime, timedelta
-from collections import deque
-import threading
-import os
-from pydantic_settings import BaseSettings  # 更改这里
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import Field
+from pydantic_settings import BaseSettings
 
+from gpt_researcher.scraper.pool import parse_retry_after
+from gpt_researcher.utils.http import get_async_client
+
+from ..base import BaseRetriever
 
 
 load_dotenv()
 
+# 401/403: key无效或被禁用; 429: 速率超限; 432/433: 套餐或按量付费额度用尽
+AUTH_ERRORS = (401, 403)
+RATE_LIMIT_ERRORS = (429,)
+QUOTA_ERRORS = (432, 433)
+
+# 内存中key状态写入SQLite的最长间隔（秒）
+FLUSH_INTERVAL = 5.0
+
+
+class NoAPIKeyAvailable(Exception):
+    """没有可用的API Key（未配置，或所有key的每日额度已用尽）"""
+
 
 @dataclass
 class APIKeyStatus:
     """API Key的状态信息"""
     key: str
-    last_used: datetime = field(default_factory=datetime.now)
+    next_free: float = 0.0  # 下一个可用的请求时间点（time.time()）
+    day: str = ""  # request_count所属的日期（UTC）
     request_count: int = 0
-    is_available: bool = True
     error_count: int = 0
-    last_error_time: Optional[datetime] = None
+    consecutive_errors: int = 0
+    unavailable_until: float = 0.0
+    exhausted_day: str = ""  # 额度用尽的日期（UTC）
+    last_error: Optional[int] = None
+
+    @property
+    def key_id(self) -> str:
+        """用于持久化和统计的key标识，不保存key本身"""
+        return hashlib.sha256(self.key.encode("utf-8")).hexdigest()[:16]
+
+    def stats(self, now: float) -> Dict[str, Any]:
+        return {
+            "key": f"{self.key[:5]}...{self.key[-4:]}",
+            "requests_today": self.request_count,
+            "errors": self.error_count,
+            "consecutive_errors": self.consecutive_errors,
+            "last_error": self.last_error,
+            "available_in": round(max(self.unavailable_until - now, 0), 1),
+            "exhausted": self.exhausted_day == self.day,
+        }
+
 
 class RateLimit:
-    """速率限制配置"""
+    """速率限制配置（每个key）"""
     def __init__(self,
                  requests_per_second: float,
                  burst_limit: Optional[int] = None,
-                 daily_limit: Optional[int] = None):
+                 daily_limit: Optional[int] = None,
+                 cooldown: float = 5.0,
+                 max_cooldown: float = 3600.0):
         self.requests_per_second = requests_per_second  # 每秒请求数
         self.min_interval = 1.0 / requests_per_second  # 最小请求间隔
         self.burst_limit = burst_limit  # 突发请求限制
         self.daily_limit = daily_limit  # 每日请求限制
+        self.cooldown = cooldown  # 出错后的初始冷却时间，每次连续出错翻倍
+        self.max_cooldown = max_cooldown  # 冷却时间上限
 
 
 class APIKeyPool:
-    """API Key池管理器"""
+    """
+    API Key池管理器
+
+    `acquire` 为请求预约所有key中最早的空闲时间点，并在该时间点之前异步等待，
+    因此多个key可以以总速率并发使用，请求不会因为暂时没有空闲key而丢失。
+    请求结束后通过 `report` 上报状态码：401/403/429 会让key进入指数增长的冷却期，
+    432/433 表示额度用尽，key在当天（UTC）剩余时间内不再使用。
+    每个key的当日请求数和错误状态保存在SQLite文件中（`path`），重启后不会丢失。
+    状态变化只在内存中标记，每隔FLUSH_INTERVAL秒由 `acquire` 在工作线程中批量写入，
+    进程退出时再写入一次，因此事件循环线程上不会执行SQLite写入。
+    锁只保护内存中的状态，从不在持有锁时等待，因此可以在多个事件循环和线程中共享。
+    """
 
     def __init__(self,
                  keys: str,
-                 rate_limit: RateLimit):
-        self.keys: Deque[APIKeyStatus] = deque(
-            [APIKeyStatus(key=k) for k in keys.split(",") if k.strip()]
-        )
+                 rate_limit: RateLimit,
+                 path: Optional[str] = None):
+        self.keys: List[APIKeyStatus] = []
+        for k in dict.fromkeys(k.strip() for k in keys.split(",")):
+            if k:
+                self.keys.append(APIKeyStatus(key=k))
         self.rate_limit = rate_limit
         self.lock = threading.Lock()
-        self.last_reset = datetime.now()
-        self._daily_count = 0
-
-    def get_next_key(self) -> Optional[str]:
-        """获取下一个可用的API Key"""
+        self._conn = None
+        self._conn_lock = threading.Lock()
+        self._dirty: Dict[str, APIKeyStatus] = {}
+        self._flushed_at = time.monotonic()
+        self._flushing = False
+
+        if path and self.keys:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS key_usage (key_id TEXT PRIMARY KEY, day TEXT NOT NULL, "
+                "request_count INTEGER NOT NULL, error_count INTEGER NOT NULL, "
+                "consecutive_errors INTEGER NOT NULL, unavailable_until REAL NOT NULL, exhausted_day TEXT NOT NULL)"
+            )
+            self._conn.commit()
+            self._load()
+            atexit.register(self.flush)
+
+    @staticmethod
+    def _today() -> str:
+        return datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+    def _load(self) -> None:
+        """从SQLite恢复每个key的用量和冷却状态"""
+        today = self._today()
+        for status in self.keys:
+            row = self._conn.execute(
+                "SELECT day, request_count, error_count, consecutive_errors, unavailable_until, exhausted_day "
+                "FROM key_usage WHERE key_id = ?", (status.key_id,)
+            ).fetchone()
+            if row is None:
+                continue
+            day, request_count, status.error_count, status.consecutive_errors, status.unavailable_until, \
+                status.exhausted_day = row
+            status.day = today
+            status.request_count = request_count if day == today else 0
+
+    def _save(self, status: APIKeyStatus) -> None:
+        """标记key的状态待持久化。调用者持有锁。"""
+        if self._conn is not None:
+            self._dirty[status.key_id] = status
+
+    def flush(self) -> None:
+        """把待持久化的key状态在一个事务中写入SQLite。会阻塞，不要在事件循环线程上调用。"""
         with self.lock:
-            if not self.keys:
-                return None
-
-            current_time = datetime.now()
-
-            # 重置每日计数
-            if (current_time - self.last_reset).days >= 1:
-                self._daily_count = 0
-                self.last_reset = current_time
-
-            # 检查每日限制
-            if (self.rate_limit.daily_limit and
-                    self._daily_count >= self.rate_limit.daily_limit):
+            rows = [
+                (status.key_id, status.day, status.request_count, status.error_count,
+                 status.consecutive_errors, status.unavailable_until, status.exhausted_day)
+                for status in self._dirty.values()
+            ]
+            self._dirty.clear()
+            self._flushed_at = time.monotonic()
+        try:
+            if rows:
+                with self._conn_lock:
+                    self._conn.executemany("INSERT OR REPLACE INTO key_usage VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+                    self._conn.commit()
+        finally:
+            self._flushing = False
+
+    def _schedule_flush(self) -> None:
+        """距离上次写入超过FLUSH_INTERVAL时，在工作线程中写入待持久化的状态，不等待其完成"""
+        with self.lock:
+            if (self._flushing or not self._dirty
+                    or time.monotonic() - self._flushed_at < FLUSH_INTERVAL):
+                return
+            self._flushing = True
+        asyncio.get_running_loop().run_in_executor(None, self.flush)
+
+    def _reserve(self) -> Optional[tuple]:
+        """预约最早的空闲时间点，返回 (key, 等待秒数)；所有key当日额度用尽时返回None"""
+        with self.lock:
+            now = time.time()
+            today = self._today()
+            best = None
+            for status in self.keys:
+                # 重置每日计数
+                if status.day != today:
+                    status.day = today
+                    status.request_count = 0
+                # 检查每日限制和额度
+                if self.rate_limit.daily_limit and status.request_count >= self.rate_limit.daily_limit:
+                    continue
+                if status.exhausted_day == today:
+                    continue
+                start = max(status.next_free, status.unavailable_until, now)
+                if best is None or start < best[1]:
+                    best = (status, start)
+            if best is None:
                 return None
 
-            # 尝试找到一个可用的key
-            attempts = len(self.keys)
-            while attempts > 0:
-                key_status = self.keys[0]
-
-                # 检查这个key是否可用
-                time_since_last_use = (current_time - key_status.last_used).total_seconds()
-                if (time_since_last_use >= self.rate_limit.min_interval and
-                        key_status.is_available):
-                    key_status.last_used = current_time
-                    key_status.request_count += 1
-                    self._daily_count += 1
-
-                    # 将使用过的key放到队列末尾
-                    self.keys.rotate(-1)
-                    return key_status.key
-
-                # 如果当前key不可用，轮转到下一个
-                self.keys.rotate(-1)
-                attempts -= 1
-
-            return None
+            status, start = best
+            status.next_free = start + self.rate_limit.min_interval
+            status.request_count += 1
+            self._save(status)
+            return status.key, start - now
+
+    async def acquire(self) -> str:
+        """异步等待并返回下一个可用的API Key；等待时间由调用方（如RETRIEVER_TIMEOUT）限制"""
+        if not self.keys:
+            raise NoAPIKeyAvailable("No Tavily API key configured.")
+        reservation = self._reserve()
+        if reservation is None:
+            raise NoAPIKeyAvailable("The daily limit of every Tavily API key is used up.")
+        key, delay = reservation
+        self._schedule_flush()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return key
+
+    def report(self, key: str, status_code: Optional[int], retry_after: Optional[float] = None) -> None:
+        """
+        上报一次请求的结果，更新key的健康状态
+        Args:
+            status_code: 响应状态码；请求本身失败（如超时）时为None
+            retry_after: 429响应的Retry-After秒数
+        """
+        with self.lock:
+            status = next((s for s in self.keys if s.key == key), None)
+            if status is None:
+                return
+            now = time.time()
+            if status_code is not None and status_code < 400:
+                status.consecutive_errors = 0
+            elif status_code in AUTH_ERRORS + RATE_LIMIT_ERRORS:
+                status.error_count += 1
+                status.consecutive_errors += 1
+                status.last_error = status_code
+                # 服务端给出Retry-After时以它为准，否则指数退避
+                cooldown = retry_after if retry_after is not None else min(
+                    self.rate_limit.cooldown * 2 ** (status.consecutive_errors - 1), self.rate_limit.max_cooldown
+                )
+                status.unavailable_until = now + cooldown
+            elif status_code in QUOTA_ERRORS:
+                status.error_count += 1
+                status.last_error = status_code
+                status.exhausted_day = self._today()
+            else:
+                # 服务端错误或网络错误与key无关，只计数
+                status.error_count += 1
+                status.last_error = status_code
+            self._save(status)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """每个key的用量和健康状态"""
+        with self.lock:
+            now = time.time()
+            return [status.stats(now) for status in self.keys]
 
 
 class APIKeyManager:
@@ -109,22 +268,26 @@ class APIKeyManager:
     def initialize_pool(self,
                         pool_name: str,
                         keys: str,
-                        rate_limit: RateLimit):
+                        rate_limit: RateLimit,
+                        path: Optional[str] = None):
         """初始化特定的API Key池"""
-        self.pools[pool_name] = APIKeyPool(keys, rate_limit)
+        self.pools[pool_name] = APIKeyPool(keys, rate_limit, path)
+
+    def get_pool(self, pool_name: str) -> Optional[APIKeyPool]:
+        """获取指定的API Key池"""
+        return self.pools.get(pool_name)
 
-    def get_next_key(self, pool_name: str) -> Optional[str]:
-        """从指定的池中获取下一个可用的key"""
-        if pool_name in self.pools:
-            return self.pools[pool_name].get_next_key()
-        return None
 
 class Settings(BaseSettings):
     # API Key管理器
     api_key_manager: APIKeyManager = Field(default_factory=APIKeyManager)
 
-    TAVILY_API_KEYS: str = os.getenv("TAVILY_API_KEYS","")
-
+    # 多个key用逗号分隔；未设置时使用TAVILY_API_KEY
+    TAVILY_API_KEYS: str = Field(default_factory=lambda: os.getenv("TAVILY_API_KEY", ""))
+    TAVILY_REQUESTS_PER_SECOND: float = 10.0  # 每个key每秒请求数
+    TAVILY_DAILY_LIMIT: Optional[int] = 1000  # 每个key每日请求数
+    # 未设置时保存在默认Config的CACHE_DIR下；设为空字符串则不持久化
+    TAVILY_KEY_USAGE_PATH: Optional[str] = None
 
     def __init__(self, **data: Any):
         super().__init__(**data)
@@ -132,31 +295,52 @@ class Settings(BaseSettings):
 
     def _initialize_api_key_pools(self):
         """初始化所有API Key池"""
-        # 从环境变量读取多个API key
-
-        print("开始初始化api key池")
+        path = self.TAVILY_KEY_USAGE_PATH
+        if path is None:
+            from gpt_researcher.config import Config
+            path = os.path.join(Config.get_default().cache_dir, "tavily_key_usage.sqlite3")
         self.api_key_manager.initialize_pool(
             "tavily",
             self.TAVILY_API_KEYS,
             RateLimit(
-                requests_per_second=10.0,  # OpenAI的限制是每秒80次
-                daily_limit=1000  # 示例每日限制
-            )
+                requests_per_second=self.TAVILY_REQUESTS_PER_SECOND,
+                daily_limit=self.TAVILY_DAILY_LIMIT,
+            ),
+            path or None,
         )
 
-    def get_tavily_api_key(self) -> Optional[str]:
-        """获取下一个可用的tavily API Key"""
-        return self.api_key_manager.get_next_key("tavily")
+    @property
+    def tavily_pool(self) -> APIKeyPool:
+        """tavily的API Key池"""
+        return self.api_key_manager.get_pool("tavily")
+
+
+_settings: Optional[Settings] = None
+_settings_lock = threading.Lock()
+
+
+def get_settings() -> Settings:
+    """Returns the Tavily settings and key pool, created on first use rather than at import"""
+    global _settings
+    with _settings_lock:
+        if _settings is None:
+            _settings = Settings()
+        return _settings
 
-settings = Settings()
 
+def get_tavily_key_stats() -> List[Dict[str, Any]]:
+    """Usage and health of each pooled Tavily API key, for monitoring"""
+    return get_settings().tavily_pool.stats()
 
 
-class TavilySearch():
+class TavilySearch(BaseRetriever):
     """
     Tavily API Retriever
     """
 
+    # Number of keys tried before a search fails on 401/429/432/433 answers
+    MAX_ATTEMPTS = 3
+
     def __init__(self, query, headers=None, topic="general"):
         """
         Initializes the TavilySearch object
@@ -174,21 +358,18 @@ class TavilySearch():
 
     def get_api_key(self):
         """
-        Gets the Tavily API key
+        Gets the Tavily API key passed in the headers. Without one, a key of the shared
+        key pool is acquired for every request.
         Returns:
-
+            The API key from the headers, or None to use the key pool
         """
         api_key = self.headers.get("tavily_api_key")
-        if not api_key:
-            try:
-                api_key = settings.get_tavily_api_key()
-
-            except KeyError:
-                raise Exception(
-                    "Tavily API key not found. Please set the TAVILY_API_KEY environment variable.")
+        if not api_key and not get_settings().tavily_pool.keys:
+            raise Exception(
+                "Tavily API key not found. Please set the TAVILY_API_KEY or TAVILY_API_KEYS environment variable.")
         return api_key
 
-    def _search(self,
+    async def _search(self,
                 query: str,
                 search_depth: Literal["basic", "advanced"] = "basic",
                 topic: str = "general",
@@ -203,6 +384,8 @@ class TavilySearch():
                 ) -> dict:
         """
         Internal search method to send the request to the API.
+        Pooled keys are reported back to the pool after each request; on an answer that
+        puts the key in cool-down, the request is retried with the next free key.
         """
 
         data = {
@@ -216,12 +399,27 @@ class TavilySearch():
             "include_domains": include_domains,
             "exclude_domains": exclude_domains,
             "include_images": include_images,
-            "api_key": self.api_key,
             "use_cache": use_cache,
         }
 
-        response = requests.post(self.base_url, data=json.dumps(
-            data), headers=self.headers, timeout=100)
+        pool = None if self.api_key else get_settings().tavily_pool
+        for attempt in range(self.MAX_ATTEMPTS):
+            data["api_key"] = self.api_key or await pool.acquire()
+            try:
+                response = await get_async_client().post(self.base_url, content=json.dumps(
+                    data), headers=self.headers, timeout=100)
+            except Exception:
+                if pool:
+                    pool.report(data["api_key"], None)
+                raise
+
+            if pool:
+                retry_after = parse_retry_after(response.headers.get("retry-after"))
+                pool.report(data["api_key"], response.status_code, retry_after)
+                if (response.status_code in AUTH_ERRORS + RATE_LIMIT_ERRORS + QUOTA_ERRORS
+                        and attempt < self.MAX_ATTEMPTS - 1):
+                    continue
+            break
 
         if response.status_code == 200:
             return response.json()
@@ -229,7 +427,7 @@ class TavilySearch():
             # Raises a HTTPError if the HTTP request returned an unsuccessful status code
             response.raise_for_status()
 
-    def search(self, max_results=7):
+    async def asearch(self, max_results=7):
         """
         Searches the query
         Returns:
@@ -237,7 +435,7 @@ class TavilySearch():
         """
         try:
             # Search the query
-            results = self._search(
+            results = await self._search(
                 self.query, search_depth="basic", max_results=max_results, topic=self.topic)
             sources = results.get("results", [])
             if not sources:
@@ -1,11 +1,14 @@
+import asyncio
+
 from langchain_community.retrievers import ArxivRetriever
 
 
 class ArxivScraper:
 
-    def __init__(self, link, session=None):
+    def __init__(self, link, session=None, settings=None):
         self.link = link
         self.session = session
+        self.settings = settings
 
     def scrape(self):
         """
@@ -20,3 +23,7 @@ class ArxivScraper:
         retriever = ArxivRetriever(load_max_docs=2, doc_content_chars_max=None)
         docs = retriever.get_relevant_documents(query=query)
         return docs[0].page_content
+
+    async def ascrape(self) -> str:
+        """Runs the blocking `scrape` in a worker thread"""
+        return await asyncio.to_thread(self.scrape)
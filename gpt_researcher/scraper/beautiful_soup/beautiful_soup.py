@@ -1,16 +1,37 @@
+import asyncio
+
+import requests
 from bs4 import BeautifulSoup
 
+from gpt_researcher.utils.http import get_session
+
+from ..extract import extract_text
+from ..fetch import PDF, stream_fetch
+from ..parser import get_parser
+from ..pymupdf.pymupdf import extract_pdf_text
+from ..settings import ScraperSettings
+
 
 class BeautifulSoupScraper:
 
-    def __init__(self, link, session=None):
+    def __init__(self, link, session=None, settings=None):
         self.link = link
         self.session = session
+        self.settings = settings or ScraperSettings.from_config()
+        self.status_code = None
+        self.response_headers = {}
+        self.parser = get_parser(self.settings.parser)
+        self.main_content = self.settings.main_content
+        self.max_bytes = self.settings.max_bytes
+        self.pdf_max_bytes = self.settings.pdf_max_bytes
+        self.max_pages = self.settings.pdf_max_pages
+        self.max_chars = self.settings.pdf_max_chars
 
     def scrape(self):
         """
-        This function scrapes content from a webpage by making a GET request, parsing the HTML using
-        BeautifulSoup, and extracting script and style elements before returning the cleaned content.
+        This function scrapes content from a webpage by making a blocking GET request through `session`
+        when it is a `requests.Session`, or else the shared session with the configured user agent, parsing
+        the HTML with the configured parser backend, and extracting the text without script and style elements.
         
         Returns:
           The `scrape` method is returning the cleaned and extracted content from the webpage specified
@@ -19,48 +40,67 @@ class BeautifulSoupScraper:
         occurs during the process, an error message is printed and an empty string is returned.
         """
         try:
-            response = self.session.get(self.link, timeout=4)
-            soup = BeautifulSoup(
-                response.content, "lxml", from_encoding=response.encoding
-            )
-
-            for script_or_style in soup(["script", "style"]):
-                script_or_style.extract()
-
-            raw_content = self.get_content_from_url(soup)
-            lines = (line.strip() for line in raw_content.splitlines())
-            chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-            content = "\n".join(chunk for chunk in chunks if chunk)
-            return content
+            response = self._get_session().get(self.link, timeout=4)
+            return self._parse(response.content, response.encoding)
 
         except Exception as e:
             print("Error! : " + str(e))
             return ""
 
-    def get_content_from_url(self, soup: BeautifulSoup) -> str:
-        """Get the relevant text from the soup with improved filtering"""
-        text_elements = []
-        tags = ["h1", "h2", "h3", "h4", "h5", "p", "li", "div", "span"]
-
-        for element in soup.find_all(tags):
-            # Skip empty elements
-            if not element.text.strip():
-                continue
+    async def ascrape(self, headers=None):
+        """
+        Async counterpart of `scrape`. Expects `session` to be an async HTTP client
+        (e.g. `httpx.AsyncClient`); the body is streamed on the event loop and only the
+        parse is pushed to a worker thread.
 
-            # Skip elements with very short text (likely buttons or links)
-            if len(element.text.split()) < 3:
-                continue
+        The kind of the body is sniffed from its first bytes: PDFs are handed to the PDF
+        extractor, bodies that are neither HTML nor PDF are dropped without being downloaded,
+        and HTML bodies are cut at `max_bytes`.
 
-            # Check if the element is likely to be navigation or a menu
-            parent_classes = element.parent.get('class', [])
-            if any(cls in ['nav', 'menu', 'sidebar', 'footer'] for cls in parent_classes):
-                continue
+        Args:
+          headers: Optional extra request headers, e.g. conditional headers for revalidation.
+        After the call, `status_code` and `response_headers` describe the response; a 304
+        Not Modified answer returns an empty string. Unlike `scrape`, failed requests raise,
+        so callers can tell them apart from pages without text.
+        """
+        self.status_code = None
+        self.response_headers = {}
+        result = None
+        try:
+            result = await stream_fetch(
+                self.session, self.link, headers=headers, max_bytes=self.max_bytes,
+                pdf_max_bytes=self.pdf_max_bytes
+            )
+            self.status_code = result.status_code
+            self.response_headers = result.headers
+            if result.body is None:
+                return ""
+            if result.kind == PDF:
+                return await asyncio.to_thread(
+                    extract_pdf_text, result.body.source(), self.max_pages, self.max_chars
+                )
+            return await asyncio.to_thread(self._parse, result.body.read(), result.encoding)
+        finally:
+            if result is not None:
+                result.close()
 
-            # Remove excess whitespace and join lines
-            cleaned_text = ' '.join(element.text.split())
+    def _get_session(self) -> requests.Session:
+        """The blocking session of `scrape`: `session` if it is one, else the shared one of the settings"""
+        if isinstance(self.session, requests.Session):
+            return self.session
+        return get_session(self.settings.user_agent, self.settings.http)
 
-            # Add the cleaned text to our list of elements
-            text_elements.append(cleaned_text)
+    def _parse(self, html, encoding=None) -> str:
+        """
+        Parses the html with the configured parser backend and returns the cleaned text,
+        or only the main content of the page when `main_content` is set
+        """
+        raw_content = self.parser.extract_text(html, encoding, main_content=self.main_content)
+        lines = (line.strip() for line in raw_content.splitlines())
+        chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
+        content = "\n".join(chunk for chunk in chunks if chunk)
+        return content
 
-        # Join all text elements with newlines
-        return '\n\n'.join(text_elements)
+    def get_content_from_url(self, soup: BeautifulSoup) -> str:
+        """Get the relevant text from the soup, walking the document once"""
+        return extract_text(soup)
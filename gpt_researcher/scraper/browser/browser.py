@@ -1,59 +1,73 @@
 from __future__ import annotations
 
+import asyncio
+import copy
 import traceback
-import pickle
-from pathlib import Path
 from sys import platform
-import time
-import random
-import string
-import os
 
 from bs4 import BeautifulSoup
 
+from ..extract import extract_text
+from ..fetch import ScrapeError
+from ..parser import get_parser
+from ..settings import ScraperSettings
+from .pool import get_browser_pool
 from .processing.scrape_skills import (scrape_pdf_with_pymupdf,
                                        scrape_pdf_with_arxiv)
 
-FILE_DIR = Path(__file__).parent.parent
+
+# Selenium cookie fields and their names in the Chrome DevTools Network.setCookies command
+CDP_COOKIE_FIELDS = {
+    "name": "name", "value": "value", "domain": "domain", "path": "path", "secure": "secure",
+    "httpOnly": "httpOnly", "sameSite": "sameSite", "expiry": "expires",
+}
 
 
 class BrowserScraper:
-    def __init__(self, url: str, session=None):
+    def __init__(self, url: str, session=None, settings=None):
         self.url = url
         self.session = session
+        self.settings = settings or ScraperSettings.from_config()
         self.selenium_web_browser = "chrome"
         self.headless = False
-        self.user_agent = ("Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-                           "AppleWebKit/537.36 (KHTML, like Gecko) "
-                           "Chrome/128.0.0.0 Safari/537.36")
+        self.user_agent = self.settings.user_agent or ("Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+                                                       "AppleWebKit/537.36 (KHTML, like Gecko) "
+                                                       "Chrome/128.0.0.0 Safari/537.36")
         self.driver = None
+        self.parser = get_parser(self.settings.parser)
+        self.main_content = self.settings.main_content
         self.use_browser_cookies = False
+        self.pool_size = self.settings.browser_pool_size
+        self.page_timeout = self.settings.browser_page_timeout
         self._import_selenium()  # Import only if used to avoid unnecessary dependencies
-        self.cookie_filename = f"{self._generate_random_string(8)}.pkl"
 
     def scrape(self) -> str:
+        """Returns the text of the page; raises ScrapeError or the browser's error on failure"""
         if not self.url:
-            print("URL not specified")
-            return "A URL was not specified, cancelling request to browse website."
+            raise ScrapeError("A URL was not specified, cancelling request to browse website.")
 
+        pool = self._get_pool()
         try:
-            self.setup_driver()
-            self._visit_google_and_save_cookies()
-            self._load_saved_cookies()
-            self._add_header()
-
-            text = self.scrape_text_with_selenium()
-            return text
-        except Exception as e:
-            print(f"An error occurred during scraping: {str(e)}")
-            print("Full stack trace:")
-            print(traceback.format_exc())
-            return f"An error occurred: {str(e)}\n\nStack trace:\n{traceback.format_exc()}"
+            # Browsers are borrowed from the process-wide pool and stay open for the next page
+            with pool.driver() as driver:
+                self.driver = driver
+                self._load_pool_cookies(pool)
+                text = self.scrape_text_with_selenium()
+                pool.save_cookies(self.driver.get_cookies())
+                return text
         finally:
-            if self.driver:
-                # print("Closing browser...")
-                self.driver.quit()
-            self._cleanup_cookie_file()
+            self.driver = None
+
+    async def ascrape(self) -> str:
+        """Runs the blocking selenium `scrape` on the executor of the browser pool"""
+        return await asyncio.get_running_loop().run_in_executor(self._get_pool().executor, self.scrape)
+
+    def _get_pool(self):
+        return get_browser_pool(
+            (self.selenium_web_browser, self.headless, self.user_agent, self.use_browser_cookies),
+            self._start_session,
+            self.pool_size,
+        )
 
     def _import_selenium(self):
         try:
@@ -77,7 +91,17 @@ class BrowserScraper:
             raise ImportError(
                 "Selenium is required but not installed. See error message above for installation instructions.") from e
 
-    def setup_driver(self) -> None:
+    def _start_session(self):
+        """
+        Starts a browser for the pool. Runs on a copy of this scraper, so browsers started
+        concurrently from several threads do not share the `driver` attribute.
+        """
+        session = copy.copy(self)
+        session.driver = None
+        return session.setup_driver()
+
+    def setup_driver(self):
+        """Starts a new browser session and returns its driver"""
         # print(f"Setting up {self.selenium_web_browser} driver...")
 
         options_available = {
@@ -99,31 +123,40 @@ class BrowserScraper:
                 self.driver = webdriver.Safari(options=options)
             else:  # chrome
                 if platform == "linux" or platform == "linux2":
+                    # No fixed --remote-debugging-port: chromedriver picks a free one per browser
                     options.add_argument("--disable-dev-shm-usage")
-                    options.add_argument("--remote-debugging-port=9222")
                 options.add_argument("--no-sandbox")
                 options.add_experimental_option("prefs", {"download_restrictions": 3})
                 self.driver = webdriver.Chrome(options=options)
+            self.driver.set_page_load_timeout(self.page_timeout)
 
             if self.use_browser_cookies:
                 self._load_browser_cookies()
+            self._visit_google_and_save_cookies()
 
             # print(f"{self.selenium_web_browser.capitalize()} driver set up successfully.")
+            return self.driver
         except Exception as e:
             print(f"Failed to set up {self.selenium_web_browser} driver: {str(e)}")
             print("Full stack trace:")
             print(traceback.format_exc())
+            if self.driver:
+                self.driver.quit()
             raise
 
-    def _load_saved_cookies(self):
-        """Load saved cookies before visiting the target URL"""
-        cookie_file = Path(self.cookie_filename)
-        if cookie_file.exists():
-            cookies = pickle.load(open(self.cookie_filename, "rb"))
-            for cookie in cookies:
-                self.driver.add_cookie(cookie)
-        else:
-            print("No saved cookies found.")
+    def _load_pool_cookies(self, pool):
+        """Hands the cookies collected by every session of the pool to the current browser"""
+        cookies = pool.get_cookies()
+        if not cookies or not hasattr(self.driver, "execute_cdp_cmd"):
+            return
+        try:
+            # Through CDP, cookies can be set for any domain without first loading a page from it
+            self.driver.execute_cdp_cmd("Network.setCookies", {"cookies": [
+                {CDP_COOKIE_FIELDS[key]: value for key, value in cookie.items() if key in CDP_COOKIE_FIELDS}
+                for cookie in cookies
+            ]})
+        except Exception as e:
+            print(f"Failed to load pooled cookies: {str(e)}")
 
     def _load_browser_cookies(self):
         """Load cookies directly from the browser"""
@@ -144,21 +177,6 @@ class BrowserScraper:
         for cookie in cookies:
             self.driver.add_cookie({'name': cookie.name, 'value': cookie.value, 'domain': cookie.domain})
 
-    def _cleanup_cookie_file(self):
-        """Remove the cookie file"""
-        cookie_file = Path(self.cookie_filename)
-        if cookie_file.exists():
-            try:
-                os.remove(self.cookie_filename)
-            except Exception as e:
-                print(f"Failed to remove cookie file: {str(e)}")
-        else:
-            print("No cookie file found to remove.")
-
-    def _generate_random_string(self, length):
-        """Generate a random string of specified length"""
-        return ''.join(random.choices(string.ascii_letters + string.digits, k=length))
-
     def _get_domain(self):
         """Extract domain from URL"""
         from urllib.parse import urlparse
@@ -167,32 +185,30 @@ class BrowserScraper:
         return domain[4:] if domain.startswith('www.') else domain
 
     def _visit_google_and_save_cookies(self):
-        """Visit Google and save cookies before navigating to the target URL"""
+        """Visit Google once when a browser starts, so it carries Google's cookies like a regular user"""
         try:
             self.driver.get("https://www.google.com")
-            time.sleep(2)  # Wait for cookies to be set
-
-            # Save cookies to a file
-            cookies = self.driver.get_cookies()
-            pickle.dump(cookies, open(self.cookie_filename, "wb"))
-
-            # print("Google cookies saved successfully.")
+            self._wait_for_page_load()
         except Exception as e:
             print(f"Failed to visit Google and save cookies: {str(e)}")
             print("Full stack trace:")
             print(traceback.format_exc())
 
+    def _wait_for_page_load(self):
+        """Waits until the document has finished loading"""
+        WebDriverWait(self.driver, self.page_timeout, poll_frequency=0.1).until(
+            lambda driver: driver.execute_script("return document.readyState") == "complete"
+        )
+
     def scrape_text_with_selenium(self) -> str:
         self.driver.get(self.url)
 
         try:
-            WebDriverWait(self.driver, 20).until(
+            WebDriverWait(self.driver, self.page_timeout, poll_frequency=0.1).until(
                 EC.presence_of_element_located((By.TAG_NAME, "body"))
             )
         except TimeoutException as e:
-            print("Timed out waiting for page to load")
-            print(f"Full stack trace:\n{traceback.format_exc()}")
-            return "Page load timed out"
+            raise ScrapeError(f"Timed out waiting for {self.url} to load") from e
 
         self._scroll_to_bottom()
 
@@ -204,12 +220,7 @@ class BrowserScraper:
         else:
             # print("Extracting page content...")
             page_source = self.driver.execute_script("return document.body.outerHTML;")
-            soup = BeautifulSoup(page_source, "html.parser")
-
-            for script in soup(["script", "style"]):
-                script.extract()
-
-            text = self.get_text(soup)
+            text = self.parser.extract_text(page_source, main_content=self.main_content)
 
         lines = (line.strip() for line in text.splitlines())
         chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
@@ -218,51 +229,28 @@ class BrowserScraper:
         return text
 
     def get_text(self, soup: BeautifulSoup) -> str:
-        """Get the relevant text from the soup with improved filtering"""
-        text_elements = []
-        tags = ["h1", "h2", "h3", "h4", "h5", "p", "li", "div", "span"]
-
-        for element in soup.find_all(tags):
-            # Skip empty elements
-            if not element.text.strip():
-                continue
-
-            # Skip elements with very short text (likely buttons or links)
-            if len(element.text.split()) < 3:
-                continue
-
-            # Check if the element is likely to be navigation or a menu
-            parent_classes = element.parent.get('class', [])
-            if any(cls in ['nav', 'menu', 'sidebar', 'footer'] for cls in parent_classes):
-                continue
-
-            # Remove excess whitespace and join lines
-            cleaned_text = ' '.join(element.text.split())
-
-            # Add the cleaned text to our list of elements
-            text_elements.append(cleaned_text)
-
-        # Join all text elements with newlines
-        return '\n\n'.join(text_elements)
-
-    def _scroll_to_bottom(self):
-        """Scroll to the bottom of the page to load all content"""
-        last_height = self.driver.execute_script("return document.body.scrollHeight")
-        while True:
+        """Get the relevant text from the soup, walking the document once"""
+        return extract_text(soup)
+
+    def _scroll_to_bottom(self, max_scrolls: int = 10, timeout: float = 2):
+        """
+        Scroll to the bottom of the page to load all content. After each scroll, waits until the
+        page grows (lazy-loaded content) or `timeout` seconds pass, rather than sleeping blindly.
+        """
+        get_height = "return document.body.scrollHeight"
+        last_height = self.driver.execute_script(get_height)
+        for _ in range(max_scrolls):
             self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(2)  # Wait for content to load
-            new_height = self.driver.execute_script("return document.body.scrollHeight")
-            if new_height == last_height:
+            try:
+                WebDriverWait(self.driver, timeout, poll_frequency=0.1).until(
+                    lambda driver: driver.execute_script(get_height) != last_height
+                )
+            except TimeoutException:
                 break
-            last_height = new_height
+            last_height = self.driver.execute_script(get_height)
 
     def _scroll_to_percentage(self, ratio: float) -> None:
         """Scroll to a percentage of the page"""
         if ratio < 0 or ratio > 1:
             raise ValueError("Percentage should be between 0 and 1")
         self.driver.execute_script(f"window.scrollTo(0, document.body.scrollHeight * {ratio});")
-
-    def _add_header(self) -> None:
-        """Add a header to the website"""
-        self.driver.execute_script(open(f"{FILE_DIR}/browser/js/overlay.js", "r").read())
-
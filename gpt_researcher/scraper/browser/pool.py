@@ -0,0 +1,123 @@
+"""
+Pool of long-lived browser sessions shared by every BrowserScraper in the process.
+
+Starting a browser costs seconds, so drivers are started lazily, up to BROWSER_POOL_SIZE
+per browser configuration, and reused across pages instead of being quit after each one.
+Cookies collected by any session are kept in an in-memory jar and handed to the other
+sessions, so the warm-up visit that obtains them happens once per pool.
+
+Selenium calls block, so each pool runs them on its own executor with one thread per
+driver. Pages waiting for a browser queue on that executor instead of holding threads of
+the event loop's default executor, which the scrape and search caches rely on.
+"""
+import atexit
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Tuple
+
+
+class BrowserPool:
+    """
+    Hands out browser drivers to one page at a time. A driver that fails while in use is
+    quit and replaced on the next request, so a crashed browser never goes back to the pool.
+    """
+
+    def __init__(self, factory: Callable, size: int = 2):
+        self.factory = factory
+        self.size = size
+        self.executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="browser")
+        self.cookies: Dict[Tuple[str, str, str], dict] = {}
+        self._idle: "queue.LifoQueue" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._all = []
+
+    @contextmanager
+    def driver(self):
+        """Borrows a driver, starting a new one when no idle driver is left"""
+        self._slots.acquire()
+        try:
+            driver = self._acquire()
+        except BaseException:
+            self._slots.release()
+            raise
+        try:
+            yield driver
+        except BaseException:
+            self._discard(driver)
+            raise
+        else:
+            try:
+                # Leave the page so timers and media of the last site stop running
+                driver.get("about:blank")
+            except Exception:
+                self._discard(driver)
+            else:
+                self._idle.put(driver)
+        finally:
+            self._slots.release()
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        driver = self.factory()
+        with self._lock:
+            self._all.append(driver)
+        return driver
+
+    def _discard(self, driver) -> None:
+        with self._lock:
+            if driver in self._all:
+                self._all.remove(driver)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def save_cookies(self, cookies: List[dict]) -> None:
+        with self._lock:
+            for cookie in cookies:
+                self.cookies[(cookie.get("domain", ""), cookie.get("path", "/"), cookie["name"])] = cookie
+
+    def get_cookies(self) -> List[dict]:
+        with self._lock:
+            return list(self.cookies.values())
+
+    def close(self) -> None:
+        with self._lock:
+            drivers, self._all = self._all, []
+        while not self._idle.empty():
+            self._idle.get_nowait()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+
+
+_pools: Dict[tuple, BrowserPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_browser_pool(key: tuple, factory: Callable, size: int = 2) -> BrowserPool:
+    """Returns the pool of `size` browsers for the browser configuration `key`, creating it with `factory`"""
+    key = (*key, size)
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = BrowserPool(factory, size)
+        return _pools[key]
+
+
+@atexit.register
+def close_browser_pools() -> None:
+    """Quits every pooled browser; registered to run at exit so no browser is left behind"""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
@@ -1,6 +1,7 @@
-from langchain_community.document_loaders import PyMuPDFLoader
 from langchain_community.retrievers import ArxivRetriever
 
+from gpt_researcher.scraper.pymupdf.pymupdf import PyMuPDFScraper
+
 
 def scrape_pdf_with_pymupdf(url) -> str:
     """Scrape a pdf with pymupdf
@@ -11,9 +12,7 @@ def scrape_pdf_with_pymupdf(url) -> str:
     Returns:
         str: The text scraped from the pdf
     """
-    loader = PyMuPDFLoader(url)
-    doc = loader.load()
-    return str(doc)
+    return PyMuPDFScraper(url).scrape()
 
 
 def scrape_pdf_with_arxiv(query) -> str:
@@ -0,0 +1,184 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+from gpt_researcher.utils.url import normalize_url
+
+# Seconds past its TTL an entry without validators is kept, to be served while its host fails
+STALE_IF_ERROR = 7 * 24 * 3600
+
+
+@dataclass
+class CachedPage:
+    """A scraped page stored in the ScrapeCache"""
+    url: str
+    raw_content: str
+    fetched_at: float
+    ttl: int
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    @property
+    def is_fresh(self) -> bool:
+        return time.time() - self.fetched_at < self.ttl
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Headers that ask the origin to answer 304 if the page has not changed"""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ScrapeCache:
+    """
+    Persistent cache of extracted page content, keyed by the hash of the normalized url.
+
+    Entries expire after a per-domain TTL; expired entries that carry an ETag or
+    Last-Modified validator are kept so the page can be revalidated with a conditional
+    request instead of being downloaded and parsed again. Other expired entries are kept
+    for STALE_IF_ERROR seconds, so the scraper can serve them while their host fails.
+    When the stored content exceeds `max_size_mb`, the least recently used entries are evicted.
+    """
+
+    def __init__(self, path: str, ttl: int = 21600, domain_ttl: Optional[Dict[str, int]] = None,
+                 max_size_mb: int = 512):
+        self.path = path
+        self.ttl = ttl
+        self.domain_ttl = {domain.lower().lstrip("."): value for domain, value in (domain_ttl or {}).items()}
+        self.max_size = max_size_mb * 1024 * 1024
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS pages (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                raw_content TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                size INTEGER NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS pages_last_access ON pages (last_access)")
+        self._conn.commit()
+        self._size = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+
+    @staticmethod
+    def get_key(url: str) -> str:
+        return hashlib.sha256(normalize_url(url).encode("utf-8")).hexdigest()
+
+    def ttl_for(self, url: str) -> int:
+        """Returns the TTL of the most specific configured domain matching the url's host"""
+        host = (urlsplit(url).hostname or "").lower()
+        best = None
+        for domain, ttl in self.domain_ttl.items():
+            if host == domain or host.endswith("." + domain):
+                if best is None or len(domain) > len(best[0]):
+                    best = (domain, ttl)
+        return best[1] if best else self.ttl
+
+    def get(self, url: str) -> Optional[CachedPage]:
+        """
+        Returns the cached page for the url, or None. The returned page may be stale;
+        check `is_fresh` before using it without revalidation.
+        """
+        key = self.get_key(url)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT raw_content, etag, last_modified, fetched_at FROM pages WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE pages SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+
+        page = CachedPage(url=url, raw_content=row[0], etag=row[1], last_modified=row[2],
+                          fetched_at=row[3], ttl=self.ttl_for(url))
+        expired = time.time() - page.fetched_at > page.ttl + STALE_IF_ERROR
+        if expired and not (page.etag or page.last_modified):
+            self.delete(url)
+            return None
+        return page
+
+    def set(self, url: str, raw_content: str, headers: Optional[Dict[str, str]] = None) -> None:
+        """Stores the extracted content of the url along with its ETag/Last-Modified validators"""
+        headers = headers or {}
+        key = self.get_key(url)
+        size = len(raw_content.encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            previous = self._conn.execute("SELECT size FROM pages WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, url, raw_content, headers.get("etag"), headers.get("last-modified"), now, now, size),
+            )
+            self._size += size - (previous[0] if previous else 0)
+            self._evict()
+            self._conn.commit()
+
+    def touch(self, url: str) -> None:
+        """Marks the cached page as freshly fetched, e.g. after the origin answered 304 Not Modified"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE pages SET fetched_at = ?, last_access = ? WHERE key = ?", (now, now, self.get_key(url))
+            )
+            self._conn.commit()
+
+    def delete(self, url: str) -> None:
+        key = self.get_key(url)
+        with self._lock:
+            row = self._conn.execute("SELECT size FROM pages WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self._conn.execute("DELETE FROM pages WHERE key = ?", (key,))
+                self._size -= row[0]
+                self._conn.commit()
+
+    def _evict(self) -> None:
+        """Drops least recently used pages until the cache fits in max_size. Caller holds the lock."""
+        while self._size > self.max_size:
+            rows = self._conn.execute(
+                "SELECT key, size FROM pages ORDER BY last_access LIMIT 64"
+            ).fetchall()
+            if not rows:
+                break
+            for key, size in rows:
+                self._conn.execute("DELETE FROM pages WHERE key = ?", (key,))
+                self._size -= size
+                if self._size <= self.max_size:
+                    break
+
+
+_caches: Dict[str, ScrapeCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_scrape_cache(cfg) -> Optional[ScrapeCache]:
+    """Returns the process-wide scrape cache configured by cfg, or None if caching is disabled"""
+    if not cfg or not cfg.scraper_cache:
+        return None
+    path = os.path.abspath(os.path.join(cfg.cache_dir, "scrape_cache.sqlite3"))
+    with _caches_lock:
+        if path not in _caches:
+            _caches[path] = ScrapeCache(
+                path,
+                ttl=cfg.scraper_cache_ttl,
+                domain_ttl=cfg.scraper_cache_domain_ttl,
+                max_size_mb=cfg.scraper_cache_max_size_mb,
+            )
+        return _caches[path]
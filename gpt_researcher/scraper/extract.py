@@ -0,0 +1,269 @@
+"""
+Text extraction from parsed HTML.
+
+The document tree is walked once, depth first, and every text node is emitted exactly
+once into the block (paragraph, heading, list item, ...) that contains it, so nested
+containers no longer repeat their descendants' text. Navigation, menus, sidebars and
+footers are pruned as whole subtrees instead of being inspected element by element.
+
+`MainContentCollector` additionally keeps only the main content of the page, in the
+manner of readability and jusText: blocks are classified by their length and link
+density, so cookie banners, menus and related-article lists are dropped before chunking.
+
+Walkers call `is_pruned` on every element and skip its subtree when it returns True.
+Otherwise they call `start_element`, and when that returns True, `end_element` once the
+element's subtree has been visited.
+"""
+import re
+from typing import List, Optional, Tuple
+
+from bs4 import BeautifulSoup, NavigableString, Tag
+
+# Elements that start a new block of text
+BLOCK_TAGS = frozenset({
+    "address", "article", "aside", "blockquote", "body", "br", "dd", "details", "div", "dl", "dt",
+    "fieldset", "figcaption", "figure", "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6",
+    "header", "hr", "html", "li", "main", "nav", "ol", "p", "pre", "section", "summary", "table",
+    "td", "th", "tr", "ul",
+})
+
+# Elements whose whole subtree carries no article text
+PRUNED_TAGS = frozenset({
+    "script", "style", "noscript", "template", "svg", "canvas", "iframe", "head", "nav", "footer",
+    "button", "select", "option",
+})
+
+# Class names of containers that are likely navigation or page chrome
+PRUNED_CLASSES = frozenset({"nav", "menu", "sidebar", "footer"})
+
+# Elements that hold the page itself and are never pruned for their class or id
+STRUCTURAL_TAGS = frozenset({"html", "body", "main", "article"})
+
+# Additional elements pruned when only the main content is kept
+BOILERPLATE_TAGS = PRUNED_TAGS | {"aside", "form", "dialog"}
+
+# Words of class names and ids (split at "-" and "_") that mark page chrome, e.g. "cookie-notice"
+BOILERPLATE_WORDS = frozenset({
+    "cookie", "cookies", "consent", "gdpr", "banner", "popup", "modal", "newsletter", "subscribe", "signup",
+    "related", "recommended", "recommendations", "share", "sharing", "social", "comment", "comments",
+    "breadcrumb", "breadcrumbs", "advert", "advertisement", "ads", "sponsor", "sponsored", "promo", "widget",
+    "widgets", "sidebar", "footer", "menu", "navbar", "nav", "navigation", "skip",
+})
+
+# First and last words of class names that describe a state of the page rather than a part of
+# it, e.g. WordPress' "has-sidebar" and "footer-top-visible" or "share-enabled"
+STATE_PREFIXES = frozenset({"has", "is", "no", "with", "without", "show", "hide"})
+STATE_SUFFIXES = frozenset({"enabled", "disabled", "visible", "hidden", "active", "inactive", "open", "closed", "on", "off"})
+
+_WORD_SEPARATORS = re.compile(r"[-_\s]+")
+
+
+def is_boilerplate_token(token: str) -> bool:
+    """Whether a class name or id names page chrome, matching whole words only"""
+    words = [word for word in _WORD_SEPARATORS.split(token.lower()) if word]
+    if not words or words[0] in STATE_PREFIXES or words[-1] in STATE_SUFFIXES:
+        return False
+    return not BOILERPLATE_WORDS.isdisjoint(words)
+
+
+class TextCollector:
+    """
+    Accumulates text nodes into blocks. Blocks with fewer than `min_words` words, which are
+    mostly buttons and stray links, are dropped.
+    """
+
+    def __init__(self, min_words: int = 3):
+        self.min_words = min_words
+        # (text, number of words, number of words inside links)
+        self.blocks: List[Tuple[str, int, int]] = []
+        self._parts: List[str] = []
+        self._link_depth = 0
+        self._link_words = 0
+
+    def is_pruned(self, name: str, classes, element_id: Optional[str] = None) -> bool:
+        if name in PRUNED_TAGS:
+            return True
+        if name in STRUCTURAL_TAGS:
+            return False
+        if isinstance(classes, str):
+            classes = classes.split()
+        return bool(classes) and not PRUNED_CLASSES.isdisjoint(classes)
+
+    def start_element(self, name: str, classes, element_id: Optional[str] = None) -> bool:
+        """Called on entering an element that is not pruned; True if `end_element` must follow"""
+        return False
+
+    def end_element(self) -> None:
+        pass
+
+    def start_link(self) -> None:
+        self._link_depth += 1
+
+    def end_link(self) -> None:
+        self._link_depth = max(self._link_depth - 1, 0)
+
+    def add(self, text: str) -> None:
+        self._parts.append(text)
+        if self._link_depth:
+            self._link_words += len(text.split())
+
+    def end_block(self) -> None:
+        if not self._parts:
+            return
+        words = "".join(self._parts).split()
+        link_words = min(self._link_words, len(words))
+        self._parts = []
+        self._link_words = 0
+        if len(words) >= self.min_words:
+            self.add_block(" ".join(words), len(words), link_words)
+
+    def add_block(self, text: str, words: int, link_words: int) -> None:
+        self.blocks.append((text, words, link_words))
+
+    def get_text(self) -> str:
+        self.end_block()
+        return "\n\n".join(text for text, _, _ in self.blocks)
+
+
+class MainContentCollector(TextCollector):
+    """
+    TextCollector that keeps only the main content of the page.
+
+    Subtrees of chrome elements (asides, forms, dialogs) are pruned. Elements whose class or
+    id names page chrome (cookie banners, newsletters, related articles, ...), and headers
+    outside of an article or main element, open a boilerplate region instead: its blocks are
+    dropped unless the region encloses the longest content block of the page, as wrappers
+    such as "content-sidebar-wrap" do. The remaining blocks are classified:
+    - blocks whose words are mostly link text are boilerplate (menus, link lists)
+    - blocks of at least `good_words` words with few links are content
+    - other short blocks are kept only next to content, e.g. headings and captions
+    If the page has no content block at all, every block outside boilerplate regions that is
+    not mostly links is kept.
+    """
+
+    def __init__(self, min_words: int = 3, good_words: int = 25, max_link_density: float = 0.5):
+        super().__init__(min_words)
+        self.good_words = good_words
+        self.max_link_density = max_link_density
+        # Innermost boilerplate region of each block, and the enclosing region of each region
+        self.block_regions: List[Optional[int]] = []
+        self.region_parents: List[Optional[int]] = []
+        # What each element that needs `end_element` opened: a region index, or None for article/main
+        self._open: List[Optional[int]] = []
+        self._regions: List[int] = []
+        self._article_depth = 0
+
+    def is_pruned(self, name: str, classes, element_id: Optional[str] = None) -> bool:
+        return name in BOILERPLATE_TAGS
+
+    def start_element(self, name: str, classes, element_id: Optional[str] = None) -> bool:
+        if name in ("article", "main"):
+            self._article_depth += 1
+            self._open.append(None)
+            return True
+        if name in STRUCTURAL_TAGS:
+            return False
+        if isinstance(classes, str):
+            classes = classes.split()
+        tokens = [*(classes or ()), *([element_id] if element_id else ())]
+        if (name == "header" and not self._article_depth) or any(is_boilerplate_token(token) for token in tokens):
+            self.end_block()
+            self.region_parents.append(self._regions[-1] if self._regions else None)
+            self._regions.append(len(self.region_parents) - 1)
+            self._open.append(self._regions[-1])
+            return True
+        return False
+
+    def end_element(self) -> None:
+        region = self._open.pop()
+        if region is None:
+            self._article_depth -= 1
+        else:
+            self.end_block()
+            self._regions.pop()
+
+    def add_block(self, text: str, words: int, link_words: int) -> None:
+        super().add_block(text, words, link_words)
+        self.block_regions.append(self._regions[-1] if self._regions else None)
+
+    def classify(self, words: int, link_words: int) -> str:
+        link_density = link_words / words
+        if link_density > self.max_link_density:
+            return "bad"
+        if words >= self.good_words and link_density <= self.max_link_density / 2:
+            return "good"
+        return "short"
+
+    def get_text(self) -> str:
+        self.end_block()
+        classes = [self.classify(words, link_words) for _, words, link_words in self.blocks]
+
+        # Only the regions around the longest content block are kept
+        kept_regions = set()
+        good = [i for i, cls in enumerate(classes) if cls == "good"]
+        if good:
+            region = self.block_regions[max(good, key=lambda i: self.blocks[i][1])]
+            while region is not None:
+                kept_regions.add(region)
+                region = self.region_parents[region]
+        kept = [
+            (block, cls) for block, cls, region in zip(self.blocks, classes, self.block_regions)
+            if region is None or region in kept_regions
+        ]
+        blocks, classes = [block for block, _ in kept], [cls for _, cls in kept]
+        if "good" not in classes:
+            return "\n\n".join(block[0] for block, cls in zip(blocks, classes) if cls != "bad")
+
+        # Short blocks take the class of the nearest classified block after them, or before
+        # them at the end of the page, so headings stay with the paragraphs they introduce
+        resolved = list(classes)
+        following = None
+        for i in range(len(classes) - 1, -1, -1):
+            if classes[i] == "short":
+                resolved[i] = following
+            else:
+                following = classes[i]
+        preceding = None
+        for i, cls in enumerate(classes):
+            if cls != "short":
+                preceding = cls
+            elif resolved[i] is None:
+                resolved[i] = preceding
+
+        return "\n\n".join(block[0] for block, cls in zip(blocks, resolved) if cls == "good")
+
+
+def extract_text(soup: BeautifulSoup, min_words: int = 3, main_content: bool = False) -> str:
+    """
+    Returns the text of the soup as blocks separated by blank lines, visiting each node once.
+    Comments, doctypes and other non-text strings are skipped.
+    With `main_content`, only the main content of the page is returned (see MainContentCollector).
+    """
+    collector = MainContentCollector(min_words) if main_content else TextCollector(min_words)
+    # (node, leaving, tracked) triples, tracked telling whether the node needs `end_element`;
+    # an explicit stack keeps deeply nested pages off the recursion limit
+    stack = [(soup, False, False)]
+    while stack:
+        node, leaving, tracked = stack.pop()
+        if leaving:
+            if node.name == "a":
+                collector.end_link()
+            elif node.name in BLOCK_TAGS:
+                collector.end_block()
+            if tracked:
+                collector.end_element()
+        elif isinstance(node, Tag):
+            classes, element_id = node.get("class"), node.get("id")
+            if collector.is_pruned(node.name, classes, element_id):
+                continue
+            tracked = collector.start_element(node.name, classes, element_id)
+            if node.name in BLOCK_TAGS:
+                collector.end_block()
+            elif node.name == "a":
+                collector.start_link()
+            if tracked or node.name in BLOCK_TAGS or node.name == "a":
+                stack.append((node, True, tracked))
+            stack.extend((child, False, False) for child in reversed(node.contents))
+        elif type(node) is NavigableString:
+            collector.add(node)
+    return collector.get_text()
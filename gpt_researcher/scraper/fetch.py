@@ -0,0 +1,187 @@
+"""
+Streaming HTTP fetches with a byte budget and content sniffing.
+
+The body of a response is read chunk by chunk instead of in full, so what it is can be decided
+from its first bytes: the magic bytes of the body and its Content-Type header tell HTML and
+plain text apart from PDFs and from anything else (images, archives, videos, ...). Unsupported
+bodies are dropped after the first chunk, and no body is read past its byte budget.
+"""
+import os
+import tempfile
+from dataclasses import dataclass, field
+from typing import Collection, Mapping, Optional, Union
+
+HTML = "html"
+PDF = "pdf"
+
+# Bodies are kept in memory up to this size and spilled to a temporary file beyond it
+MEMORY_BUFFER_SIZE = 8 * 1024 * 1024
+
+# Number of leading bytes inspected to sniff the kind of a body
+SNIFF_SIZE = 1024
+
+PDF_MAGIC = b"%PDF-"
+HTML_MARKERS = (
+    b"<!doctype", b"<html", b"<head", b"<body", b"<title", b"<meta", b"<div", b"<p", b"<!--", b"<?xml",
+)
+HTML_TYPES = frozenset({"text/html", "application/xhtml+xml"})
+PDF_TYPES = frozenset({"application/pdf", "application/x-pdf"})
+
+
+class ResponseTooLarge(Exception):
+    """Raised when a response body exceeds its byte budget"""
+
+
+class ScrapeError(Exception):
+    """Raised by a scraper when a page could not be scraped"""
+
+
+class ResponseBuffer:
+    """
+    Collects a response body in memory, spilling to a temporary file once it outgrows
+    MEMORY_BUFFER_SIZE, and refuses to grow beyond `max_bytes`.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._memory = bytearray()
+        self._file = None
+
+    def write(self, chunk: bytes) -> None:
+        self.size += len(chunk)
+        if self.size > self.max_bytes:
+            raise ResponseTooLarge(f"Response is larger than {self.max_bytes} bytes")
+        if self._file is None and self.size > MEMORY_BUFFER_SIZE:
+            self._file = tempfile.NamedTemporaryFile(delete=False)
+            self._file.write(self._memory)
+            self._memory = bytearray()
+        if self._file is not None:
+            self._file.write(chunk)
+        else:
+            self._memory.extend(chunk)
+
+    def source(self) -> Union[str, bytes]:
+        """The path of the spilled file, or the bytes of an in-memory body"""
+        if self._file is not None:
+            self._file.flush()
+            return self._file.name
+        return bytes(self._memory)
+
+    def read(self) -> bytes:
+        """The whole body as bytes"""
+        if self._file is not None:
+            self._file.flush()
+            with open(self._file.name, "rb") as f:
+                return f.read()
+        return bytes(self._memory)
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            os.unlink(self._file.name)
+            self._file = None
+
+
+def sniff_kind(content_type: Optional[str], head: bytes) -> Optional[str]:
+    """
+    Returns HTML or PDF for bodies the scrapers can extract text from, None for anything else.
+    Magic bytes take precedence over the Content-Type header, which servers often get wrong,
+    e.g. PDFs sent as application/octet-stream or pages sent as text/plain.
+    Args:
+        content_type: Value of the Content-Type header, if any
+        head: The first bytes of the body
+    """
+    if PDF_MAGIC in head[:SNIFF_SIZE]:
+        return PDF
+    start = head.lstrip(b"\xef\xbb\xbf \t\r\n").lower()
+    if start.startswith(HTML_MARKERS):
+        return HTML
+
+    mime = (content_type or "").split(";")[0].strip().lower()
+    if mime in PDF_TYPES:
+        return PDF
+    if mime in HTML_TYPES or mime.startswith("text/") or mime.endswith(("+xml", "/xml", "/json")):
+        return HTML
+    if not mime and b"\x00" not in head[:SNIFF_SIZE]:
+        # No declared type, but the body looks like text
+        return HTML
+    return None
+
+
+@dataclass
+class FetchResult:
+    """
+    A fetched response. `body` holds the body of supported kinds and must be closed;
+    it is None for 304 answers and for bodies that were dropped as unsupported or too large.
+    """
+    status_code: int
+    headers: Mapping[str, str] = field(default_factory=dict)
+    kind: Optional[str] = None
+    body: Optional[ResponseBuffer] = None
+    encoding: Optional[str] = None
+    truncated: bool = False
+
+    def close(self) -> None:
+        if self.body is not None:
+            self.body.close()
+
+
+async def stream_fetch(session, link: str, headers: Optional[dict] = None, timeout: float = 4,
+                       max_bytes: int = 10 * 1024 * 1024, pdf_max_bytes: int = 50 * 1024 * 1024,
+                       accept: Collection[str] = (HTML, PDF)) -> FetchResult:
+    """
+    Fetches the link with an async HTTP client (e.g. `httpx.AsyncClient`), reading the body
+    as a stream. The kind of the body is sniffed from its first bytes, and kinds not in
+    `accept` are dropped without reading further. HTML bodies are cut at `max_bytes`, since
+    their beginning is still useful; PDFs, which cannot be parsed when truncated, are dropped
+    when larger than `pdf_max_bytes`.
+    """
+    async with session.stream("GET", link, headers=headers, timeout=timeout) as response:
+        result = FetchResult(response.status_code, response.headers, encoding=response.charset_encoding)
+        if response.status_code == 304:
+            return result
+
+        chunks = response.aiter_bytes()
+        head = b""
+        async for chunk in chunks:
+            head += chunk
+            if len(head) >= SNIFF_SIZE:
+                break
+
+        result.kind = sniff_kind(response.headers.get("content-type"), head)
+        if result.kind not in accept:
+            print(f"Skipping {link}: unsupported content type {response.headers.get('content-type')}")
+            return result
+
+        budget = pdf_max_bytes if result.kind == PDF else max_bytes
+        declared = response.headers.get("content-length")
+        if result.kind == PDF and declared and declared.isdigit() and int(declared) > budget:
+            print(f"Skipping {link}: {declared} bytes is over the budget of {budget} bytes")
+            return result
+
+        body = ResponseBuffer(budget)
+
+        def append(chunk: bytes) -> bool:
+            """Adds the chunk to the body; returns False once an HTML body reached its budget"""
+            if result.kind == HTML and body.size + len(chunk) > budget:
+                body.write(chunk[:budget - body.size])
+                result.truncated = True
+                return False
+            body.write(chunk)
+            return True
+
+        try:
+            if append(head):
+                async for chunk in chunks:
+                    if not append(chunk):
+                        break
+        except ResponseTooLarge:
+            body.close()
+            print(f"Skipping {link}: response is over the budget of {budget} bytes")
+            return result
+        except BaseException:
+            body.close()
+            raise
+        result.body = body
+        return result
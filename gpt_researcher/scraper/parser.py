@@ -0,0 +1,162 @@
+"""
+HTML parser backends used by the scrapers.
+
+Every backend exposes the same `extract_text(html, encoding=None, main_content=False)` API
+and walks its own document tree with the collectors of `gpt_researcher.scraper.extract`, so
+all of them return the same text. They differ only in parse cost:
+
+- "lxml": libxml2 via lxml.html, the default
+- "selectolax": the lexbor engine via the optional `selectolax` package
+- "bs": BeautifulSoup, kept as a fallback for pages the C parsers mishandle
+"""
+import importlib.util
+from typing import Dict, Optional, Union
+
+import lxml.etree
+import lxml.html
+from bs4 import BeautifulSoup
+
+from .extract import BLOCK_TAGS, MainContentCollector, TextCollector, extract_text
+
+DEFAULT_PARSER = "lxml"
+
+
+def decode(html: bytes, encoding: Optional[str] = None) -> str:
+    """Decodes the body with its declared encoding, or as UTF-8 when it is missing or unknown"""
+    try:
+        return html.decode(encoding or "utf-8", errors="replace")
+    except LookupError:
+        return html.decode("utf-8", errors="replace")
+
+
+class BeautifulSoupParser:
+    name = "bs"
+
+    def extract_text(self, html: Union[str, bytes], encoding: Optional[str] = None,
+                     main_content: bool = False) -> str:
+        if isinstance(html, bytes) and encoding:
+            # Decoded here, as lxml would reject some codec names bs4 hands on to it
+            html = decode(html, encoding)
+        return extract_text(BeautifulSoup(html, "lxml"), main_content=main_content)
+
+
+class LxmlParser:
+    name = "lxml"
+
+    def extract_text(self, html: Union[str, bytes], encoding: Optional[str] = None,
+                     main_content: bool = False) -> str:
+        if not html:
+            return ""
+        if isinstance(html, str):
+            # lxml rejects str input that carries an XML encoding declaration
+            html, encoding = html.encode("utf-8"), "utf-8"
+        try:
+            parser = lxml.html.HTMLParser(encoding=encoding) if encoding else None
+        except LookupError:
+            # libxml2 does not know every name of a codec, e.g. "latin-1"
+            html, parser = decode(html, encoding).encode("utf-8"), lxml.html.HTMLParser(encoding="utf-8")
+        try:
+            root = lxml.html.document_fromstring(html, parser=parser)
+        except (lxml.etree.ParserError, ValueError):
+            return ""
+
+        collector = MainContentCollector() if main_content else TextCollector()
+        # (element, leaving, tracked) triples; the tail of an element is text of its parent that follows it
+        stack = [(root, False, False)]
+        while stack:
+            element, leaving, tracked = stack.pop()
+            tag = element.tag if isinstance(element.tag, str) else None
+            if leaving:
+                if tag in BLOCK_TAGS:
+                    collector.end_block()
+                elif tag == "a":
+                    collector.end_link()
+                if tracked:
+                    collector.end_element()
+            elif tag is not None and not collector.is_pruned(tag, element.get("class"), element.get("id")):
+                tracked = collector.start_element(tag, element.get("class"), element.get("id"))
+                if tag in BLOCK_TAGS:
+                    collector.end_block()
+                elif tag == "a":
+                    collector.start_link()
+                if element.text:
+                    collector.add(element.text)
+                stack.append((element, True, tracked))
+                stack.extend((child, False, False) for child in reversed(element))
+                continue
+            # Comments and pruned elements contribute only their tail
+            if element.tail and element is not root:
+                collector.add(element.tail)
+        return collector.get_text()
+
+
+class SelectolaxParser:
+    name = "selectolax"
+
+    def extract_text(self, html: Union[str, bytes], encoding: Optional[str] = None,
+                     main_content: bool = False) -> str:
+        from selectolax.lexbor import LexborHTMLParser
+
+        if isinstance(html, bytes):
+            html = decode(html, encoding)
+        root = LexborHTMLParser(html).root
+        if root is None:
+            return ""
+
+        collector = MainContentCollector() if main_content else TextCollector()
+        stack = [(root, False, False)]
+        while stack:
+            node, leaving, tracked = stack.pop()
+            tag = node.tag
+            if leaving:
+                if tag == "a":
+                    collector.end_link()
+                elif tag in BLOCK_TAGS:
+                    collector.end_block()
+                if tracked:
+                    collector.end_element()
+            elif tag == "-text":
+                collector.add(node.text(deep=False))
+            elif tag.startswith("-"):
+                continue
+            elif not collector.is_pruned(tag, node.attributes.get("class"), node.attributes.get("id")):
+                tracked = collector.start_element(tag, node.attributes.get("class"), node.attributes.get("id"))
+                if tag in BLOCK_TAGS:
+                    collector.end_block()
+                elif tag == "a":
+                    collector.start_link()
+                if tracked or tag in BLOCK_TAGS or tag == "a":
+                    stack.append((node, True, tracked))
+                children = []
+                child = node.child
+                while child is not None:
+                    children.append(child)
+                    child = child.next
+                stack.extend((child, False, False) for child in reversed(children))
+        return collector.get_text()
+
+
+PARSERS = {
+    "bs": BeautifulSoupParser,
+    "lxml": LxmlParser,
+    "selectolax": SelectolaxParser,
+}
+
+_parsers: Dict[str, object] = {}
+
+
+def get_parser(name: Optional[str] = None):
+    """
+    Returns the parser backend registered under `name` (the default when None).
+    Falls back to BeautifulSoup when the backend's package is not installed.
+    """
+    name = name or DEFAULT_PARSER
+    if name not in _parsers:
+        parser_class = PARSERS.get(name)
+        if parser_class is None:
+            raise Exception(f"Parser {name} not found. Supported parsers: {', '.join(PARSERS)}")
+        if name == "selectolax" and importlib.util.find_spec("selectolax") is None:
+            print("selectolax is not installed, falling back to BeautifulSoup. Install it with `pip install selectolax`")
+            parser_class = BeautifulSoupParser
+        _parsers[name] = parser_class()
+    return _parsers[name]
@@ -0,0 +1,231 @@
+import asyncio
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass
+from email.utils import parsedate_to_datetime
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+
+class FetchPool:
+    """
+    Bounds the number of in-flight fetches, both globally and per host.
+
+    A single pool is shared by every scrape running on the same event loop with the
+    same limits, so concurrent research jobs draw from one budget instead of each
+    multiplying their own workers.
+    """
+
+    def __init__(self, max_concurrency: int = 20, max_per_host: int = 4):
+        self.max_concurrency = max_concurrency
+        self.max_per_host = max_per_host
+        self._global = asyncio.Semaphore(max_concurrency)
+        # host -> [semaphore, number of tasks holding or waiting on it]
+        self._hosts: Dict[str, List] = {}
+
+    @staticmethod
+    def get_host(url: str) -> str:
+        return urlparse(url).netloc.lower()
+
+    @asynccontextmanager
+    async def slot(self, url: str):
+        """
+        Waits for a free per-host slot and then a free global slot for the given url.
+        The host slot is taken first so that a busy host does not hold global slots hostage.
+        """
+        host = self.get_host(url)
+        entry = self._hosts.get(host)
+        if entry is None:
+            entry = self._hosts[host] = [asyncio.Semaphore(self.max_per_host), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                async with self._global:
+                    yield
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                self._hosts.pop(host, None)
+
+
+_pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple[int, int], FetchPool]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_fetch_pool(max_concurrency: int = 20, max_per_host: int = 4) -> FetchPool:
+    """
+    Returns the fetch pool shared by all scrapes on the running event loop with these limits.
+    Must be called from within a coroutine.
+    """
+    loop = asyncio.get_running_loop()
+    pools = _pools.setdefault(loop, {})
+    key = (max_concurrency, max_per_host)
+    if key not in pools:
+        pools[key] = FetchPool(max_concurrency, max_per_host)
+    return pools[key]
+
+
+class HostUnavailable(Exception):
+    """Raised when a host is skipped because its circuit breaker is open"""
+
+
+@dataclass
+class HostState:
+    """Rate limit and circuit breaker state of a single host"""
+    tokens: float
+    updated_at: float
+    failures: int = 0
+    state: str = "closed"  # closed, open or half_open
+    open_until: float = 0.0
+    probing: bool = False
+
+
+class HostGuard:
+    """
+    Per-host protection for the scraper, shared by every scrape in the process:
+
+    - a token bucket allows `rate` requests per second to a host, with bursts of `burst`
+    - after `threshold` consecutive failures the host's circuit opens and requests to it
+      fail instantly with HostUnavailable for `cooldown` seconds; then a single probe
+      request is let through, which closes the circuit on success or reopens it on failure
+    - a 429/503 answer with Retry-After opens the circuit for the requested time
+
+    Only the most recently used `max_hosts` hosts are tracked.
+    """
+
+    def __init__(self, rate: float = 2.0, burst: int = 4, threshold: int = 3, cooldown: float = 300,
+                 max_hosts: int = 10000):
+        self.rate = rate
+        self.burst = burst
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.max_hosts = max_hosts
+        self._hosts: "OrderedDict[str, HostState]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get_state(self, host: str) -> HostState:
+        """Returns the state of the host, creating it if needed. Caller holds the lock."""
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = HostState(tokens=self.burst, updated_at=time.monotonic())
+            while len(self._hosts) > self.max_hosts:
+                self._hosts.popitem(last=False)
+        self._hosts.move_to_end(host)
+        return state
+
+    def check(self, url: str) -> bool:
+        """
+        Raises HostUnavailable if requests to the url's host are currently short-circuited.
+        Returns True if the caller's request is the probe of a half-open circuit; the caller
+        must then report its outcome or `release` the probe.
+        """
+        host = FetchPool.get_host(url)
+        now = time.monotonic()
+        with self._lock:
+            state = self._get_state(host)
+            if state.state == "open":
+                if now < state.open_until:
+                    raise HostUnavailable(f"{host} is unavailable for another {state.open_until - now:.0f}s")
+                state.state = "half_open"
+            if state.state == "half_open":
+                if state.probing:
+                    raise HostUnavailable(f"{host} is being probed after repeated failures")
+                state.probing = True
+                return True
+        return False
+
+    async def throttle(self, url: str) -> None:
+        """Waits for a token of the url's host bucket"""
+        if not self.rate:
+            return
+        host = FetchPool.get_host(url)
+        with self._lock:
+            state = self._get_state(host)
+            now = time.monotonic()
+            state.tokens = min(self.burst, state.tokens + (now - state.updated_at) * self.rate)
+            state.updated_at = now
+            # Take the token now, even if it is only available later, so waiters queue up fairly
+            state.tokens -= 1
+            delay = -state.tokens / self.rate if state.tokens < 0 else 0
+        if delay:
+            await asyncio.sleep(delay)
+
+    def record_success(self, url: str) -> None:
+        with self._lock:
+            state = self._get_state(FetchPool.get_host(url))
+            state.failures = 0
+            state.state = "closed"
+            state.probing = False
+
+    def record_failure(self, url: str, retry_after: Optional[float] = None) -> None:
+        """Counts a failed request; opens the circuit on a half-open probe, the threshold or Retry-After"""
+        with self._lock:
+            state = self._get_state(FetchPool.get_host(url))
+            state.failures += 1
+            cooldown = None
+            if retry_after is not None:
+                cooldown = retry_after
+            elif state.state == "half_open" or state.failures >= self.threshold:
+                cooldown = self.cooldown
+            if cooldown is not None:
+                state.state = "open"
+                state.open_until = time.monotonic() + cooldown
+            state.probing = False
+
+    def release(self, url: str) -> None:
+        """Ends a half-open probe whose request was abandoned without an outcome, e.g. cancelled"""
+        with self._lock:
+            state = self._hosts.get(FetchPool.get_host(url))
+            if state is not None:
+                state.probing = False
+
+    def stats(self) -> Dict[str, dict]:
+        """Returns the state of every tracked host whose circuit is not closed, for monitoring"""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                host: {**asdict(state), "open_for": max(state.open_until - now, 0)}
+                for host, state in self._hosts.items()
+                if state.state != "closed" or state.failures
+            }
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parses a Retry-After header given either in seconds or as an HTTP date"""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0)
+    except (TypeError, ValueError):
+        return None
+
+
+_guards: Dict[tuple, HostGuard] = {}
+_guards_lock = threading.Lock()
+
+
+def get_host_guard(rate: float = 2.0, burst: int = 4, threshold: int = 3, cooldown: float = 300) -> HostGuard:
+    """Returns the process-wide host guard with these settings"""
+    key = (rate, burst, threshold, cooldown)
+    with _guards_lock:
+        if key not in _guards:
+            _guards[key] = HostGuard(rate, burst, threshold, cooldown)
+        return _guards[key]
+
+
+def get_host_stats() -> Dict[str, dict]:
+    """Returns the circuit breaker state of the hosts tracked by every host guard"""
+    with _guards_lock:
+        guards = list(_guards.values())
+    stats = {}
+    for guard in guards:
+        stats.update(guard.stats())
+    return stats
@@ -1,21 +1,101 @@
-from langchain_community.document_loaders import PyMuPDFLoader
+import asyncio
+from typing import Optional, Union
+
+try:
+    import pymupdf
+except ImportError:  # PyMuPDF < 1.24.3 only provides the legacy module name
+    import fitz as pymupdf
+
+from gpt_researcher.utils.http import get_session
+
+from ..fetch import PDF, ResponseBuffer, ScrapeError, stream_fetch
+from ..settings import ScraperSettings
+
+
+def extract_pdf_text(source: Union[str, bytes], max_pages: Optional[int] = None,
+                     max_chars: Optional[int] = None) -> str:
+    """
+    Extracts the text of a PDF page by page, stopping at `max_pages` pages or `max_chars`
+    characters, so long reports are never fully rendered or held in memory as text.
+    Args:
+        source: Path of the PDF file, or its bytes
+    """
+    doc = pymupdf.open(source) if isinstance(source, str) else pymupdf.open(stream=source, filetype="pdf")
+    pages = []
+    length = 0
+    try:
+        for number, page in enumerate(doc):
+            if max_pages is not None and number >= max_pages:
+                break
+            text = page.get_text().strip()
+            if max_chars is not None and length + len(text) > max_chars:
+                pages.append(text[:max_chars - length])
+                break
+            pages.append(text)
+            length += len(text)
+    finally:
+        doc.close()
+    return "\n\n".join(page for page in pages if page)
 
 
 class PyMuPDFScraper:
 
-    def __init__(self, link, session=None):
+    def __init__(self, link, session=None, settings=None):
         self.link = link
         self.session = session
+        self.settings = settings or ScraperSettings.from_config()
+        self.pdf_max_bytes = self.settings.pdf_max_bytes
+        self.max_pages = self.settings.pdf_max_pages
+        self.max_chars = self.settings.pdf_max_chars
 
     def scrape(self) -> str:
         """
-        The `scrape` function uses PyMuPDFLoader to load a document from a given link and returns it as
-        a string.
-        
+        The `scrape` function downloads the PDF at the link, or opens it if the link is a local
+        path, and returns the text of its pages up to the page and character budget.
+
         Returns:
-          The `scrape` method is returning a string representation of the `doc` object, which is loaded
-        using PyMuPDFLoader from the provided link.
+          The text of the PDF pages, separated by blank lines, or an empty string on error.
         """
-        loader = PyMuPDFLoader(self.link)
-        doc = loader.load()
-        return str(doc)
+        try:
+            return self._scrape()
+        except Exception as e:
+            print("Error! : " + str(e))
+            return ""
+
+    def _scrape(self) -> str:
+        """`scrape`, raising on failure"""
+        if not self.link.startswith(("http://", "https://")):
+            return extract_pdf_text(self.link, self.max_pages, self.max_chars)
+        buffer = ResponseBuffer(self.pdf_max_bytes)
+        try:
+            with get_session(self.settings.user_agent, self.settings.http).get(self.link, stream=True, timeout=10) as response:
+                response.raise_for_status()
+                for chunk in response.iter_content(chunk_size=64 * 1024):
+                    buffer.write(chunk)
+            return extract_pdf_text(buffer.source(), self.max_pages, self.max_chars)
+        finally:
+            buffer.close()
+
+    async def ascrape(self) -> str:
+        """
+        Async counterpart of `scrape`. With an async HTTP client as `session`, the download is
+        streamed on the event loop and only the text extraction runs in a worker thread.
+        Responses that turn out not to be PDFs are dropped after their first bytes.
+        Unlike `scrape`, failures raise instead of returning an empty string.
+        """
+        if self.session is None or not self.link.startswith(("http://", "https://")):
+            return await asyncio.to_thread(self._scrape)
+
+        result = None
+        try:
+            result = await stream_fetch(
+                self.session, self.link, timeout=10, pdf_max_bytes=self.pdf_max_bytes, accept=(PDF,)
+            )
+            if result.status_code >= 400:
+                raise ScrapeError(f"{self.link} answered with status {result.status_code}")
+            if result.body is None:
+                return ""
+            return await asyncio.to_thread(extract_pdf_text, result.body.source(), self.max_pages, self.max_chars)
+        finally:
+            if result is not None:
+                result.close()
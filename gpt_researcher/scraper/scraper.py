@@ -1,6 +1,8 @@
-from concurrent.futures.thread import ThreadPoolExecutor
-from functools import partial
+import asyncio
+import logging
+from urllib.parse import urlparse
 
+import httpx
 import requests
 
 from gpt_researcher.scraper import (
@@ -10,6 +12,16 @@ from gpt_researcher.scraper import (
     WebBaseLoaderScraper,
     BrowserScraper
 )
+from gpt_researcher.scraper.fetch import ScrapeError
+from gpt_researcher.scraper.pool import HostUnavailable, get_fetch_pool, parse_retry_after
+from gpt_researcher.scraper.settings import ScraperSettings
+from gpt_researcher.utils.http import get_async_client
+
+logger = logging.getLogger(__name__)
+
+# Failures of the request itself, which count against the host's circuit breaker;
+# cache and parse errors say nothing about the host
+NETWORK_ERRORS = (httpx.HTTPError, requests.RequestException, ScrapeError, ConnectionError, TimeoutError)
 
 
 class Scraper:
@@ -17,42 +29,148 @@ class Scraper:
     Scraper class to extract the content from the links
     """
 
-    def __init__(self, urls, user_agent, scraper):
+    def __init__(self, urls, settings=None, cache=None, guard=None):
         """
         Initialize the Scraper class.
         Args:
-            urls:
+            urls: List of urls to scrape
+            settings: ScraperSettings of the scrape, handed on to every page scraper; from the default config when None
+            cache: Optional ScrapeCache used to skip fetching and parsing of known pages
+            guard: Optional HostGuard applying per-host rate limits and circuit breakers
         """
         self.urls = urls
-        self.session = requests.Session()
-        self.session.headers.update({"User-Agent": user_agent})
-        self.scraper = scraper
+        self.settings = settings or ScraperSettings.from_config()
+        self.cache = cache
+        self.guard = guard
 
-    def run(self):
+    async def run(self):
         """
-        Extracts the content from the links
+        Extracts the content from the links concurrently. Fetches go through the process-wide
+        keep-alive client and are bounded by the fetch pool shared with every other scrape on
+        the same event loop.
         """
-        partial_extract = partial(self.extract_data_from_link, session=self.session)
-        with ThreadPoolExecutor(max_workers=20) as executor:
-            contents = executor.map(partial_extract, self.urls)
+        pool = get_fetch_pool(self.settings.max_concurrency, self.settings.max_per_host)
+        session = get_async_client(self.settings.user_agent, self.settings.http)
+        contents = await asyncio.gather(
+            *[self.extract_data_from_link(link, session, pool) for link in self.urls]
+        )
         res = [content for content in contents if content["raw_content"] is not None]
         return res
 
-    def extract_data_from_link(self, link, session):
+    async def stream(self, deadline=None):
+        """
+        Yields the content of each link as soon as its scrape finishes, so downstream
+        processing can start before the slowest page is done.
+        Args:
+            deadline: Optional number of seconds after which the remaining scrapes are
+                cancelled and their pages dropped
         """
-        Extracts the data from the link
+        pool = get_fetch_pool(self.settings.max_concurrency, self.settings.max_per_host)
+        session = get_async_client(self.settings.user_agent, self.settings.http)
+        tasks = [
+            asyncio.create_task(self.extract_data_from_link(link, session, pool))
+            for link in self.urls
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks, timeout=deadline):
+                try:
+                    content = await next_done
+                except asyncio.TimeoutError:
+                    break
+                if content["raw_content"] is not None:
+                    yield content
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def extract_data_from_link(self, link, session, pool):
+        """
+        Extracts the data from the link. Fresh pages are served from the cache without any
+        network request; stale pages with validators are revalidated with a conditional request.
+        Hosts whose circuit breaker is open are skipped without a request; when their page
+        is cached, the stale copy is served instead, as it is when the scrape fails.
         """
         content = ""
+        probe = False
+        cached = None
         try:
-            Scraper = self.get_scraper(link)
-            scraper = Scraper(link, session)
-            content = scraper.scrape()
+            cached = await asyncio.to_thread(self.cache.get, link) if self.cache else None
+            if cached is not None and cached.is_fresh:
+                return {"url": link, "raw_content": cached.raw_content}
+
+            if self.guard:
+                probe = self.guard.check(link)
 
+            Scraper = self.get_scraper(link)
+            scraper = Scraper(link, session, self.settings)
+            revalidate = cached is not None and hasattr(scraper, "response_headers")
+            content = await self.fetch(
+                scraper, link, pool, cached.conditional_headers() if revalidate else None
+            )
+
+            if revalidate and scraper.status_code == 304:
+                await asyncio.to_thread(self.cache.touch, link)
+                return {"url": link, "raw_content": cached.raw_content}
+
+            # Only successful extractions are cached: failed scrapes raise, error pages are dropped
+            status = getattr(scraper, "status_code", None)
+            failed = (status is not None and (status == 429 or status >= 500)) or (status is None and not content)
+            if failed and cached is not None:
+                return {"url": link, "raw_content": cached.raw_content}
+            if status is not None and status >= 400:
+                return {"url": link, "raw_content": None}
             if len(content) < 100:
                 return {"url": link, "raw_content": None}
+            if self.cache:
+                await asyncio.to_thread(
+                    self.cache.set, link, content, getattr(scraper, "response_headers", None)
+                )
             return {"url": link, "raw_content": content}
+        except HostUnavailable:
+            return {"url": link, "raw_content": cached.raw_content if cached else None}
+        except NETWORK_ERRORS as e:
+            logger.warning(f"Error scraping {link}: {e}")
+            if self.guard:
+                self.guard.record_failure(link)
+            return {"url": link, "raw_content": cached.raw_content if cached else None}
         except Exception as e:
-            return {"url": link, "raw_content": None}
+            logger.warning(f"Error scraping {link}: {e}")
+            return {"url": link, "raw_content": cached.raw_content if cached else None}
+        finally:
+            if probe:
+                self.guard.release(link)
+
+    async def fetch(self, scraper, link, pool, headers=None):
+        """
+        Scrapes the link within the host's rate limit and the fetch pool, and reports the outcome
+        to the host guard. A 429/503 answer whose Retry-After is at most `max_retry_after`
+        seconds is waited out and retried once; longer ones pause the host instead.
+        """
+        for attempt in range(2):
+            if self.guard:
+                await self.guard.throttle(link)
+            async with pool.slot(link):
+                content = await (scraper.ascrape(headers=headers) if headers else scraper.ascrape())
+
+            status = getattr(scraper, "status_code", None)
+            retry_after = None
+            if status in (429, 503):
+                retry_after = parse_retry_after(scraper.response_headers.get("retry-after"))
+                if attempt == 0 and retry_after is not None and retry_after <= self.settings.max_retry_after:
+                    await asyncio.sleep(retry_after)
+                    continue
+            break
+
+        if self.guard:
+            if status is not None and (status == 429 or status >= 500):
+                self.guard.record_failure(link, retry_after)
+            elif status is None and (hasattr(scraper, "status_code") or not content):
+                # The request itself failed, e.g. a connection error or timeout, or a scraper
+                # that reports no status code (browser, loaders, PDF) came back empty
+                self.guard.record_failure(link)
+            else:
+                self.guard.record_success(link)
+        return content
 
     def get_scraper(self, link):
         """
@@ -67,8 +185,10 @@ class Scraper:
         Returns:
           The `get_scraper` method returns the scraper class based on the provided link. The method
         checks the link to determine the appropriate scraper class to use based on predefined mappings
-        in the `SCRAPER_CLASSES` dictionary. If the link ends with ".pdf", it selects the
-        `PyMuPDFScraper` class. If the link contains "arxiv.org", it selects the `ArxivScraper
+        in the `SCRAPER_CLASSES` dictionary. If the link contains "arxiv.org", it selects the
+        `ArxivScraper`. The default "bs" scraper sniffs the kind of every response itself and
+        extracts PDFs as well as HTML, so links are only routed to the `PyMuPDFScraper` by their
+        path when another default scraper, which renders pages in a browser or loader, is configured.
         """
 
         SCRAPER_CLASSES = {
@@ -81,12 +201,12 @@ class Scraper:
 
         scraper_key = None
 
-        if link.endswith(".pdf"):
-            scraper_key = "pdf"
-        elif "arxiv.org" in link:
+        if "arxiv.org" in link:
             scraper_key = "arxiv"
+        elif self.settings.scraper != "bs" and urlparse(link).path.lower().endswith(".pdf"):
+            scraper_key = "pdf"
         else:
-            scraper_key = self.scraper
+            scraper_key = self.settings.scraper
 
         scraper_class = SCRAPER_CLASSES.get(scraper_key)
         if scraper_class is None:
@@ -0,0 +1,48 @@
+from dataclasses import dataclass, field
+from typing import Optional
+
+from gpt_researcher.utils.http import HttpSettings
+
+
+@dataclass(frozen=True)
+class ScraperSettings:
+    """
+    Settings shared by the Scraper and the page scrapers it creates, read from the USER_AGENT,
+    SCRAPER_* and BROWSER_* config keys. Scrapers created without settings use the default config.
+    """
+    user_agent: Optional[str] = None
+    scraper: str = "bs"
+    parser: Optional[str] = None
+    main_content: bool = True
+    max_concurrency: int = 20
+    max_per_host: int = 4
+    max_retry_after: float = 5
+    max_bytes: int = 10 * 1024 * 1024
+    pdf_max_bytes: int = 50 * 1024 * 1024
+    pdf_max_pages: int = 100
+    pdf_max_chars: int = 100000
+    browser_pool_size: int = 2
+    browser_page_timeout: float = 20
+    http: HttpSettings = field(default_factory=HttpSettings)
+
+    @classmethod
+    def from_config(cls, cfg=None) -> "ScraperSettings":
+        if cfg is None:
+            from gpt_researcher.config import Config
+            cfg = Config.get_default()
+        return cls(
+            user_agent=cfg.user_agent,
+            scraper=cfg.scraper,
+            parser=cfg.scraper_parser,
+            main_content=cfg.scraper_main_content,
+            max_concurrency=cfg.scraper_max_concurrency,
+            max_per_host=cfg.scraper_max_per_host,
+            max_retry_after=cfg.scraper_max_retry_after,
+            max_bytes=int(cfg.scraper_max_size_mb * 1024 * 1024),
+            pdf_max_bytes=int(cfg.scraper_pdf_max_size_mb * 1024 * 1024),
+            pdf_max_pages=cfg.scraper_pdf_max_pages,
+            pdf_max_chars=cfg.scraper_pdf_max_chars,
+            browser_pool_size=cfg.browser_pool_size,
+            browser_page_timeout=cfg.browser_page_timeout,
+            http=HttpSettings.from_config(cfg),
+        )
@@ -1,9 +1,12 @@
+import asyncio
+
 
 class WebBaseLoaderScraper:
 
-    def __init__(self, link, session=None):
+    def __init__(self, link, session=None, settings=None):
         self.link = link
         self.session = session
+        self.settings = settings
 
     def scrape(self) -> str:
         """
@@ -16,17 +19,24 @@ class WebBaseLoaderScraper:
         occurs during the process, an error message is printed and an empty string is returned.
         """
         try:
-            from langchain_community.document_loaders import WebBaseLoader
-            loader = WebBaseLoader(self.link)
-            loader.requests_kwargs = {"verify": False}
-            docs = loader.load()
-            content = ""
-
-            for doc in docs:
-                content += doc.page_content
-
-            return content
-
+            return self._scrape()
         except Exception as e:
             print("Error! : " + str(e))
             return ""
+
+    def _scrape(self) -> str:
+        """`scrape`, raising on failure"""
+        from langchain_community.document_loaders import WebBaseLoader
+        loader = WebBaseLoader(self.link)
+        loader.requests_kwargs = {"verify": False}
+        docs = loader.load()
+        content = ""
+
+        for doc in docs:
+            content += doc.page_content
+
+        return content
+
+    async def ascrape(self) -> str:
+        """Runs the blocking scrape in a worker thread; failures raise instead of returning an empty string"""
+        return await asyncio.to_thread(self._scrape)
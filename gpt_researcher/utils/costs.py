@@ -1,7 +1,8 @@
-import tiktoken
+from typing import Dict, Optional
+
+from .tokens import ENCODING_MODEL, count_message_tokens, count_tokens, count_tokens_batch, get_encoding_name_for_model, get_message_text
 
 # Per OpenAI Pricing Page: https://openai.com/api/pricing/
-ENCODING_MODEL = "o200k_base"
 INPUT_COST_PER_TOKEN = 0.000005
 OUTPUT_COST_PER_TOKEN = 0.000015
 IMAGE_INFERENCE_COST = 0.003825
@@ -10,16 +11,25 @@ EMBEDDING_COST = 0.02 / 1000000 # Assumes new ada-3-small
 
 # Cost estimation is via OpenAI libraries and models. May vary for other models
 def estimate_llm_cost(input_content: str, output_content: str) -> float:
-    encoding = tiktoken.get_encoding(ENCODING_MODEL)
-    input_tokens = encoding.encode(input_content)
-    output_tokens = encoding.encode(output_content)
-    input_costs = len(input_tokens) * INPUT_COST_PER_TOKEN
-    output_costs = len(output_tokens) * OUTPUT_COST_PER_TOKEN
+    input_tokens, output_tokens = count_tokens_batch([input_content, output_content])
+    input_costs = input_tokens * INPUT_COST_PER_TOKEN
+    output_costs = output_tokens * OUTPUT_COST_PER_TOKEN
     return input_costs + output_costs
 
 
+def get_llm_cost(messages: list, response: str, usage: Optional[Dict[str, int]] = None) -> float:
+    """
+    Cost of a chat completion, from the token usage reported by the provider when available,
+    otherwise from the tokens counted in the message contents and the response.
+    """
+    if usage and usage.get("input_tokens") is not None:
+        input_tokens, output_tokens = usage["input_tokens"], usage.get("output_tokens", 0)
+    else:
+        input_tokens, output_tokens = count_message_tokens(messages), count_tokens(response)
+    return input_tokens * INPUT_COST_PER_TOKEN + output_tokens * OUTPUT_COST_PER_TOKEN
+
+
 def estimate_embedding_cost(model, docs):
-    encoding = tiktoken.encoding_for_model(model)
-    total_tokens = sum(len(encoding.encode(str(doc))) for doc in docs)
+    encoding_name = get_encoding_name_for_model(model)
+    total_tokens = sum(count_tokens_batch([get_message_text(doc) for doc in docs], encoding_name))
     return total_tokens * EMBEDDING_COST
-
@@ -0,0 +1,187 @@
+"""
+Process-wide HTTP connection pools shared by the scrapers and retrievers.
+
+Connections are kept alive between calls, so repeated requests to the same search
+APIs and news sites reuse open TCP/TLS connections instead of paying the handshake
+on every call. The pools are configured by the HTTP_MAX_CONNECTIONS,
+HTTP_MAX_CONNECTIONS_PER_HOST, HTTP_KEEPALIVE_EXPIRY and HTTP2 config keys; callers
+without a config, such as the retrievers, get pools configured by the default config.
+"""
+import asyncio
+import importlib.util
+import threading
+import weakref
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+
+@dataclass(frozen=True)
+class HttpSettings:
+    max_connections: int = 100
+    max_connections_per_host: int = 10
+    keepalive_expiry: float = 30
+    http2: bool = True
+
+    @classmethod
+    def from_config(cls, cfg=None) -> "HttpSettings":
+        if cfg is None:
+            from gpt_researcher.config import Config
+            cfg = Config.get_default()
+        return cls(
+            max_connections=cfg.http_max_connections,
+            max_connections_per_host=cfg.http_max_connections_per_host,
+            keepalive_expiry=cfg.http_keepalive_expiry,
+            http2=cfg.http2,
+        )
+
+
+_sessions: Dict[tuple, requests.Session] = {}
+_sessions_lock = threading.Lock()
+
+# httpx clients hold sockets bound to the loop that opened them, so there is one per loop
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[tuple, httpx.AsyncClient]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    """Response body that frees its host slot once the response is closed"""
+
+    def __init__(self, stream: httpx.AsyncByteStream, release):
+        self._stream = stream
+        self._release = release
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            release, self._release = self._release, None
+            if release is not None:
+                release()
+
+
+class HostLimitTransport(httpx.AsyncBaseTransport):
+    """
+    Caps the requests in flight per host, which httpx's connection limits do not. A request
+    holds its host slot until its response is closed, so streamed bodies count as well.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, max_per_host: int):
+        self._transport = transport
+        self.max_per_host = max_per_host
+        # host -> [semaphore, number of requests holding or waiting on it]
+        self._hosts: Dict[str, list] = {}
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        entry = self._hosts.get(host)
+        if entry is None:
+            entry = self._hosts[host] = [asyncio.Semaphore(self.max_per_host), 0]
+        entry[1] += 1
+
+        def release() -> None:
+            entry[0].release()
+            entry[1] -= 1
+            if entry[1] == 0:
+                self._hosts.pop(host, None)
+
+        try:
+            await entry[0].acquire()
+        except BaseException:
+            entry[1] -= 1
+            if entry[1] == 0:
+                self._hosts.pop(host, None)
+            raise
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException:
+            release()
+            raise
+        if response.is_closed:
+            # Bodies given in memory are read and closed when the response is built
+            release()
+        else:
+            response.stream = _ReleasingStream(response.stream, release)
+        return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+def get_session(user_agent: Optional[str] = None, settings: Optional[HttpSettings] = None) -> requests.Session:
+    """
+    Returns the shared `requests.Session` used by blocking callers.
+    Args:
+        user_agent: Optional User-Agent header sent with every request of the session
+        settings: Pool settings, from the default config when None
+    """
+    settings = settings or HttpSettings.from_config()
+    with _sessions_lock:
+        session = _sessions.get((user_agent, settings))
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=settings.max_connections,
+                pool_maxsize=settings.max_connections_per_host,
+            )
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            if user_agent:
+                session.headers.update({"User-Agent": user_agent})
+            _sessions[(user_agent, settings)] = session
+        return session
+
+
+def get_async_client(user_agent: Optional[str] = None, settings: Optional[HttpSettings] = None) -> httpx.AsyncClient:
+    """
+    Returns the shared `httpx.AsyncClient` of the running event loop.
+    Must be called from within a coroutine. The client is shared, so callers must not close it.
+    Args:
+        user_agent: Optional User-Agent header sent with every request of the client
+        settings: Pool settings, from the default config when None
+    """
+    settings = settings or HttpSettings.from_config()
+    loop = asyncio.get_running_loop()
+    clients = _async_clients.setdefault(loop, {})
+    client = clients.get((user_agent, settings))
+    if client is None or client.is_closed:
+        limits = httpx.Limits(
+            max_connections=settings.max_connections,
+            max_keepalive_connections=settings.max_connections,
+            keepalive_expiry=settings.keepalive_expiry,
+        )
+        transport = httpx.AsyncHTTPTransport(
+            limits=limits, http2=settings.http2 and importlib.util.find_spec("h2") is not None
+        )
+        client = httpx.AsyncClient(
+            headers={"User-Agent": user_agent} if user_agent else None,
+            transport=HostLimitTransport(transport, settings.max_connections_per_host),
+            follow_redirects=True,
+        )
+        clients[(user_agent, settings)] = client
+    return client
+
+
+async def close_async_clients() -> None:
+    """Closes the async clients of the running event loop, e.g. before a temporary loop ends"""
+    clients = _async_clients.pop(asyncio.get_running_loop(), {})
+    for client in clients.values():
+        await client.aclose()
+
+
+async def close_http_clients() -> None:
+    """Closes the async clients of the running event loop and every shared session"""
+    await close_async_clients()
+
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
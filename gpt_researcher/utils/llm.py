@@ -1,6 +1,7 @@
 # libraries
 from __future__ import annotations
 
+import inspect
 import json
 import logging
 from typing import Optional, Any, Dict
@@ -10,13 +11,16 @@ from langchain.output_parsers import PydanticOutputParser
 from langchain.prompts import PromptTemplate
 
 from gpt_researcher.orchestrator.prompts import generate_subtopics_prompt
-from .costs import estimate_llm_cost
+from gpt_researcher.llm_provider.resilience import PartialResponseError, RetryPolicy, get_chat_response
+from gpt_researcher.llm_provider.scheduler import estimate_request_tokens, get_model_queue
+from .costs import get_llm_cost
 from .validators import Subtopics
 
 
-def get_llm(llm_provider, **kwargs):
-    from gpt_researcher.llm_provider import GenericLLMProvider
-    return GenericLLMProvider.from_provider(llm_provider, **kwargs)
+def get_llm(llm_provider, cfg=None, **kwargs):
+    """Returns the shared provider for these settings, so warm clients and their connections are reused"""
+    from gpt_researcher.llm_provider import get_llm_provider
+    return get_llm_provider(llm_provider, cfg, **kwargs)
 
 
 async def create_chat_completion(
@@ -28,7 +32,8 @@ async def create_chat_completion(
         stream: Optional[bool] = False,
         websocket: Any | None = None,
         llm_kwargs: Dict[str, Any] | None = None,
-        cost_callback: callable = None
+        cost_callback: callable = None,
+        cfg=None
 ) -> str:
     """Create a chat completion using the OpenAI API
     Args:
@@ -40,6 +45,9 @@ async def create_chat_completion(
         llm_provider (str, optional): The LLM Provider to use.
         webocket (WebSocket): The websocket used in the currect request,
         cost_callback: Callback function for updating cost
+        cfg: Config of the LLM response cache, rate limits, retries, hedging and fallback model, if any.
+            Only calls with a temperature up to LLM_CACHE_MAX_TEMPERATURE that are not streamed
+            are served from the cache.
     Returns:
         str: The response from the chat completion
     """
@@ -50,25 +58,100 @@ async def create_chat_completion(
         raise ValueError(
             f"Max tokens cannot be more than 16,000, but got {max_tokens}")
 
-    # Get the provider from supported providers
-    provider = get_llm(llm_provider, model=model, temperature=temperature,
-                       max_tokens=max_tokens, **(llm_kwargs or {}))
+    llm_cache = None
+    if cfg is not None and not stream and temperature <= cfg.llm_cache_max_temperature:
+        from gpt_researcher.llm_provider.cache import get_llm_cache
+        llm_cache = get_llm_cache(cfg)
 
-    response = ""
-    # create response
-    for _ in range(10):  # maximum of 10 attempts
-        response = await provider.get_chat_response(
-            messages, stream, websocket
+    if llm_cache is not None:
+        namespace = llm_cache.get_namespace(
+            llm_provider, model, {"temperature": temperature, "max_tokens": max_tokens, **(llm_kwargs or {})}
         )
+        cache_key = llm_cache.get_key(namespace, messages)
+        cached = llm_cache.get(cache_key)
+        embedding = None
+        if cached is None and llm_cache.semantic:
+            embedding = await get_prompt_embedding(cfg, messages)
+            if embedding is not None:
+                cached = llm_cache.get_similar(namespace, embedding)
+        if cached is not None:
+            response, saved_cost = cached
+            if cost_callback:
+                report_cache_hit(cost_callback, saved_cost)
+            return response
+        llm_cache.record_miss()
+
+    policy = RetryPolicy.from_config(cfg)
+    targets = [(llm_provider, model, llm_kwargs)]
+    if policy.fallback_provider or policy.fallback_model:
+        fallback_provider = policy.fallback_provider or llm_provider
+        # Provider specific kwargs only apply to the fallback if it is the same provider
+        targets.append((fallback_provider, policy.fallback_model or model,
+                        llm_kwargs if fallback_provider == llm_provider else None))
 
+    response = ""
+    last_error = None
+    tokens = estimate_request_tokens(messages, max_tokens)
+    usage = {}
+    # create response, falling back to the next target once retries are exhausted
+    for target_provider, target_model, target_kwargs in targets:
+        # Get the provider from supported providers
+        provider = get_llm(target_provider, cfg, model=target_model, temperature=temperature,
+                           max_tokens=max_tokens, **(target_kwargs or {}))
+        try:
+            response = await get_chat_response(
+                provider, target_provider, target_model, messages, stream, websocket, policy,
+                queue=get_model_queue(cfg, target_provider, target_model), tokens=tokens, usage=usage,
+            )
+        except PartialResponseError:
+            raise
+        except Exception as e:
+            logging.warning(f"Failed to get response from {target_provider} ({target_model}): {e}")
+            last_error = e
+            continue
+
+        llm_costs = None
+        if cost_callback or llm_cache is not None:
+            llm_costs = get_llm_cost(messages, response, usage)
         if cost_callback:
-            llm_costs = estimate_llm_cost(str(messages), response)
             cost_callback(llm_costs)
 
+        if llm_cache is not None and response:
+            llm_cache.set(cache_key, response, llm_costs)
+            if embedding is not None:
+                llm_cache.set_similar(namespace, cache_key, embedding, response, llm_costs)
+
         return response
 
     logging.error(f"Failed to get response from {llm_provider} API")
-    raise RuntimeError(f"Failed to get response from {llm_provider} API")
+    raise RuntimeError(f"Failed to get response from {llm_provider} API") from last_error
+
+
+async def get_prompt_embedding(cfg, messages: list) -> Optional[list]:
+    """Embeds the prompt for the semantic tier of the LLM cache; returns None if embedding fails"""
+    from gpt_researcher.llm_provider.cache import get_prompt_embeddings, serialize_messages
+    try:
+        embeddings = get_prompt_embeddings(cfg)
+        text = "\n".join(f"{role}: {content}" for role, content in serialize_messages(messages))
+        return await embeddings.aembed_query(text)
+    except Exception as e:
+        print(f"Error embedding the prompt for the LLM cache: {e}")
+        return None
+
+
+def report_cache_hit(cost_callback: callable, saved_cost: float) -> None:
+    """
+    Reports a cache hit through the cost callback: it costs nothing, and callbacks that accept
+    a `saved` keyword (e.g. `GPTResearcher.add_costs`) are also told the cost that was saved.
+    """
+    try:
+        parameters = inspect.signature(cost_callback).parameters
+    except (TypeError, ValueError):
+        parameters = {}
+    if "saved" in parameters or any(p.kind == p.VAR_KEYWORD for p in parameters.values()):
+        cost_callback(0.0, saved=saved_cost)
+    else:
+        cost_callback(0.0)
 
 
 async def construct_subtopics(task: str, data: str, config, subtopics: list = []) -> list:
@@ -98,7 +181,7 @@ async def construct_subtopics(task: str, data: str, config, subtopics: list = []
 
         temperature = config.temperature
         # temperature = 0 # Note: temperature throughout the code base is currently set to Zero
-        provider = get_llm(config.llm_provider, model=config.smart_llm_model,
+        provider = get_llm(config.llm_provider, config, model=config.smart_llm_model,
                            temperature=temperature, max_tokens=config.smart_token_limit, **config.llm_kwargs)
         model = provider.llm
 
@@ -0,0 +1,125 @@
+"""
+Token counting for cost accounting.
+
+Exact counts are taken from the usage metadata providers return with their responses; the
+tiktoken counts here are the fallback. Encoders are loaded once per process, texts are
+encoded in batches on tiktoken's threads, and the count of each text is cached, so the same
+pages compressed for every sub-query are only encoded once. Counts are cached by the hash
+and length of the text, so the cache holds no reference to the texts themselves.
+"""
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional
+
+ENCODING_MODEL = "o200k_base"
+
+# Number of text counts kept in the cache
+TOKEN_COUNT_CACHE_SIZE = 16384
+
+# Rough size of a token, used when no tiktoken encoding can be loaded
+CHARS_PER_TOKEN = 4
+
+# Tokens OpenAI adds around every message of a chat, and to prime the reply
+TOKENS_PER_MESSAGE = 3
+TOKENS_PER_REPLY = 3
+
+_counts: "OrderedDict[tuple, int]" = OrderedDict()
+_counts_lock = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def get_encoding(name: str = ENCODING_MODEL):
+    """Returns the tiktoken encoding, loaded once; None if it cannot be loaded, e.g. offline"""
+    try:
+        import tiktoken
+        return tiktoken.get_encoding(name)
+    except Exception as e:
+        print(f"Error loading the {name} token encoding, estimating token counts instead: {e}")
+        return None
+
+
+@lru_cache(maxsize=None)
+def get_encoding_name_for_model(model: str) -> str:
+    try:
+        import tiktoken
+        return tiktoken.encoding_name_for_model(model)
+    except (ImportError, KeyError):
+        return ENCODING_MODEL
+
+
+def count_tokens_batch(texts: Iterable[str], encoding_name: str = ENCODING_MODEL) -> List[int]:
+    """Counts the tokens of each text, encoding the texts not counted before in one batch"""
+    texts = list(texts)
+    keys = [(encoding_name, hash(text), len(text)) for text in texts]
+    counts: List[Optional[int]] = []
+    with _counts_lock:
+        for key in keys:
+            count = _counts.get(key)
+            if count is not None:
+                _counts.move_to_end(key)
+            counts.append(count)
+
+    missing = [i for i, count in enumerate(counts) if count is None]
+    if not missing:
+        return counts
+
+    encoding = get_encoding(encoding_name)
+    if encoding is None:
+        computed = [len(texts[i]) // CHARS_PER_TOKEN for i in missing]
+    else:
+        computed = [len(tokens) for tokens in encoding.encode_ordinary_batch([texts[i] for i in missing])]
+
+    with _counts_lock:
+        for i, count in zip(missing, computed):
+            counts[i] = count
+            _counts[keys[i]] = count
+            _counts.move_to_end(keys[i])
+        while len(_counts) > TOKEN_COUNT_CACHE_SIZE:
+            _counts.popitem(last=False)
+    return counts
+
+
+def count_tokens(text: str, encoding_name: str = ENCODING_MODEL) -> int:
+    return count_tokens_batch([text], encoding_name)[0]
+
+
+def get_message_text(message: Any) -> str:
+    """The text of an OpenAI style message dict, a langchain message or document, or a page dict"""
+    if isinstance(message, dict):
+        content = message.get("content", message.get("raw_content"))
+    else:
+        content = getattr(message, "content", getattr(message, "page_content", None))
+    if content is None:
+        return str(message)
+    if isinstance(content, str):
+        return content
+    # Multimodal content: count the text parts
+    return " ".join(part.get("text", "") if isinstance(part, dict) else str(part) for part in content)
+
+
+def count_message_tokens(messages: list, encoding_name: str = ENCODING_MODEL) -> int:
+    """Counts the prompt tokens of chat messages, as billed: their contents plus per-message overhead"""
+    counts = count_tokens_batch([get_message_text(message) for message in messages], encoding_name)
+    return sum(counts) + TOKENS_PER_MESSAGE * len(messages) + TOKENS_PER_REPLY
+
+
+def get_token_usage(message: Any) -> Optional[Dict[str, int]]:
+    """
+    Returns the {"input_tokens", "output_tokens"} the provider reported for a response message,
+    from langchain's `usage_metadata` or the provider specific `response_metadata`, if any.
+    """
+    usage = getattr(message, "usage_metadata", None)
+    if usage and usage.get("input_tokens") is not None:
+        return {"input_tokens": usage["input_tokens"], "output_tokens": usage.get("output_tokens", 0)}
+
+    metadata = getattr(message, "response_metadata", None) or {}
+    for key, input_key, output_key in (
+        ("token_usage", "prompt_tokens", "completion_tokens"),  # OpenAI, Groq, Mistral, ...
+        ("usage", "input_tokens", "output_tokens"),  # Anthropic
+        ("usage_metadata", "prompt_token_count", "candidates_token_count"),  # Google
+    ):
+        usage = metadata.get(key)
+        if isinstance(usage, dict) and usage.get(input_key) is not None:
+            return {"input_tokens": usage[input_key], "output_tokens": usage.get(output_key) or 0}
+    return None
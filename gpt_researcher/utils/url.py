@@ -0,0 +1,118 @@
+from typing import Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+
+def normalize_url(url: str) -> str:
+    """
+    Normalizes a url so that trivially different spellings of the same address compare equal:
+    lowercases the scheme and host, drops default ports and the fragment, and sorts the query.
+
+    Args:
+        url (str): The url to normalize.
+
+    Returns:
+        str: The normalized url.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    netloc = (parts.hostname or "").lower()
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    if port and (scheme, port) not in (("http", 80), ("https", 443)):
+        netloc = f"{netloc}:{port}"
+    path = parts.path or "/"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, netloc, path, query, ""))
+
+
+# Query parameters that only track the visitor or the campaign and never change the page
+TRACKING_PARAMS = frozenset({
+    "fbclid", "gclid", "dclid", "gbraid", "wbraid", "msclkid", "yclid", "twclid", "igshid", "mc_cid", "mc_eid",
+    "_ga", "_gl", "_hsenc", "_hsmi", "mkt_tok", "ref_src", "ref_url", "referrer", "cmpid", "ncid", "sr_share",
+    "spm", "si", "amp", "outputtype", "guccounter",
+})
+TRACKING_PREFIXES = ("utm_", "pk_", "mtm_", "hsa_", "oly_")
+
+# Host prefixes of alternative versions of the same site
+HOST_PREFIXES = ("www.", "m.", "mobile.", "amp.")
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Returns the canonical form of a url, so that the same page reached through different
+    links compares equal. On top of `normalize_url`, it:
+    - unwraps Google AMP cache and AMP viewer links to the publisher's url
+    - treats http and https, and the www./m./amp. variants of a host, as the same site
+    - drops tracking query parameters (utm_*, gclid, fbclid, ...) and AMP markers
+    - drops AMP path variants (/amp, .amp.html) and trailing slashes
+
+    The canonical form is meant for comparing urls, not for fetching them: the stripped
+    host prefix may be required to reach the site.
+
+    Args:
+        url (str): The url to canonicalize.
+
+    Returns:
+        str: The canonical url.
+    """
+    parts = urlsplit(normalize_url(url))
+    netloc, path = parts.netloc, parts.path
+
+    # https://example-com.cdn.ampproject.org/c/s/example.com/article, https://www.google.com/amp/s/example.com/article
+    if netloc.endswith(".cdn.ampproject.org") or (netloc in ("google.com", "www.google.com") and path.startswith("/amp/")):
+        segments = [segment for segment in path.split("/") if segment]
+        while segments and segments[0] in ("c", "v", "i", "s", "amp"):
+            segments.pop(0)
+        if segments:
+            return canonicalize_url("https://" + "/".join(segments) + (f"?{parts.query}" if parts.query else ""))
+
+    for prefix in HOST_PREFIXES:
+        if netloc.startswith(prefix) and netloc.count(".") > 1:
+            netloc = netloc[len(prefix):]
+            break
+
+    if path.endswith(".amp.html"):
+        path = path[:-len(".amp.html")] + ".html"
+    elif path.endswith(".amp"):
+        path = path[:-len(".amp")]
+    elif path == "/amp" or path.endswith("/amp") or path.endswith("/amp/"):
+        path = path.rstrip("/")[:-len("/amp")]
+    if path.startswith("/amp/"):
+        path = path[len("/amp"):]
+    path = path.rstrip("/") or "/"
+
+    query = urlencode([
+        (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if name.lower() not in TRACKING_PARAMS and not name.lower().startswith(TRACKING_PREFIXES)
+    ])
+    return urlunsplit(("https", netloc, path, query, ""))
+
+
+def filter_new_urls(urls, visited_urls: set, limit: Optional[int] = None) -> list:
+    """
+    Returns the urls whose canonical form is neither in `visited_urls` nor earlier in `urls`,
+    in their original order, and adds them to `visited_urls`. The urls are kept as given.
+
+    Args:
+        urls: The candidate urls, best first.
+        visited_urls (set): The urls visited so far, updated in place.
+        limit (int, optional): Maximum number of new urls to return; the others are left unvisited.
+
+    Returns:
+        list: The new urls.
+    """
+    seen = {canonicalize_url(url) for url in visited_urls}
+    new_urls = []
+    for url in urls:
+        if limit is not None and len(new_urls) >= limit:
+            break
+        if not url:
+            continue
+        canonical = canonicalize_url(url)
+        if canonical not in seen:
+            seen.add(canonical)
+            visited_urls.add(url)
+            new_urls.append(url)
+    return new_urls
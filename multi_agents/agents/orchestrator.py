@@ -6,6 +6,7 @@ from langgraph.graph import StateGraph, END
 from .utils.views import print_agent_output
 from ..memory.research import ResearchState
 from .utils.utils import sanitize_filename
+from gpt_researcher.llm_provider.scheduler import llm_lane
 
 # Import agent classes
 from . import \
@@ -114,5 +115,7 @@ class ChiefEditorAgent:
             }
         }
 
-        result = await chain.ainvoke({"task": self.task}, config=config)
+        # Every LLM call of the research team, including its GPTResearcher instances, is background work
+        with llm_lane("multi_agents"):
+            result = await chain.ainvoke({"task": self.task}, config=config)
         return result
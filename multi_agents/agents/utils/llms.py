@@ -30,6 +30,7 @@ async def call_model(
             llm_provider=cfg.llm_provider,
             llm_kwargs=cfg.llm_kwargs,
             # cost_callback=cost_callback,
+            cfg=cfg,
         )
 
         if response_format == "json":
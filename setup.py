@@ -41,6 +41,7 @@ setup(
         "Topic :: Scientific/Engineering :: Artificial Intelligence",
     ],
     install_requires=reqs,
+    extras_require={"test": ["pytest>=7.0", "pytest-asyncio>=0.23"]},
 
 
 )
\ No newline at end of file
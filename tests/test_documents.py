@@ -0,0 +1,232 @@
+import asyncio
+import multiprocessing
+import os
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from gpt_researcher.context import compression
+from gpt_researcher.context.compression import ChunkIndex, ContextCompressor
+from gpt_researcher.document import DocumentLoader
+from gpt_researcher.document import document as document_module
+from gpt_researcher.document.index import DocumentIndex
+from gpt_researcher.memory.cache import CachedEmbeddings, EmbeddingCache
+
+WORDS = ["battery", "solar", "wind", "hydrogen"]
+
+
+class FakeEmbeddings:
+    """Embeds a text as the counts of a few known words, recording every call"""
+    model = "fake-embedding"
+
+    def __init__(self, delay=0):
+        self.calls = []
+        self.delay = delay
+        self.in_flight = 0
+        self.peak = 0
+
+    @staticmethod
+    def embed(text):
+        return [text.lower().count(word) + 0.01 for word in WORDS]
+
+    async def aembed_documents(self, texts):
+        self.calls.append(len(texts))
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(self.delay)
+        self.in_flight -= 1
+        return [self.embed(text) for text in texts]
+
+    async def aembed_query(self, text):
+        return self.embed(text)
+
+
+def write(path, text):
+    with open(path, "w") as f:
+        f.write(text)
+
+
+class SleepyLoader:
+    """Loader of ".slow" files, which sleeps for the number of seconds written in the file"""
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+
+    def load(self):
+        with open(self.file_path) as f:
+            time.sleep(float(f.read()))
+        return [SimpleNamespace(page_content=f"slept in {self.file_path}", metadata={"source": self.file_path})]
+
+
+@pytest.fixture
+def sleepy_pool(monkeypatch):
+    """Fresh parse pools whose forked workers know SleepyLoader"""
+    if multiprocessing.get_start_method() != "fork":
+        pytest.skip("workers only inherit the patched loaders when forked")
+    executors = {}
+    monkeypatch.setattr(document_module, "_executors", executors)
+    monkeypatch.setitem(document_module.LOADERS, "slow", SleepyLoader)
+    yield executors
+    for executor in executors.values():
+        executor.shutdown(cancel_futures=True)
+
+
+@pytest.mark.asyncio
+async def test_document_timeout_starts_when_a_worker_picks_the_file_up(tmp_path, sleepy_pool):
+    for i in range(12):
+        write(tmp_path / f"{i}.slow", "0.3")
+    loader = DocumentLoader(str(tmp_path), max_workers=1, timeout=1)
+
+    assert len(await loader.load()) == 12
+
+
+@pytest.mark.asyncio
+async def test_document_timeout_skips_only_the_slow_file(tmp_path, sleepy_pool):
+    write(tmp_path / "stuck.slow", "30")
+    for i in range(3):
+        write(tmp_path / f"{i}.slow", "0.1")
+    loader = DocumentLoader(str(tmp_path), max_workers=2, timeout=1)
+    executor = document_module.get_parse_executor(2)
+
+    start = time.monotonic()
+    pages = await loader.load()
+    assert time.monotonic() - start < 5
+    assert sorted(os.path.basename(page["url"]) for page in pages) == ["0.slow", "1.slow", "2.slow"]
+    # The worker stopped the parse itself, so the pool was not recycled
+    assert sleepy_pool[2] is executor
+    assert executor.submit(int).result() == 0
+
+
+@pytest.mark.asyncio
+async def test_chunk_index_search():
+    pages = [
+        {"url": "battery", "raw_content": "battery battery battery"},
+        {"url": "solar", "raw_content": "solar solar"},
+        {"url": "wind", "raw_content": "wind"},
+    ]
+    embeddings = FakeEmbeddings()
+    index = await ChunkIndex.from_pages(pages, embeddings)
+    assert len(index) == 3
+    assert embeddings.calls == [3]
+
+    results = index.search(FakeEmbeddings.embed("battery"), similarity_threshold=0.5)
+    assert [chunk.metadata["source"] for chunk in results] == ["battery"]
+
+    # Most similar first, at most k chunks
+    results = index.search(FakeEmbeddings.embed("battery battery battery solar solar wind"), similarity_threshold=0.1, k=2)
+    assert [chunk.metadata["source"] for chunk in results] == ["battery", "solar"]
+
+
+async def stream(pages):
+    for page in pages:
+        yield page
+
+
+@pytest.mark.asyncio
+async def test_streamed_compression_charges_only_embedded_chunks():
+    pages = [{"url": f"page-{i}", "raw_content": f"battery storage report number {i}"} for i in range(2)]
+    embeddings = CachedEmbeddings(FakeEmbeddings(), EmbeddingCache(), "fake")
+    costs = []
+
+    context = await ContextCompressor([], embeddings).async_get_context_from_stream(
+        "battery", stream(pages), cost_callback=costs.append
+    )
+    assert "page-0" in context
+    assert len(costs) == 1 and costs[0] > 0
+
+    # Every chunk comes from the embedding cache the second time
+    await ContextCompressor([], embeddings).async_get_context_from_stream(
+        "battery", stream(pages), cost_callback=costs.append
+    )
+    assert len(costs) == 1
+
+
+@pytest.mark.asyncio
+async def test_streamed_compression_bounds_concurrent_embedding_calls():
+    pages = [{"url": f"page-{i}", "raw_content": f"solar farm number {i}"} for i in range(12)]
+    embeddings = FakeEmbeddings(delay=0.02)
+
+    await ContextCompressor([], embeddings).async_get_context_from_stream("solar", stream(pages))
+    assert len(embeddings.calls) == 12
+    assert embeddings.peak == compression.EMBEDDING_CONCURRENCY
+
+
+def test_document_index_serves_unchanged_files_only(tmp_path):
+    index = DocumentIndex(str(tmp_path / "index.sqlite3"))
+    pages = [{"raw_content": "battery", "url": "a.txt"}]
+    index.set("/docs/a.txt", 1.0, 7, pages)
+
+    assert index.get("/docs/a.txt", 1.0, 7) == pages
+    assert index.get("/docs/a.txt", 2.0, 7) is None
+    assert index.get("/docs/a.txt", 1.0, 8) is None
+
+    index.set_chunks("/docs/a.txt", 1.0, 7, "model", [{"page_content": "battery", "metadata": {}}], [[1.0, 2.0]])
+    chunks, vectors = index.get_chunks("/docs/a.txt", 1.0, 7, "model")
+    assert chunks == [{"page_content": "battery", "metadata": {}}]
+    np.testing.assert_array_equal(vectors, np.array([[1.0, 2.0]], dtype=np.float32))
+    assert index.get_chunks("/docs/a.txt", 1.0, 7, "other-model") is None
+
+    # A new version of the file outdates its chunks
+    index.set("/docs/a.txt", 2.0, 9, pages)
+    assert index.get_chunks("/docs/a.txt", 1.0, 7, "model") is None
+
+    index.prune("/docs", [])
+    assert index.get("/docs/a.txt", 2.0, 9) is None
+
+
+@pytest.mark.asyncio
+async def test_document_loader_parses_each_file_once(tmp_path, monkeypatch):
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    write(docs / "battery.txt", "Battery storage is growing fast.")
+    write(docs / "solar.txt", "Solar panels keep getting cheaper.")
+    write(docs / "ignored.bin", "not a document")
+    index = DocumentIndex(str(tmp_path / "index.sqlite3"))
+    loader = DocumentLoader(str(docs), index, max_workers=1)
+
+    first = await loader.load()
+    assert sorted(page["raw_content"] for page in first) == [
+        "Battery storage is growing fast.", "Solar panels keep getting cheaper."
+    ]
+
+    async def fail(file_path, file_extension):
+        raise AssertionError(f"{file_path} was parsed again")
+
+    monkeypatch.setattr(loader, "_load_document", fail)
+    second = await loader.load()
+    assert sorted(map(str, second)) == sorted(map(str, first))
+
+    # Deleted files are pruned from the index when the folder is walked
+    os.remove(docs / "solar.txt")
+    assert [page["url"] for page in await loader.load()] == ["battery.txt"]
+    solar = first[0]["file"] if first[0]["url"] == "solar.txt" else first[1]["file"]
+    assert index.get(*solar) is None
+
+
+@pytest.mark.asyncio
+async def test_chunk_index_reuses_stored_chunks_of_unchanged_files(tmp_path):
+    document_index = DocumentIndex(str(tmp_path / "index.sqlite3"))
+    local = [
+        {"url": "a.txt", "raw_content": "battery " * 5, "file": ["/docs/a.txt", 1.0, 40]},
+        {"url": "b.txt", "raw_content": "solar " * 5, "file": ["/docs/b.txt", 1.0, 30]},
+    ]
+    web = [{"url": "https://example.com", "raw_content": "wind " * 5}]
+
+    embeddings = FakeEmbeddings()
+    first = await ChunkIndex.from_pages(local + web, embeddings, document_index)
+    assert embeddings.calls == [3]
+
+    # Only the web page is embedded again
+    second = await ChunkIndex.from_pages(local + web, embeddings, document_index)
+    assert embeddings.calls == [3, 1]
+    assert sorted(chunk.page_content for chunk in second.chunks) == sorted(chunk.page_content for chunk in first.chunks)
+    query = FakeEmbeddings.embed("solar")
+    assert [chunk.metadata["source"] for chunk in second.search(query, 0.5)] == ["b.txt"]
+
+    # A changed file is embedded again, the unchanged one is still reused
+    changed = [local[0], {**local[1], "raw_content": "hydrogen " * 5, "file": ["/docs/b.txt", 2.0, 45]}]
+    third = await ChunkIndex.from_pages(changed, embeddings, document_index)
+    assert embeddings.calls == [3, 1, 1]
+    assert [chunk.metadata["source"] for chunk in third.search(FakeEmbeddings.embed("hydrogen"), 0.5)] == ["b.txt"]
@@ -0,0 +1,153 @@
+import asyncio
+import time
+
+import pytest
+
+from gpt_researcher.llm_provider.resilience import RetryPolicy, backoff_delay, hedge, is_retryable
+from gpt_researcher.llm_provider.scheduler import BACKGROUND, INTERACTIVE, ModelQueue, get_rate_limits, llm_lane
+
+
+@pytest.mark.asyncio
+async def test_hedge_returns_fast_call_without_backup():
+    calls = []
+
+    async def call():
+        calls.append("call")
+        return "answer"
+
+    assert await hedge(call, delay=0.1) == "answer"
+    assert calls == ["call"]
+
+
+@pytest.mark.asyncio
+async def test_hedge_starts_backup_for_slow_call_and_cancels_the_loser():
+    cancelled = []
+
+    async def slow():
+        try:
+            await asyncio.sleep(1)
+            return "slow"
+        except asyncio.CancelledError:
+            cancelled.append("slow")
+            raise
+
+    async def backup():
+        await asyncio.sleep(0.01)
+        return "backup"
+
+    start = time.monotonic()
+    assert await hedge(slow, delay=0.02, backup=backup) == "backup"
+    assert time.monotonic() - start < 0.5
+    assert cancelled == ["slow"]
+
+
+@pytest.mark.asyncio
+async def test_hedge_falls_back_when_one_call_fails():
+    attempts = []
+
+    async def call():
+        attempts.append(len(attempts))
+        if len(attempts) == 1:
+            await asyncio.sleep(0.05)
+            raise RuntimeError("first call failed")
+        await asyncio.sleep(0.1)
+        return "second"
+
+    assert await hedge(call, delay=0.01) == "second"
+
+    async def failing():
+        await asyncio.sleep(0.02)
+        raise RuntimeError("down")
+
+    with pytest.raises(RuntimeError, match="down"):
+        await hedge(failing, delay=0.01)
+
+
+@pytest.mark.asyncio
+async def test_hedge_discards_the_slower_success():
+    discarded = []
+
+    async def first():
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            # Succeeded anyway, e.g. a stream that was already open
+            return "first"
+
+    async def backup():
+        return "backup"
+
+    async def discard(result):
+        discarded.append(result)
+
+    assert await hedge(first, delay=0.01, backup=backup, discard=discard) == "backup"
+    assert discarded == ["first"]
+
+
+def test_retry_classification_and_backoff():
+    class RateLimitError(Exception):
+        status_code = 429
+
+    class BadRequestError(Exception):
+        status_code = 400
+
+    assert is_retryable(RateLimitError())
+    assert not is_retryable(BadRequestError())
+    assert is_retryable(asyncio.TimeoutError())
+    assert not is_retryable(ValueError())
+
+    policy = RetryPolicy(base_delay=1, max_delay=3)
+    assert all(0 <= backoff_delay(5, policy) <= 3 for _ in range(100))
+    assert backoff_delay(0, policy, retry_after=7) == 7
+
+
+@pytest.mark.asyncio
+async def test_model_queue_serves_interactive_lane_first():
+    queue = ModelQueue(requests_per_minute=600, tokens_per_minute=None)
+    # Spend the burst so the next calls have to queue
+    for _ in range(int(queue.requests.capacity)):
+        await queue.acquire(0)
+    order = []
+
+    async def call(lane, name):
+        with llm_lane("detailed_report" if lane == BACKGROUND else "research_report"):
+            await queue.acquire(0)
+        order.append(name)
+
+    background = [asyncio.create_task(call(BACKGROUND, f"background-{i}")) for i in range(2)]
+    await asyncio.sleep(0)
+    interactive = [asyncio.create_task(call(INTERACTIVE, f"interactive-{i}")) for i in range(2)]
+    await asyncio.gather(*background, *interactive)
+
+    assert order == ["interactive-0", "interactive-1", "background-0", "background-1"]
+    stats = queue.stats()
+    assert stats["queued"] == {INTERACTIVE: 0, BACKGROUND: 0}
+    assert stats["granted"] == int(queue.requests.capacity) + 4
+
+
+@pytest.mark.asyncio
+async def test_model_queue_spreads_calls_over_the_token_budget():
+    # 6000 tokens a minute: a burst of 1000 tokens, then 100 tokens a second
+    queue = ModelQueue(requests_per_minute=None, tokens_per_minute=6000)
+    start = time.monotonic()
+    await queue.acquire(1000)
+    await queue.acquire(20)
+    elapsed = time.monotonic() - start
+    assert 0.15 <= elapsed < 0.6
+
+
+def test_llm_lane_keeps_enclosing_lane():
+    with llm_lane("detailed_report") as outer:
+        with llm_lane("research_report") as inner:
+            assert outer == inner == BACKGROUND
+
+
+def test_rate_limits_most_specific_entry_wins():
+    class Cfg:
+        llm_requests_per_minute = 100
+        llm_tokens_per_minute = None
+        llm_rate_limits = {"openai": {"tpm": 50000}, "openai:gpt-4o": {"rpm": 10}}
+
+    assert get_rate_limits(Cfg, "openai", "gpt-4o") == (10, 50000)
+    assert get_rate_limits(Cfg, "openai", "gpt-4o-mini") == (100, 50000)
+    assert get_rate_limits(Cfg, "anthropic", "claude") == (100, None)
@@ -0,0 +1,210 @@
+import asyncio
+
+import pytest
+
+from gpt_researcher.orchestrator.actions.retriever import (
+    fuse_search_results, search_with_retrievers, stream_fused_search_with_retrievers, stream_search_with_retrievers
+)
+from gpt_researcher.retrievers.base import BaseRetriever
+from gpt_researcher.retrievers.cache import SearchCache, with_search_cache
+from gpt_researcher.utils import http
+from gpt_researcher.utils.url import canonicalize_url, filter_new_urls
+
+
+class FakeRetriever(BaseRetriever):
+    calls = []
+
+    def __init__(self, query, topic="general"):
+        self.query = query
+        self.topic = topic
+
+    async def asearch(self, max_results=7):
+        self.calls.append((self.query, max_results))
+        return [{"href": f"https://example.com/{self.query}/{i}", "body": ""} for i in range(max_results)]
+
+
+@pytest.fixture(autouse=True)
+def reset_calls():
+    FakeRetriever.calls = []
+
+
+class SlowRetriever(FakeRetriever):
+    async def asearch(self, max_results=7):
+        await asyncio.sleep(1)
+        return await super().asearch(max_results)
+
+
+class FailingRetriever(FakeRetriever):
+    async def asearch(self, max_results=7):
+        raise RuntimeError("search engine down")
+
+
+class OtherRetriever(FakeRetriever):
+    async def asearch(self, max_results=7):
+        await asyncio.sleep(0.1)
+        return [{"href": f"https://other.com/{self.query}/{i}", "body": ""} for i in range(max_results)]
+
+
+@pytest.mark.asyncio
+async def test_stream_search_yields_each_retriever_as_it_answers():
+    results = [
+        results async for results in stream_search_with_retrievers(
+            [SlowRetriever, FailingRetriever, FakeRetriever], "batteries", max_results=2, timeout=0.2
+        )
+    ]
+    # The slow retriever times out, the failing one is skipped
+    assert results == [[
+        {"href": "https://example.com/batteries/0", "body": ""},
+        {"href": "https://example.com/batteries/1", "body": ""},
+    ]]
+
+
+@pytest.mark.asyncio
+async def test_stream_fused_search_covers_a_growing_share_of_the_retrievers():
+    answers = [
+        ([result["href"] for result in results], share)
+        async for results, share in stream_fused_search_with_retrievers(
+            [OtherRetriever, FailingRetriever, FakeRetriever], "batteries", max_results=2
+        )
+    ]
+    assert answers == [
+        (["https://example.com/batteries/0", "https://example.com/batteries/1"], 1 / 3),
+        # Fused with the ranking of the first answer rather than appended to it
+        ([
+            "https://example.com/batteries/0", "https://other.com/batteries/0",
+            "https://example.com/batteries/1", "https://other.com/batteries/1",
+        ], 2 / 3),
+        # The failed retriever releases the rest of the share once the search ends
+        ([
+            "https://example.com/batteries/0", "https://other.com/batteries/0",
+            "https://example.com/batteries/1", "https://other.com/batteries/1",
+        ], 1.0),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_search_with_retrievers_fuses_the_answers():
+    results = await search_with_retrievers([FakeRetriever, FakeRetriever], "batteries", max_results=2)
+    assert [result["href"] for result in results] == [
+        "https://example.com/batteries/0", "https://example.com/batteries/1"
+    ]
+
+
+class HttpRetriever(FakeRetriever):
+    clients = []
+
+    async def asearch(self, max_results=7):
+        self.clients.append(http.get_async_client())
+        return await super().asearch(max_results)
+
+
+def test_blocking_search_closes_the_clients_of_its_loop():
+    HttpRetriever.clients = []
+    assert len(HttpRetriever("batteries").search(max_results=1)) == 1
+    assert len(HttpRetriever("batteries").search(max_results=1)) == 1
+    assert all(client.is_closed for client in HttpRetriever.clients)
+    assert not any(client in HttpRetriever.clients for clients in http._async_clients.values() for client in clients.values())
+
+
+@pytest.mark.asyncio
+async def test_blocking_search_refuses_to_block_a_running_loop():
+    with pytest.raises(RuntimeError, match="asearch"):
+        FakeRetriever("batteries").search()
+    assert FakeRetriever.calls == []
+
+
+def test_search_cache_keys():
+    key = SearchCache.get_key("TavilySearch", "solid-state batteries", {"max_results": 5, "topic": "news"})
+    assert key == SearchCache.get_key("TavilySearch", "solid-state batteries", {"topic": "news", "max_results": 5})
+    assert key != SearchCache.get_key("Duckduckgo", "solid-state batteries", {"max_results": 5, "topic": "news"})
+    assert key != SearchCache.get_key("TavilySearch", "sodium batteries", {"max_results": 5, "topic": "news"})
+    assert key != SearchCache.get_key("TavilySearch", "solid-state batteries", {"max_results": 7, "topic": "news"})
+
+
+def test_search_cache_expires_and_persists(tmp_path):
+    path = str(tmp_path / "search.sqlite3")
+    cache = SearchCache(ttl=60, path=path)
+    cache.set("key", [{"href": "https://example.com"}])
+
+    results = cache.get("key")
+    assert results == [{"href": "https://example.com"}]
+    # Callers get copies and cannot alter the cached results
+    results[0]["href"] = "changed"
+    assert cache.get("key") == [{"href": "https://example.com"}]
+
+    assert SearchCache(ttl=60, path=path).get("key") == [{"href": "https://example.com"}]
+
+    expired = SearchCache(ttl=0)
+    expired.set("key", [{"href": "https://example.com"}])
+    assert expired.get("key") is None
+    assert expired.stats() == {"hits": 0, "misses": 1, "entries": 0}
+
+
+@pytest.mark.asyncio
+async def test_cached_retriever_binds_default_arguments():
+    cache = SearchCache()
+    Retriever = with_search_cache(FakeRetriever, cache)
+    assert Retriever.__name__ == "FakeRetriever"
+
+    first = await Retriever("batteries").asearch()
+    second = await Retriever("batteries").asearch(max_results=7)
+    await Retriever("batteries").asearch(max_results=3)
+    await Retriever("sodium").asearch()
+
+    assert first == second
+    assert FakeRetriever.calls == [("batteries", 7), ("batteries", 3), ("sodium", 7)]
+    assert cache.stats()["hits"] == 1
+
+
+def test_fuse_search_results_ranks_pages_found_by_several_retrievers_first():
+    fused = fuse_search_results([
+        [{"href": "https://a.com/1"}, {"href": "https://b.com/shared"}, {"href": "https://a.com/3"}],
+        [{"url": "https://www.b.com/shared/?utm_source=x"}, {"href": "https://c.com/1"}],
+        None,
+    ])
+    assert [result.get("href") or result.get("url") for result in fused] == [
+        # Listed by both retrievers: 1/62 + 1/61
+        "https://www.b.com/shared/?utm_source=x",
+        "https://a.com/1",
+        "https://c.com/1",
+        "https://a.com/3",
+    ]
+
+
+def test_fuse_search_results_keeps_duplicates_within_a_list_once():
+    fused = fuse_search_results([
+        [{"href": "https://a.com/1"}, {"href": "http://a.com/1#top"}, {"href": "https://a.com/2"}],
+    ])
+    assert [result["href"] for result in fused] == ["https://a.com/1", "https://a.com/2"]
+
+
+@pytest.mark.parametrize("url, canonical", [
+    ("HTTP://WWW.Example.com:80/News/?utm_source=x&b=2&a=1#section", "https://example.com/News?a=1&b=2"),
+    ("https://m.example.com/article/", "https://example.com/article"),
+    ("https://example.com/article/amp", "https://example.com/article"),
+    ("https://example.com/article.amp.html", "https://example.com/article.html"),
+    ("https://example-com.cdn.ampproject.org/c/s/example.com/article?gclid=1", "https://example.com/article"),
+    ("https://www.google.com/amp/s/www.example.com/article/amp/", "https://example.com/article"),
+    ("https://example.com/search?q=batteries&fbclid=abc", "https://example.com/search?q=batteries"),
+    ("https://example.com", "https://example.com/"),
+])
+def test_canonicalize_url(url, canonical):
+    assert canonicalize_url(url) == canonical
+
+
+def test_canonicalize_url_keeps_hosts_without_prefix():
+    assert canonicalize_url("https://www.com/") == "https://www.com/"
+
+
+def test_filter_new_urls():
+    visited = {"https://example.com/seen"}
+    urls = [
+        "https://www.example.com/seen/?utm_medium=email",
+        "https://example.com/new",
+        "http://example.com/new/",
+        None,
+        "https://example.com/other",
+        "https://example.com/third",
+    ]
+    assert filter_new_urls(urls, visited, limit=2) == ["https://example.com/new", "https://example.com/other"]
+    assert visited == {"https://example.com/seen", "https://example.com/new", "https://example.com/other"}
@@ -0,0 +1,369 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+import requests
+
+from gpt_researcher.scraper import BeautifulSoupScraper
+from gpt_researcher.scraper import cache as scrape_cache
+from gpt_researcher.scraper.cache import ScrapeCache
+from gpt_researcher.scraper.parser import PARSERS, SelectolaxParser
+from gpt_researcher.scraper.pool import FetchPool, HostGuard, HostUnavailable
+from gpt_researcher.scraper.scraper import Scraper
+from gpt_researcher.scraper.settings import ScraperSettings
+
+HTML = """
+<html>
+  <head><title>Battery research</title><style>body { color: red; }</style></head>
+  <body>
+    <nav><a href="/">Home</a> <a href="/news">News</a></nav>
+    <script>var tracking = true;</script>
+    <article>
+      <h1>Solid-state batteries</h1>
+      <p>Solid-state batteries replace the liquid electrolyte with a solid one.</p>
+      <p>They promise a higher energy density and <b>better safety</b> than lithium-ion cells.</p>
+      <ul><li>Higher density</li><li>No flammable liquid</li></ul>
+      <table><tr><td>Year</td><td>2024</td></tr></table>
+    </article>
+    <footer>Copyright 2024 Example News. All rights reserved.</footer>
+  </body>
+</html>
+"""
+
+PARAGRAPH = (
+    "Solid-state batteries replace the liquid electrolyte with a solid ceramic or polymer one, which promises "
+    "higher energy density, faster charging and far better safety than the lithium-ion cells used today."
+)
+
+# Body and wrapper classes of a stock WordPress theme
+WORDPRESS_PAGE = f"""
+<html>
+  <body class="home page-template-default page page-id-2 wp-custom-logo has-sidebar footer-top-visible">
+    <div class="site-content share-enabled">
+      <article>
+        <header class="entry-header"><h1>Solid-state batteries are coming</h1></header>
+        <p>{PARAGRAPH}</p>
+      </article>
+      <aside class="sidebar"><p>Subscribe to our weekly newsletter today</p></aside>
+      <div class="related-posts"><p>Another article about three things</p></div>
+      <div id="comments" class="comments-area"><p>Great article, thanks a lot</p></div>
+    </div>
+  </body>
+</html>
+"""
+
+# The content and the sidebar share a wrapper whose class names both
+SIDEBAR_WRAPPED_PAGE = f"""
+<html>
+  <body>
+    <div class="content-sidebar-wrap">
+      <main class="content"><p>{PARAGRAPH}</p></main>
+      <div class="sidebar sidebar-primary widget-area"><p>Widget text that should vanish here</p></div>
+    </div>
+  </body>
+</html>
+"""
+
+HEADER_PAGE = f"""
+<html>
+  <body>
+    <header class="site-header"><a href="/">Example News home page</a></header>
+    <article>
+      <header><h1>Solid-state batteries are coming</h1></header>
+      <p>{PARAGRAPH}</p>
+    </article>
+  </body>
+</html>
+"""
+
+
+@pytest.mark.parametrize("parser", sorted(PARSERS))
+def test_main_content_survives_boilerplate_looking_wrappers(parser):
+    text = PARSERS[parser]().extract_text(WORDPRESS_PAGE, main_content=True)
+    assert text == f"Solid-state batteries are coming\n\n{PARAGRAPH}"
+
+
+@pytest.mark.parametrize("parser", sorted(PARSERS))
+def test_main_content_keeps_only_the_content_side_of_a_shared_wrapper(parser):
+    assert PARSERS[parser]().extract_text(SIDEBAR_WRAPPED_PAGE, main_content=True) == PARAGRAPH
+
+
+@pytest.mark.parametrize("parser", sorted(PARSERS))
+def test_main_content_drops_site_header_but_keeps_article_header(parser):
+    text = PARSERS[parser]().extract_text(HEADER_PAGE, main_content=True)
+    assert text == f"Solid-state batteries are coming\n\n{PARAGRAPH}"
+
+
+@pytest.mark.parametrize("parser", sorted(PARSERS))
+def test_full_text_keeps_pages_with_state_classes_on_body(parser):
+    text = PARSERS[parser]().extract_text(WORDPRESS_PAGE)
+    assert "Solid-state batteries are coming" in text
+    assert PARAGRAPH in text
+
+
+@pytest.mark.asyncio
+async def test_fetch_pool_limits_requests_per_host():
+    pool = FetchPool(max_concurrency=10, max_per_host=2)
+    in_flight = {}
+    peak = {}
+
+    async def fetch(url):
+        host = pool.get_host(url)
+        async with pool.slot(url):
+            in_flight[host] = in_flight.get(host, 0) + 1
+            peak[host] = max(peak.get(host, 0), in_flight[host])
+            await asyncio.sleep(0.02)
+            in_flight[host] -= 1
+
+    await asyncio.gather(
+        *[fetch(f"https://a.com/{i}") for i in range(6)],
+        *[fetch(f"https://B.com/{i}") for i in range(3)],
+    )
+    assert peak == {"a.com": 2, "b.com": 2}
+    # Hosts without pending fetches are forgotten
+    assert pool._hosts == {}
+
+
+@pytest.mark.asyncio
+async def test_fetch_pool_busy_host_does_not_hold_global_slots():
+    pool = FetchPool(max_concurrency=2, max_per_host=1)
+    finished = []
+
+    async def fetch(url, delay):
+        async with pool.slot(url):
+            await asyncio.sleep(delay)
+        finished.append(url)
+
+    await asyncio.gather(
+        *[fetch(f"https://slow.com/{i}", 0.1) for i in range(3)],
+        fetch("https://fast.com/", 0.01),
+    )
+    # The queued slow.com fetches wait for their host slot, not for a global slot
+    assert finished[0] == "https://fast.com/"
+
+
+def test_page_scrapers_read_their_settings():
+    settings = ScraperSettings(parser="selectolax", main_content=False, max_bytes=1024, pdf_max_pages=3)
+    scraper = BeautifulSoupScraper("https://example.com/", settings=settings)
+    assert isinstance(scraper.parser, SelectolaxParser)
+    assert scraper.main_content is False
+    assert scraper.max_bytes == 1024
+    assert scraper.max_pages == 3
+
+
+@pytest.mark.asyncio
+async def test_scraper_counts_only_network_errors_against_the_host(monkeypatch):
+    guard = HostGuard(rate=0, threshold=1)
+    scraper = Scraper([], ScraperSettings(), guard=guard)
+
+    def handler(request):
+        if request.url.host == "down.com":
+            raise httpx.ConnectError("connection refused")
+        return httpx.Response(200, html=f"<p>{PARAGRAPH}</p>")
+
+    def fail_to_parse(self, html, encoding=None):
+        raise ValueError("unparsable page")
+
+    monkeypatch.setattr(BeautifulSoupScraper, "_parse", fail_to_parse)
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        broken = await scraper.extract_data_from_link("https://broken.com/", client, FetchPool())
+        down = await scraper.extract_data_from_link("https://down.com/", client, FetchPool())
+
+    assert broken["raw_content"] is None and down["raw_content"] is None
+    assert set(guard.stats()) == {"down.com"}
+
+
+def test_blocking_scrape_sends_the_configured_user_agent(monkeypatch):
+    requests_sent = []
+
+    def get(session, url, **kwargs):
+        requests_sent.append(session.headers["User-Agent"])
+        response = requests.Response()
+        response.status_code = 200
+        response._content = f"<p>{PARAGRAPH}</p>".encode()
+        response.encoding = "utf-8"
+        return response
+
+    monkeypatch.setattr(requests.Session, "get", get)
+    scraper = BeautifulSoupScraper("https://example.com/", settings=ScraperSettings(user_agent="research-bot"))
+    assert scraper.scrape() == PARAGRAPH
+
+    session = requests.Session()
+    session.headers["User-Agent"] = "own-session"
+    BeautifulSoupScraper("https://example.com/", session, ScraperSettings(user_agent="research-bot")).scrape()
+    assert requests_sent == ["research-bot", "own-session"]
+
+
+
+def test_scrape_cache_ttl(tmp_path):
+    cache = ScrapeCache(str(tmp_path / "scrape.sqlite3"), ttl=3600, domain_ttl={"news.com": 0})
+
+    cache.set("https://example.com/a?b=2&a=1#top", "content")
+    page = cache.get("https://EXAMPLE.com/a?a=1&b=2")
+    assert page.raw_content == "content"
+    assert page.is_fresh
+
+    # The most specific domain wins, subdomains included
+    assert cache.ttl_for("https://live.news.com/story") == 0
+    cache.set("https://live.news.com/story", "story")
+    assert not cache.get("https://live.news.com/story").is_fresh
+
+
+def test_scrape_cache_keeps_expired_pages_only_with_validators(tmp_path, monkeypatch):
+    monkeypatch.setattr(scrape_cache, "STALE_IF_ERROR", 0)
+    cache = ScrapeCache(str(tmp_path / "scrape.sqlite3"), ttl=0)
+
+    cache.set("https://example.com/plain", "plain")
+    cache.set("https://example.com/tagged", "tagged", {"etag": '"v1"', "last-modified": "Mon, 01 Jan 2024 00:00:00 GMT"})
+    time.sleep(0.01)
+
+    assert cache.get("https://example.com/plain") is None
+    page = cache.get("https://example.com/tagged")
+    assert page.raw_content == "tagged"
+    assert page.conditional_headers() == {
+        "If-None-Match": '"v1"', "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT"
+    }
+
+
+def test_scrape_cache_evicts_least_recently_used(tmp_path):
+    cache = ScrapeCache(str(tmp_path / "scrape.sqlite3"))
+    cache.max_size = 25
+    cache.set("https://example.com/1", "a" * 10)
+    time.sleep(0.01)
+    cache.set("https://example.com/2", "b" * 10)
+    time.sleep(0.01)
+    cache.get("https://example.com/1")
+    cache.set("https://example.com/3", "c" * 10)
+
+    assert cache.get("https://example.com/2") is None
+    assert cache.get("https://example.com/1") is not None
+    assert cache.get("https://example.com/3") is not None
+
+
+@pytest.mark.asyncio
+async def test_scraper_revalidates_stale_page(tmp_path):
+    cache = ScrapeCache(str(tmp_path / "scrape.sqlite3"), ttl=0)
+    url = "https://example.com/article"
+    cache.set(url, "cached article " * 10, {"etag": '"v1"'})
+    cache._conn.execute("UPDATE pages SET fetched_at = 0")
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304, headers={"etag": '"v1"'})
+        return httpx.Response(200, html=HTML)
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        scraper = Scraper([url], ScraperSettings(), cache=cache)
+        page = await scraper.extract_data_from_link(url, client, FetchPool())
+
+    assert page == {"url": url, "raw_content": "cached article " * 10}
+    assert [request.headers.get("if-none-match") for request in requests] == ['"v1"']
+    # The 304 marks the cached copy as freshly fetched
+    assert time.time() - cache.get(url).fetched_at < 5
+
+
+@pytest.mark.asyncio
+async def test_scraper_caches_only_successful_pages(tmp_path):
+    cache = ScrapeCache(str(tmp_path / "scrape.sqlite3"))
+
+    def handler(request):
+        if request.url.path == "/missing":
+            return httpx.Response(404, html=HTML)
+        return httpx.Response(200, html=HTML)
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        scraper = Scraper([], ScraperSettings(), cache=cache)
+        ok = await scraper.extract_data_from_link("https://example.com/ok", client, FetchPool())
+        missing = await scraper.extract_data_from_link("https://example.com/missing", client, FetchPool())
+
+    assert "Solid-state batteries" in ok["raw_content"]
+    assert missing["raw_content"] is None
+    assert cache.get("https://example.com/ok").raw_content == ok["raw_content"]
+    assert cache.get("https://example.com/missing") is None
+
+
+def test_host_guard_opens_after_threshold_and_probes_when_half_open():
+    guard = HostGuard(rate=0, threshold=2, cooldown=0.05)
+    url = "https://flaky.com/page"
+
+    assert guard.check(url) is False
+    guard.record_failure(url)
+    assert guard.check(url) is False
+    guard.record_failure(url)
+    with pytest.raises(HostUnavailable):
+        guard.check(url)
+    # Other hosts are not affected
+    assert guard.check("https://other.com/") is False
+
+    time.sleep(0.06)
+    # Half-open: a single probe is let through
+    assert guard.check(url) is True
+    with pytest.raises(HostUnavailable):
+        guard.check(url)
+
+    guard.record_success(url)
+    assert guard.check(url) is False
+    assert guard.stats() == {}
+
+
+def test_host_guard_reopens_on_failed_probe():
+    guard = HostGuard(rate=0, threshold=3, cooldown=0.05)
+    url = "https://flaky.com/page"
+    for _ in range(3):
+        guard.record_failure(url)
+
+    time.sleep(0.06)
+    assert guard.check(url) is True
+    guard.record_failure(url)
+    with pytest.raises(HostUnavailable):
+        guard.check(url)
+    assert guard.stats()["flaky.com"]["state"] == "open"
+
+
+def test_host_guard_release_ends_abandoned_probe():
+    guard = HostGuard(rate=0, threshold=1, cooldown=0.01)
+    url = "https://flaky.com/page"
+    guard.record_failure(url)
+    time.sleep(0.02)
+
+    assert guard.check(url) is True
+    guard.release(url)
+    assert guard.check(url) is True
+
+
+def test_host_guard_honours_retry_after():
+    guard = HostGuard(rate=0, threshold=10, cooldown=300)
+    url = "https://limited.com/"
+    guard.record_failure(url, retry_after=0.05)
+    with pytest.raises(HostUnavailable):
+        guard.check(url)
+    time.sleep(0.06)
+    assert guard.check(url) is True
+
+
+@pytest.mark.parametrize("main_content", [False, True])
+def test_parser_backends_extract_the_same_text(main_content):
+    texts = {
+        name: parser_class().extract_text(HTML, main_content=main_content)
+        for name, parser_class in PARSERS.items()
+    }
+    assert texts["lxml"] == texts["bs"] == texts["selectolax"]
+
+    text = texts["lxml"]
+    assert "Solid-state batteries replace the liquid electrolyte" in text
+    assert "better safety" in text
+    assert "var tracking" not in text
+    assert "color: red" not in text
+    if main_content:
+        assert "All rights reserved" not in text
+
+
+def test_parser_backends_agree_on_encoded_bytes():
+    text = "Café crème brûlée is a custard topped with caramel."
+    html = f"<html><body><p>{text}</p></body></html>".encode("latin-1")
+    for encoding in ("latin-1", "iso-8859-1", "cp1252"):
+        texts = {name: parser_class().extract_text(html, encoding) for name, parser_class in PARSERS.items()}
+        assert set(texts.values()) == {text}
@@ -0,0 +1,72 @@
+import time
+
+import pytest
+
+from gpt_researcher.retrievers.tavily.tavily_search import APIKeyPool, NoAPIKeyAvailable, RateLimit
+
+
+@pytest.mark.asyncio
+async def test_key_pool_spreads_requests_over_keys():
+    pool = APIKeyPool("key-a, key-b, key-a", RateLimit(requests_per_second=20, daily_limit=None))
+    assert [status.key for status in pool.keys] == ["key-a", "key-b"]
+
+    start = time.monotonic()
+    keys = [await pool.acquire() for _ in range(4)]
+    assert sorted(keys) == ["key-a", "key-a", "key-b", "key-b"]
+    # Two keys at 20 requests a second each: the third and fourth request wait 50ms
+    assert 0.03 <= time.monotonic() - start < 0.5
+
+
+@pytest.mark.asyncio
+async def test_key_pool_cools_down_keys_exponentially():
+    pool = APIKeyPool("key-a,key-b", RateLimit(requests_per_second=1000, cooldown=10, max_cooldown=25))
+    key_a = pool.keys[0]
+
+    pool.report("key-a", 429)
+    assert key_a.unavailable_until - time.time() == pytest.approx(10, abs=1)
+    pool.report("key-a", 401)
+    assert key_a.unavailable_until - time.time() == pytest.approx(20, abs=1)
+    pool.report("key-a", 403)
+    assert key_a.unavailable_until - time.time() == pytest.approx(25, abs=1)
+    assert [await pool.acquire() for _ in range(3)] == ["key-b"] * 3
+
+    # Retry-After takes precedence, and a success resets the backoff
+    pool.report("key-a", 429, retry_after=2)
+    assert key_a.unavailable_until - time.time() == pytest.approx(2, abs=1)
+    pool.report("key-a", 200)
+    pool.report("key-a", 429)
+    assert key_a.unavailable_until - time.time() == pytest.approx(10, abs=1)
+
+    # Server errors are not the key's fault
+    pool.report("key-b", 500)
+    assert pool.keys[1].unavailable_until == 0
+    assert pool.stats()[1]["errors"] == 1
+
+
+@pytest.mark.asyncio
+async def test_key_pool_skips_exhausted_keys():
+    pool = APIKeyPool("key-a,key-b", RateLimit(requests_per_second=1000, daily_limit=2))
+    pool.report("key-a", 432)
+    assert [await pool.acquire() for _ in range(2)] == ["key-b", "key-b"]
+    with pytest.raises(NoAPIKeyAvailable):
+        await pool.acquire()
+    assert pool.stats()[0]["exhausted"]
+
+    with pytest.raises(NoAPIKeyAvailable):
+        await APIKeyPool("", RateLimit(requests_per_second=1)).acquire()
+
+
+@pytest.mark.asyncio
+async def test_key_pool_persists_usage(tmp_path):
+    path = str(tmp_path / "key_usage.sqlite3")
+    pool = APIKeyPool("key-a", RateLimit(requests_per_second=1000, daily_limit=10, cooldown=60), path)
+    for _ in range(3):
+        await pool.acquire()
+    pool.report("key-a", 429)
+    pool.flush()
+
+    restored = APIKeyPool("key-a", RateLimit(requests_per_second=1000, daily_limit=10, cooldown=60), path)
+    status = restored.keys[0]
+    assert status.request_count == 3
+    assert status.consecutive_errors == 1
+    assert status.unavailable_until == pytest.approx(pool.keys[0].unavailable_until)
@@ -0,0 +1,82 @@
+from collections import OrderedDict
+from types import SimpleNamespace
+
+import pytest
+
+from gpt_researcher.utils import tokens
+from gpt_researcher.utils.costs import INPUT_COST_PER_TOKEN, OUTPUT_COST_PER_TOKEN, get_llm_cost
+from gpt_researcher.utils.tokens import count_message_tokens, count_tokens_batch, get_token_usage
+
+
+class FakeEncoding:
+    """Encodes a text as one token per word, recording the batches it encodes"""
+
+    def __init__(self):
+        self.batches = []
+
+    def encode_ordinary_batch(self, texts):
+        self.batches.append(list(texts))
+        return [text.split() for text in texts]
+
+
+@pytest.fixture
+def encoding(monkeypatch):
+    encoding = FakeEncoding()
+    monkeypatch.setattr(tokens, "get_encoding", lambda name=tokens.ENCODING_MODEL: encoding)
+    monkeypatch.setattr(tokens, "_counts", OrderedDict())
+    return encoding
+
+
+def test_count_tokens_batch_encodes_each_text_once(encoding):
+    assert count_tokens_batch(["one two", "three", "one two"]) == [2, 1, 2]
+    assert count_tokens_batch(["three", "four five six", "one two"]) == [1, 3, 2]
+    assert encoding.batches == [["one two", "three", "one two"], ["four five six"]]
+
+    # Counts are kept per encoding
+    count_tokens_batch(["three"], "cl100k_base")
+    assert encoding.batches[-1] == ["three"]
+
+
+def test_count_tokens_batch_evicts_least_recently_used(encoding, monkeypatch):
+    monkeypatch.setattr(tokens, "TOKEN_COUNT_CACHE_SIZE", 2)
+    count_tokens_batch(["a", "b"])
+    count_tokens_batch(["a"])
+    count_tokens_batch(["c"])
+    count_tokens_batch(["a", "b"])
+    assert encoding.batches == [["a", "b"], ["c"], ["b"]]
+
+
+def test_count_tokens_batch_estimates_without_encoding(monkeypatch):
+    monkeypatch.setattr(tokens, "get_encoding", lambda name=tokens.ENCODING_MODEL: None)
+    monkeypatch.setattr(tokens, "_counts", OrderedDict())
+    assert count_tokens_batch(["x" * 40, ""]) == [10, 0]
+
+
+def test_count_message_tokens(encoding):
+    messages = [
+        {"role": "system", "content": "You are a researcher"},
+        SimpleNamespace(content=[{"type": "text", "text": "Summarize this"}, {"type": "image_url"}]),
+    ]
+    assert count_message_tokens(messages) == 4 + 2 + tokens.TOKENS_PER_MESSAGE * 2 + tokens.TOKENS_PER_REPLY
+
+
+def test_get_token_usage():
+    assert get_token_usage(SimpleNamespace(usage_metadata={"input_tokens": 10, "output_tokens": 5})) == {
+        "input_tokens": 10, "output_tokens": 5
+    }
+    anthropic = SimpleNamespace(response_metadata={"usage": {"input_tokens": 7, "output_tokens": 3}})
+    assert get_token_usage(anthropic) == {"input_tokens": 7, "output_tokens": 3}
+    openai = SimpleNamespace(response_metadata={"token_usage": {"prompt_tokens": 8, "completion_tokens": None}})
+    assert get_token_usage(openai) == {"input_tokens": 8, "output_tokens": 0}
+    assert get_token_usage(SimpleNamespace()) is None
+
+
+def test_get_llm_cost_prefers_reported_usage(encoding):
+    messages = [{"role": "user", "content": "one two three"}]
+    assert get_llm_cost(messages, "four five", {"input_tokens": 100, "output_tokens": 10}) == pytest.approx(
+        100 * INPUT_COST_PER_TOKEN + 10 * OUTPUT_COST_PER_TOKEN
+    )
+    input_tokens = 3 + tokens.TOKENS_PER_MESSAGE + tokens.TOKENS_PER_REPLY
+    assert get_llm_cost(messages, "four five") == pytest.approx(
+        input_tokens * INPUT_COST_PER_TOKEN + 2 * OUTPUT_COST_PER_TOKEN
+    )